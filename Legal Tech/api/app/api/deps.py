@@ -0,0 +1,72 @@
+from app.core.config import settings
+from app.services.metadata_store import MetadataStore
+from app.services.ocr import OcrCache, OcrService
+from app.services.registry import ServiceRegistry
+from app.services.renamer import RenamerService
+from app.services.suggestion_cache import SuggestionCache
+from app.services.work_limiter import OCR, RENDER, ZIP, WorkLimiter
+
+# Job, file and artifact index shared by the app and every router
+metadata_store = MetadataStore(settings.METADATA_DB_PATH)
+
+def get_metadata_store() -> MetadataStore:
+    return metadata_store
+
+# Concurrency limits shared by every endpoint that starts CPU-heavy work
+work_limiter = WorkLimiter(
+    {
+        RENDER: settings.RENDER_CONCURRENCY,
+        OCR: settings.OCR_CONCURRENCY,
+        ZIP: settings.ZIP_CONCURRENCY,
+    },
+    max_queued=settings.WORK_MAX_QUEUED,
+    queue_timeout=settings.WORK_QUEUE_TIMEOUT,
+)
+
+def get_work_limiter() -> WorkLimiter:
+    return work_limiter
+
+# Services built on first use, so startup does not import their heavy
+# dependencies; WARM_UP_SERVICES builds them before serving instead
+services = ServiceRegistry()
+
+# Shared by every request so documents named before skip the model call
+services.register(
+    "suggestion_cache",
+    lambda: SuggestionCache(
+        settings.SUGGESTION_CACHE_DIR,
+        max_memory_entries=settings.SUGGESTION_CACHE_MEMORY_ENTRIES,
+        ttl=settings.SUGGESTION_CACHE_TTL,
+    ),
+)
+
+# Worker pool for scanned documents; results are cached by image content
+services.register(
+    "ocr",
+    lambda: OcrService(
+        max_workers=settings.OCR_WORKERS,
+        max_pending=settings.OCR_MAX_PENDING,
+        lang=settings.OCR_LANG,
+        dpi=settings.OCR_DPI,
+        cache=OcrCache(settings.OCR_CACHE_DIR),
+    ),
+    preload=("PIL.Image",),
+)
+
+# Filename suggestions; building it imports the Gemini SDK
+services.register(
+    "renamer",
+    lambda: RenamerService(
+        api_key=settings.GOOGLE_API_KEY,
+        cache=services.get("suggestion_cache"),
+        ocr=services.get("ocr"),
+        min_local_confidence=settings.RENAME_LOCAL_MIN_CONFIDENCE,
+    ),
+    preload=("pdfplumber", "pypdfium2"),
+)
+
+def get_renamer_service() -> RenamerService:
+    return services.get("renamer")
+
+def get_services() -> ServiceRegistry:
+    return services
@@ -1,6 +1,11 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict
+from app.services.batch_renamer import BatchRenamer
 from app.services.renamer import RenamerService
+from app.api.deps import get_metadata_store, get_renamer_service, get_work_limiter
+from app.services.metadata_store import AmbiguousFilenameError, MetadataStore
+from app.services.work_limiter import OCR, WorkLimiter, WorkRejectedError
 from app.core.config import settings
 from pathlib import Path
 from pydantic import BaseModel
@@ -15,63 +20,72 @@ class RenameBatchRequest(BaseModel):
     renames: List[RenameRequest]
 
 @router.get("/{job_id}/rename-suggestions")
-async def get_rename_suggestions(job_id: str):
+async def get_rename_suggestions(
+    job_id: str,
+    renamer: RenamerService = Depends(get_renamer_service),
+    store: MetadataStore = Depends(get_metadata_store),
+    limiter: WorkLimiter = Depends(get_work_limiter),
+):
     """Get suggested filenames for all PDFs in a job."""
     try:
-        # Initialize renamer service
-        renamer = RenamerService(api_key=settings.GOOGLE_API_KEY)
-        
-        # Get job directory
-        job_dir = Path(settings.UPLOAD_DIR) / job_id
-        if not job_dir.exists():
+        if not await asyncio.to_thread(store.job_exists, job_id):
             raise HTTPException(status_code=404, detail="Job not found")
             
-        # Get all PDFs in job directory
-        pdf_files = list(job_dir.glob("*.pdf"))
+        # Get all PDFs in the job from the metadata index
+        records = await asyncio.to_thread(store.list_files, job_id)
+        # Suggestions name files by their display name, as the rename endpoints do
+        pdf_files = [(Path(record.path), record.filename) for record in records]
         if not pdf_files:
             raise HTTPException(status_code=404, detail="No PDF files found in job")
             
-        # Generate suggestions for each PDF
-        suggestions = []
-        for pdf_file in pdf_files:
-            suggested_name = await renamer.suggest_filename(pdf_file)
-            suggestions.append({
-                "old_filename": pdf_file.name,
-                "new_filename": suggested_name
-            })
+        # Generate suggestions for all PDFs concurrently; text extraction
+        # may OCR scanned pages, so the batch counts as OCR work
+        batch = BatchRenamer(
+            renamer,
+            concurrency=settings.RENAME_CONCURRENCY,
+            rate_per_second=settings.RENAME_RATE_PER_SECOND,
+            burst=settings.RENAME_BURST,
+            timeout=settings.RENAME_TIMEOUT,
+        )
+        async with limiter.admit(OCR):
+            suggestions = await batch.suggest_all(pdf_files)
             
-        return {"suggestions": suggestions}
+        return {"suggestions": suggestions, "summary": batch.summarize(suggestions)}
+    except (HTTPException, WorkRejectedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.patch("/{job_id}/rename")
-async def batch_rename_files(job_id: str, request: RenameBatchRequest):
+@router.patch("/{job_id}/rename/batch")
+async def batch_rename_files(
+    job_id: str,
+    request: RenameBatchRequest,
+    store: MetadataStore = Depends(get_metadata_store),
+):
     """Apply batch rename operations to files in a job."""
     try:
-        job_dir = Path(settings.UPLOAD_DIR) / job_id
-        if not job_dir.exists():
+        if not await asyncio.to_thread(store.job_exists, job_id):
             raise HTTPException(status_code=404, detail="Job not found")
             
-        # Process each rename request
-        for rename in request.renames:
-            old_file = job_dir / rename.old_filename
-            new_file = job_dir / rename.new_filename
-            
-            if not old_file.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"File not found: {rename.old_filename}"
-                )
-                
-            # Rename the file
-            old_file.rename(new_file)
+        # All renames are applied in one transaction, or none are
+        try:
+            await asyncio.to_thread(
+                store.rename_files,
+                job_id,
+                [(rename.old_filename, rename.new_filename) for rename in request.renames],
+            )
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        except (AmbiguousFilenameError, FileExistsError) as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
             
         # Return updated file list
+        files = await asyncio.to_thread(store.list_files, job_id)
         return {
             "message": "Files renamed successfully",
-            "files": [f.name for f in job_dir.glob("*.pdf")]
+            "files": [f.filename for f in files]
         }
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -2,6 +2,79 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     GOOGLE_API_KEY: str = ""
+    # Uploads are streamed to disk in chunks of this size and rejected above the maximum
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    # Worker processes used for signature extraction; 0 means one per CPU
+    EXTRACTION_WORKERS: int = 0
+    # Signature detection: "layout" or "fast" (raw character stream) scanning,
+    # pages to scan from the end first, and matches to stop after (0 scans every page)
+    DETECTION_MODE: str = "layout"
+    DETECTION_TAIL_PAGES: int = 0
+    DETECTION_STOP_AFTER: int = 0
+    # Content-addressed cache of extraction results shared across jobs
+    RESULT_CACHE_DIR: str = "./cache/results"
+    RESULT_CACHE_MAX_BYTES: int = 2 * 1024**3
+    # Render signature page PNGs during extraction instead of on first request
+    EAGER_RENDER: bool = False
+    # On-demand page renders, cached by content hash, page, DPI and width
+    RENDER_CACHE_DIR: str = "./cache/renders"
+    RENDER_DPI: int = 300
+    THUMBNAIL_DPI: int = 72
+    THUMBNAIL_WIDTH: int = 256
+    # Large-document mode: pages parsed per window before parser state is
+    # released (0 keeps whole documents open), and the pixel cap of one render
+    DETECTION_PAGE_WINDOW: int = 64
+    RENDER_MAX_PIXELS: int = 40_000_000
+    # Directory holding one subdirectory of uploads per job
+    UPLOAD_DIR: str = "./storage"
+    # SQLite index of jobs, files and derived artifacts
+    METADATA_DB_PATH: str = "./storage/metadata.db"
+    # Job progress shared by worker processes: "sqlite" or "memory" (single process)
+    JOB_STATE_BACKEND: str = "sqlite"
+    JOB_STATE_DB_PATH: str = "./storage/job_state.db"
+    # Seconds between state reads for event streams of jobs run by another worker
+    JOB_EVENTS_POLL_INTERVAL: float = 1.0
+    # Seconds a download waits for another worker to finish extracting a job
+    # before extracting it itself, e.g. because that worker exited
+    EXTRACTION_WAIT_TIMEOUT: float = 600.0
+    # Storage lifecycle: seconds a job is kept after its last access, quota for
+    # job storage plus cached renders, and seconds between cleanup sweeps
+    STORAGE_JOB_TTL: int = 7 * 24 * 3600
+    STORAGE_MAX_BYTES: int = 20 * 1024**3
+    STORAGE_SWEEP_INTERVAL: float = 600.0
+    # Batch rename suggestions: parallel files, sustained and burst model calls
+    # per second, and seconds to wait for each call before falling back
+    RENAME_CONCURRENCY: int = 4
+    RENAME_RATE_PER_SECOND: float = 2.0
+    RENAME_BURST: int = 4
+    RENAME_TIMEOUT: float = 20.0
+    # Offline naming from dates, parties and document types: confidence (0-1)
+    # at which the model is skipped; above 1 sends every document to the model
+    RENAME_LOCAL_MIN_CONFIDENCE: float = 0.8
+    # Model rename suggestions keyed by document text and prompt version:
+    # on-disk store, in-memory LRU size and seconds an entry stays valid
+    SUGGESTION_CACHE_DIR: str = "./cache/suggestions"
+    SUGGESTION_CACHE_MEMORY_ENTRIES: int = 1024
+    SUGGESTION_CACHE_TTL: int = 30 * 24 * 3600
+    # OCR of scanned pages: worker processes (0 means one per CPU), images
+    # queued before callers wait, render DPI, Tesseract language and result cache
+    OCR_WORKERS: int = 0
+    OCR_MAX_PENDING: int = 32
+    OCR_DPI: int = 150
+    OCR_LANG: str = "eng"
+    OCR_CACHE_DIR: str = "./cache/ocr"
+    # Admission control for CPU-heavy requests: concurrent page renders, OCR
+    # batches and ZIP downloads, requests queued per class, and seconds a
+    # queued request waits before it is turned away with Retry-After
+    RENDER_CONCURRENCY: int = 4
+    OCR_CONCURRENCY: int = 2
+    ZIP_CONCURRENCY: int = 2
+    WORK_MAX_QUEUED: int = 16
+    WORK_QUEUE_TIMEOUT: float = 10.0
+    # Import and build the lazily loaded services (Gemini SDK, OCR, PDF parsers)
+    # during startup instead of on the first request that needs each one
+    WARM_UP_SERVICES: bool = False
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
@@ -1,20 +1,88 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from typing import List, Dict
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
 import uuid
 import os
+import shutil
 from pathlib import Path
 from pydantic import BaseModel
-import zipfile
-import io
-from app.services.signature_detector import SignatureDetector
-from app.api.endpoints import rename
+from app.core.config import settings
+from app.services.extraction_engine import ExtractionEngine
+from app.services.page_renderer import PageRenderer
+from app.services.result_cache import ResultCache, file_digest
+from app.services.storage_manager import StorageManager
+from app.services.job_pipeline import ExtractionPipeline, FileState, JobManifest
+from app.services.manifest_store import Manifest
+from app.services.job_state import create_job_state_backend
+from app.services.metadata_store import AmbiguousFilenameError, FileRecord
+from app.services.uploads import UploadTooLargeError, save_upload
+from app.services.work_limiter import RENDER, ZIP, WorkRejectedError, WorkTicket
+from app.services.zip_stream import ZipStream
+from app.api.deps import metadata_store, services, work_limiter
+from app.api.endpoints import jobs
+
+# Extraction results reused across jobs that upload the same PDF
+result_cache = ResultCache(settings.RESULT_CACHE_DIR, settings.RESULT_CACHE_MAX_BYTES)
+# Page PNGs rendered on first request and kept for repeat views
+page_renderer = PageRenderer(settings.RENDER_CACHE_DIR)
+# Process pool shared by all requests for CPU-bound signature extraction
+extraction_engine = ExtractionEngine(
+    max_workers=settings.EXTRACTION_WORKERS,
+    cache=result_cache,
+    detector_options={
+        "mode": settings.DETECTION_MODE,
+        "tail_pages": settings.DETECTION_TAIL_PAGES,
+        "stop_after": settings.DETECTION_STOP_AFTER or None,
+        "render_pngs": settings.EAGER_RENDER,
+        "page_window": settings.DETECTION_PAGE_WINDOW or None,
+        "max_render_pixels": settings.RENDER_MAX_PIXELS or None,
+    },
+    renderer=page_renderer,
+)
+# Background extraction started at upload time, with state shared by all workers
+pipeline = ExtractionPipeline(
+    extraction_engine,
+    store=metadata_store,
+    state=create_job_state_backend(settings.JOB_STATE_BACKEND, settings.JOB_STATE_DB_PATH),
+)
+
+# Create storage directory if it doesn't exist
+STORAGE_DIR = Path("./storage")
+STORAGE_DIR.mkdir(exist_ok=True)
+
+# Expires idle jobs and keeps storage within its quota, derived files first
+storage_manager = StorageManager(
+    STORAGE_DIR,
+    metadata_store,
+    job_ttl=settings.STORAGE_JOB_TTL,
+    max_bytes=settings.STORAGE_MAX_BYTES,
+    pipeline=pipeline,
+    cache_dirs=[settings.RENDER_CACHE_DIR],
+)
+
+# The engine's own detector, used for cache keys; building it loads the PDF stack
+services.register("signature_detector", lambda: extraction_engine.detector)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if settings.WARM_UP_SERVICES:
+        await asyncio.to_thread(services.warm_up)
+    sweeper = asyncio.create_task(storage_manager.run(settings.STORAGE_SWEEP_INTERVAL))
+    yield
+    sweeper.cancel()
+    extraction_engine.shutdown()
+    services.shutdown()
 
 app = FastAPI(
     title="Signature Toolkit API",
     description="API for extracting and processing signatures",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -27,11 +95,17 @@ app.add_middleware(
 )
 
 # Include routers
-app.include_router(rename.router, prefix="/api", tags=["Rename"])
+# Batch renames live under /rename/batch; PATCH /rename below renames a single file
+app.include_router(jobs.router, prefix="/api/job", tags=["Rename"])
 
-# Create storage directory if it doesn't exist
-STORAGE_DIR = Path("./storage")
-STORAGE_DIR.mkdir(exist_ok=True)
+@app.exception_handler(WorkRejectedError)
+async def work_rejected_handler(_request: Request, exc: WorkRejectedError):
+    # 429 when turned away on arrival, 503 when the queue did not drain in time
+    return JSONResponse(
+        status_code=429 if exc.queue_full else 503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 class UploadResponse(BaseModel):
     """Response model for file upload endpoint"""
@@ -47,6 +121,26 @@ class RenameRequest(BaseModel):
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/cache/stats", tags=["Cache"])
+async def get_cache_stats():
+    """Hit/miss counters and size of the extraction result cache."""
+    return await asyncio.to_thread(result_cache.stats)
+
+@app.get("/api/cache/suggestions/stats", tags=["Cache"])
+async def get_suggestion_cache_stats():
+    """Hit/miss counters of the rename suggestion cache."""
+    return services.get("suggestion_cache").stats()
+
+@app.get("/api/work/stats", tags=["Cache"])
+async def get_work_stats():
+    """Running, queued and rejected CPU-heavy requests per work class."""
+    return work_limiter.stats()
+
+@app.get("/api/storage/stats", tags=["Cache"])
+async def get_storage_stats():
+    """Expiry and eviction counters and disk usage of job storage."""
+    return storage_manager.stats()
+
 @app.post("/api/upload", response_model=UploadResponse, tags=["Files"])
 async def upload_files(files: List[UploadFile] = File(...)):
     """
@@ -61,31 +155,119 @@ async def upload_files(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
+    for file in files:
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
+    
     # Generate a unique job ID
     job_id = str(uuid.uuid4())
     job_dir = STORAGE_DIR / job_id
     job_dir.mkdir(exist_ok=True)
     
-    file_uuids = []
+    # Generate unique filenames while preserving original names
+    file_uuids = [str(uuid.uuid4()) for _ in files]
+    file_paths = [
+        job_dir / f"{file_uuid}_{file.filename}"
+        for file_uuid, file in zip(file_uuids, files, strict=True)
+    ]
     
-    for file in files:
-        if not file.filename.lower().endswith('.pdf'):
-            raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
-        
-        # Generate unique filename while preserving original name
-        file_uuid = str(uuid.uuid4())
-        original_name = file.filename
-        file_path = job_dir / f"{file_uuid}_{original_name}"
-        
-        # Save the file
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        file_uuids.append(file_uuid)
+    # Stream every file to disk concurrently
+    stored = await asyncio.gather(
+        *(
+            save_upload(
+                file,
+                file_path,
+                max_bytes=settings.MAX_UPLOAD_BYTES,
+                chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            )
+            for file, file_path in zip(files, file_paths, strict=True)
+        ),
+        return_exceptions=True,
+    )
+    errors = [result for result in stored if isinstance(result, BaseException)]
+    if errors:
+        # Don't leave a partial job behind
+        await asyncio.to_thread(shutil.rmtree, job_dir, ignore_errors=True)
+        if isinstance(errors[0], UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=str(errors[0]))
+        raise errors[0]
+    
+    # Index the job so later lookups never scan the job directory
+    records = [
+        FileRecord(
+            id=file_uuid,
+            job_id=job_id,
+            filename=file.filename,
+            path=str(file_path),
+            size=upload.size,
+            sha256=upload.sha256,
+        )
+        for file_uuid, file, file_path, upload in zip(
+            file_uuids, files, file_paths, stored, strict=True
+        )
+    ]
+    await asyncio.to_thread(metadata_store.create_job, job_id, records)
+    
+    file_states = [
+        FileState(
+            id=file_uuid,
+            filename=file.filename,
+            size=upload.size,
+            sha256=upload.sha256,
+            thumbnail_url=f"/api/thumbnails/{job_id}/{file_uuid}",
+        )
+        for file_uuid, file, upload in zip(file_uuids, files, stored, strict=True)
+    ]
+    
+    # Start signature extraction in the background
+    await pipeline.submit(job_id, file_states, file_paths, job_dir)
     
     return UploadResponse(job_id=job_id, files=file_uuids)
 
+@app.get("/api/job/{job_id}/manifest", response_model=JobManifest, tags=["Files"])
+async def get_job_manifest(job_id: str):
+    """
+    Get the processing state of every file in a job.
+    
+    Args:
+        job_id: The job ID to report on
+        
+    Returns:
+        JobManifest: Job status, progress counts and per-file states and timings
+    """
+    manifest = await asyncio.to_thread(pipeline.manifest, job_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return manifest
+
+@app.get("/api/job/{job_id}/events", tags=["Files"])
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's manifest as server-sent events while it is processed.
+    
+    A ``manifest`` event carrying the full manifest is sent on connect and
+    after every file state change, and a final ``done`` event once every
+    file has finished, replacing repeated polling of the manifest endpoint.
+    
+    Args:
+        job_id: The job ID to report on
+        
+    Returns:
+        StreamingResponse: text/event-stream of manifest updates
+    """
+    if await asyncio.to_thread(pipeline.manifest, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    async for manifest in pipeline.watch(job_id, settings.JOB_EVENTS_POLL_INTERVAL):
+        yield f"event: manifest\ndata: {manifest.model_dump_json()}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
 @app.get("/api/job/{job_id}/download", tags=["Files"])
 async def download_signature_pages(job_id: str):
     """
@@ -97,50 +279,224 @@ async def download_signature_pages(job_id: str):
     Returns:
         StreamingResponse: ZIP file containing signature pages
     """
-    job_dir = STORAGE_DIR / job_id
-    if not job_dir.exists():
+    if not await asyncio.to_thread(metadata_store.job_exists, job_id):
+        # A storage sweep, possibly in another worker, may have deleted a job run here
+        pipeline.forget(job_id)
         raise HTTPException(status_code=404, detail="Job not found")
+    await asyncio.to_thread(metadata_store.touch_job, job_id)
     
-    # Create a memory buffer for the ZIP file
-    zip_buffer = io.BytesIO()
-    
-    # Create ZIP file in memory
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Process each PDF file in the job directory
-        for pdf_file in job_dir.glob("*.pdf"):
-            if pdf_file.name.endswith("_sigpages.pdf"):
-                continue  # Skip already processed files
-                
-            # Create output directory for this PDF
-            out_dir = job_dir / pdf_file.stem
-            out_dir.mkdir(exist_ok=True)
-            
-            # Extract signature pages
-            detector = SignatureDetector()
-            manifest = detector.extract_pages(pdf_file, out_dir)
-            
-            # Add files to ZIP
-            for page_info in manifest.values():
-                # Add PDF file
-                pdf_path = Path(page_info["pdf"])
-                if pdf_path.exists():
-                    zip_file.write(pdf_path, pdf_path.name)
-                
-                # Add PNG file
+    # Held until the ZIP has been streamed; rejected with Retry-After when saturated
+    ticket = await work_limiter.acquire(ZIP)
+    download_id = None
+    try:
+        # Keeps every worker's storage sweep away from the job's files meanwhile
+        download_id = await asyncio.to_thread(metadata_store.start_download, job_id)
+        # Entries are named after the files' current display names, so renames show up here
+        records = await asyncio.to_thread(metadata_store.list_files, job_id)
+        if job_id in pipeline.jobs:
+            # Serve the results of the extraction started at upload time
+            results = pipeline.results(job_id)
+        else:
+            # Job predates this process or runs in another worker
+            files = []
+            for record in records:
+                pdf_path = Path(record.path)
+                files.append((pdf_path, pdf_path.parent / pdf_path.stem))
+            results = _extract_once_settled(job_id, files)
+
+        # Stream the ZIP, sending each PDF's pages as soon as they are ready
+        return StreamingResponse(
+            _stream_signature_zip(results, _zip_stems(records), ticket, download_id),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": "attachment; filename=signature_pages.zip"
+            },
+            background=BackgroundTask(_end_download, ticket, download_id),
+        )
+    except BaseException:
+        # No stream will start to release them
+        await _end_download(ticket, download_id)
+        raise
+
+async def _extract_once_settled(
+    job_id: str, files: List[Tuple[Path, Path]]
+) -> AsyncIterator[Tuple[Path, Manifest]]:
+    """Extract a job's files once no other worker is still extracting them."""
+    # Extracting alongside another worker would write into the output
+    # directories it is still filling; once it is done, its stored manifests
+    # are reused and nothing is extracted again
+    try:
+        async with asyncio.timeout(settings.EXTRACTION_WAIT_TIMEOUT):
+            async for _ in pipeline.watch(job_id, settings.JOB_EVENTS_POLL_INTERVAL):
+                pass
+    except TimeoutError:
+        pass
+    async for result in extraction_engine.extract_all(files):
+        yield result
+
+async def _end_download(ticket: WorkTicket, download_id: Optional[str]) -> None:
+    ticket.release()
+    if download_id is not None:
+        await asyncio.to_thread(metadata_store.finish_download, download_id)
+
+def _zip_stems(records: List[FileRecord]) -> Dict[Path, str]:
+    """Name stem of each stored PDF's ZIP entries: its display name, made unique."""
+    stems: Dict[Path, str] = {}
+    used = set()
+    for record in records:
+        stem = base = Path(record.filename).stem
+        n = 1
+        while stem in used:
+            n += 1
+            stem = f"{base}_{n}"
+        used.add(stem)
+        stems[Path(record.path)] = stem
+    return stems
+
+async def _stream_signature_zip(
+    results: AsyncIterator, stems: Dict[Path, str], ticket: WorkTicket, download_id: str
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP of signature page PDFs and PNGs as extraction results arrive."""
+    try:
+        async for chunk in _zip_chunks(results, stems):
+            yield chunk
+    finally:
+        await _end_download(ticket, download_id)
+
+def _outputs_exist(manifest: Manifest) -> bool:
+    return all(os.path.exists(path) for files in manifest.values() for path in files.values())
+
+async def _zip_chunks(results: AsyncIterator, stems: Dict[Path, str]) -> AsyncIterator[bytes]:
+    archive = ZipStream()
+    async for pdf_path, manifest in results:
+        if not await asyncio.to_thread(_outputs_exist, manifest):
+            # A storage sweep, possibly in another worker, trimmed the outputs
+            # this manifest lists since it was produced; recreate them
+            manifest = await extraction_engine.extract(pdf_path, pdf_path.parent / pdf_path.stem)
+        stem = stems.get(pdf_path, pdf_path.stem)
+        content_hash = None
+        for page_num, page_info in sorted(manifest.items()):
+            png_name = f"{stem}_page{page_num}.png"
+            if "png" in page_info:
                 png_path = Path(page_info["png"])
-                if png_path.exists():
-                    zip_file.write(png_path, png_path.name)
+            else:
+                # PNGs were not rendered during extraction; render (or reuse) them now
+                if content_hash is None:
+                    content_hash = await asyncio.to_thread(file_digest, pdf_path)
+                png_path = await extraction_engine.render(
+                    pdf_path, page_num, settings.RENDER_DPI, content_hash=content_hash
+                )
+            # The subset PDF is shared by every page of a document
+            subset_pdf = Path(page_info["pdf"])
+            pdf_name = f"{stem}_sigpages.pdf"
+            for path, arcname in ((subset_pdf, pdf_name), (png_path, png_name)):
+                if arcname in archive.names or not path.exists():
+                    continue
+                # Compression and file reads run off the event loop
+                async for chunk in iterate_in_threadpool(archive.add_file(path, arcname)):
+                    yield chunk
+    async for chunk in iterate_in_threadpool(archive.close()):
+        yield chunk
+
+async def _find_job_file(job_id: str, file_id: str) -> Tuple[Path, str, List[int]]:
+    """Stored PDF, content hash and detected signature pages of an uploaded file."""
+    # Keeps the job from expiring while it is being viewed
+    await asyncio.to_thread(metadata_store.touch_job, job_id)
+    for file_state in pipeline.jobs.get(job_id, []):
+        if file_state.id == file_id:
+            return file_state._pdf_path, file_state.sha256, file_state.pages
     
-    # Reset buffer position
-    zip_buffer.seek(0)
+    # Job predates this process; look the file up in the metadata index
+    record = await asyncio.to_thread(metadata_store.get_file, job_id, file_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    pages = await asyncio.to_thread(metadata_store.signature_pages, file_id)
+    content_hash = record.sha256 or await asyncio.to_thread(file_digest, record.path)
+    return Path(record.path), content_hash, pages
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+async def _page_image_response(
+    request: Request,
+    pdf_path: Path,
+    content_hash: str,
+    page_num: int,
+    dpi: int,
+    width: Optional[int] = None,
+) -> Response:
+    """Serve a cached page render, rendering it first if needed."""
+    # Renders are immutable for a given key, so the ETag is known before rendering
+    etag = f'"{PageRenderer.render_key(content_hash, page_num, dpi, width)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
     
-    # Return streaming response
-    return StreamingResponse(
-        zip_buffer,
-        media_type="application/zip",
-        headers={
-            "Content-Disposition": "attachment; filename=signature_pages.zip"
-        }
+    # Cached renders cost no CPU, so only new renders count against the limit
+    png_path = extraction_engine.renderer.cached_path(content_hash, page_num, dpi, width)
+    if not await asyncio.to_thread(png_path.exists):
+        try:
+            async with work_limiter.admit(RENDER):
+                png_path = await extraction_engine.render(
+                    pdf_path, page_num, dpi, max_width=width, content_hash=content_hash
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+    return FileResponse(png_path, media_type="image/png", headers=headers)
+
+@app.get("/api/job/{job_id}/files/{file_id}/pages/{page_num}", tags=["Files"])
+async def render_page(
+    request: Request,
+    job_id: str,
+    file_id: str,
+    page_num: int,
+    dpi: int = Query(150, ge=18, le=600),
+    width: Optional[int] = Query(None, ge=16, le=4000),
+):
+    """
+    Render one page of an uploaded PDF to PNG.
+    
+    Pages are rasterized on first request and cached by content hash, page,
+    DPI and width, and responses carry an ETag for conditional requests.
+    
+    Args:
+        job_id: The job containing the file
+        file_id: The file's UUID
+        page_num: 1-based page number
+        dpi: Render resolution
+        width: Optional maximum width in pixels
+        
+    Returns:
+        FileResponse: The PNG, or 304 if the client's copy is current
+    """
+    pdf_path, content_hash, _ = await _find_job_file(job_id, file_id)
+    return await _page_image_response(request, pdf_path, content_hash, page_num, dpi, width)
+
+@app.get("/api/thumbnails/{job_id}/{file_id}", tags=["Files"])
+async def get_thumbnail(request: Request, job_id: str, file_id: str):
+    """
+    Get a small preview of a file's first signature page.
+    
+    Args:
+        job_id: The job containing the file
+        file_id: The file's UUID
+        
+    Returns:
+        FileResponse: The thumbnail PNG, or 304 if the client's copy is current
+    """
+    pdf_path, content_hash, pages = await _find_job_file(job_id, file_id)
+    # Until detection finishes, preview the first page
+    page_num = pages[0] if pages else 1
+    return await _page_image_response(
+        request,
+        pdf_path,
+        content_hash,
+        page_num,
+        settings.THUMBNAIL_DPI,
+        settings.THUMBNAIL_WIDTH,
     )
 
 @app.patch("/api/job/{job_id}/rename", tags=["Files"])
@@ -155,30 +511,24 @@ async def rename_file(job_id: str, rename_request: RenameRequest):
     Returns:
         Dict: Updated file list
     """
-    job_dir = STORAGE_DIR / job_id
-    if not job_dir.exists():
+    if not await asyncio.to_thread(metadata_store.job_exists, job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Find the file with the old name
-    old_file = None
-    for file in job_dir.glob("*"):
-        if file.name.endswith(rename_request.old_filename):
-            old_file = file
-            break
-    
-    if not old_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Generate new filename with UUID prefix
-    file_uuid = old_file.name.split('_')[0]
-    new_file = job_dir / f"{file_uuid}_{rename_request.new_filename}"
-    
-    # Rename the file
+    # Renames only change the display name; the stored file keeps its path
     try:
-        old_file.rename(new_file)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to rename file: {str(e)}")
+        record = await asyncio.to_thread(
+            metadata_store.rename_file,
+            job_id,
+            rename_request.old_filename,
+            rename_request.new_filename,
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="File not found") from None
+    except (AmbiguousFilenameError, FileExistsError) as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    
+    await asyncio.to_thread(pipeline.state.set_filename, job_id, record.id, record.filename)
     
     # Return updated file list
-    files = [f.name for f in job_dir.glob("*") if not f.name.endswith("_sigpages.pdf")]
-    return {"files": files} 
\ No newline at end of file
+    files = await asyncio.to_thread(metadata_store.list_files, job_id)
+    return {"files": [f.filename for f in files]}
@@ -0,0 +1,236 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from app.services.atomic_write import atomic_write_text
+from app.services.pdf_document import PdfDocumentSession
+from app.services.signature_detector import SignatureDetector
+
+ANCHOR_INDEX_FILE = "anchor_index.json"
+
+# Where an anchor was found: a text match, or a drawn line on a page without text
+TEXT = "text"
+LINE = "line"
+
+# Height reserved above a signature line for the signing tab, in points
+TAB_HEIGHT = 24
+# Gap between a label such as "Signature:" and a tab placed after it, in points
+LABEL_GAP = 4
+
+# Matches that are the line to sign on, as opposed to a label next to it
+_LINE_TEXT = re.compile(r"^_+$")
+
+Box = Tuple[float, float, float, float]
+
+
+def anchor_index_path(pdf_path: str | Path) -> Path:
+    """Where a stored PDF's anchor index lives: in its output directory inside the job."""
+    pdf_path = Path(pdf_path)
+    return pdf_path.parent / pdf_path.stem / ANCHOR_INDEX_FILE
+
+
+class SignatureAnchor(BaseModel):
+    """One place on a page where someone signs"""
+    page: int
+    # Top-left corner for a signing tab, in points from the page's top-left;
+    # the same units as DocuSign's pixel positions
+    x: float
+    y: float
+    # (x0, top, x1, bottom) of the matched label and line together
+    bbox: Box
+    # The matched text, e.g. "Signature", or "line" for a drawn line
+    label: str
+    source: str
+
+
+class AnchorIndex(BaseModel):
+    """Every signature anchor of a document, in page and reading order"""
+    fingerprint: str
+    page_count: int
+    anchors: List[SignatureAnchor]
+
+    def on_page(self, page_num: int) -> List[SignatureAnchor]:
+        """Anchors on one page, top to bottom."""
+        return [anchor for anchor in self.anchors if anchor.page == page_num]
+
+    def assign(self, page_nums: Sequence[int]) -> List[SignatureAnchor]:
+        """
+        Pick an anchor for each signer, given the page each one signs on.
+
+        Signers on the same page get that page's anchors in order, so the
+        second signer on page 3 gets the second anchor of page 3.
+
+        Args:
+            page_nums: 1-based page of each signer
+
+        Returns:
+            One anchor per signer, in the same order
+
+        Raises:
+            LookupError: If a page has fewer anchors than signers
+        """
+        by_page: Dict[int, List[SignatureAnchor]] = {}
+        for anchor in self.anchors:
+            by_page.setdefault(anchor.page, []).append(anchor)
+        used: Dict[int, int] = {}
+        assigned = []
+        for page_num in page_nums:
+            n = used.get(page_num, 0)
+            candidates = by_page.get(page_num, [])
+            if n >= len(candidates):
+                raise LookupError(
+                    f"No signature location left on page {page_num} "
+                    f"({len(candidates)} found, signer {n + 1} needs one)"
+                )
+            used[page_num] = n + 1
+            assigned.append(candidates[n])
+        return assigned
+
+
+class SignatureAnchorIndexer:
+    """Finds every signature location of a document in a single pass.
+
+    Each page's raw character stream is matched against the detector's
+    signature patterns, and only matching pages are searched again for the
+    positions of the matches; pages without a text layer are searched for
+    drawn lines instead. Matches on the same text line, such as a
+    "Signature:" label and the underscores after it, become one anchor,
+    placed on the line when there is one and after the label otherwise. The
+    index is stored as JSON in the PDF's output directory, next to its text
+    index and manifest, and reused until the file changes.
+    """
+
+    # Bump when anchor detection or placement changes
+    VERSION = 2
+
+    def __init__(self, detector: Optional[SignatureDetector] = None):
+        """
+        Args:
+            detector: SignatureDetector whose patterns, line detector and page
+                window are used; a default detector if None
+        """
+        self.detector = detector if detector is not None else SignatureDetector()
+
+    def fingerprint(self, pdf_path: str | Path) -> str:
+        """Identifies the file version and the settings that affect the anchors."""
+        stat = Path(pdf_path).stat()
+        patterns = ",".join(f"{p.pattern}/{p.flags}" for p in self.detector.signature_patterns)
+        lines = "|lines" if self.detector.line_detector is not None else ""
+        return f"v{self.VERSION}|{stat.st_size}|{stat.st_mtime_ns}|{patterns}{lines}"
+
+    def build(self, pdf_path: str | Path) -> AnchorIndex:
+        """
+        Scan a document for signature anchors.
+
+        Args:
+            pdf_path: The PDF to scan
+
+        Returns:
+            The index, not yet stored
+        """
+        fingerprint = self.fingerprint(pdf_path)
+        with self.detector.open_session(pdf_path) as session:
+            anchors = []
+            for page_num in range(1, session.page_count + 1):
+                anchors.extend(self._page_anchors(session, page_num))
+            return AnchorIndex(
+                fingerprint=fingerprint, page_count=session.page_count, anchors=anchors
+            )
+
+    def _page_anchors(self, session: PdfDocumentSession, page_num: int) -> List[SignatureAnchor]:
+        # The raw character stream is cheap to read; only pages that match it
+        # pay for pdfplumber's positioned search
+        text = session.page_chars_text(page_num)
+        if self.detector.combined_pattern.search(text):
+            matches = session.search_page(page_num, self.detector.combined_pattern)
+            return _merge_rows(page_num, matches) if matches else []
+        line_detector = self.detector.line_detector
+        if line_detector is None or text.strip():
+            return []
+        # Scanned pages have no text to match; use their drawn signature lines
+        return [
+            SignatureAnchor(
+                page=page_num,
+                x=round(line.bbox[0], 2),
+                y=round(max(line.bbox[1] - TAB_HEIGHT, 0), 2),
+                bbox=tuple(round(v, 2) for v in line.bbox),
+                label=LINE,
+                source=LINE,
+            )
+            for line in line_detector.detect_page(session, page_num)
+        ]
+
+    def load(
+        self, pdf_path: str | Path, path: Optional[str | Path] = None
+    ) -> Optional[AnchorIndex]:
+        """The stored index of a PDF, if it was built from the same file and settings."""
+        path = Path(path) if path is not None else anchor_index_path(pdf_path)
+        try:
+            index = AnchorIndex.model_validate_json(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return index if index.fingerprint == self.fingerprint(pdf_path) else None
+
+    def save(
+        self, index: AnchorIndex, pdf_path: str | Path, path: Optional[str | Path] = None
+    ) -> None:
+        """Store an index for later ``load`` calls."""
+        path = Path(path) if path is not None else anchor_index_path(pdf_path)
+        atomic_write_text(path, json.dumps(index.model_dump(mode="json")))
+
+    def index(self, pdf_path: str | Path, path: Optional[str | Path] = None) -> AnchorIndex:
+        """
+        The anchor index of a PDF, built and stored on first use.
+
+        Args:
+            pdf_path: The PDF
+            path: Where the index is stored; defaults to ``anchor_index_path(pdf_path)``
+
+        Returns:
+            The stored index if current, otherwise a freshly built one
+        """
+        index = self.load(pdf_path, path)
+        if index is None:
+            index = self.build(pdf_path)
+            self.save(index, pdf_path, path)
+        return index
+
+
+def _merge_rows(page_num: int, matches: List[dict]) -> List[SignatureAnchor]:
+    """One anchor per text line: matches that overlap vertically belong together."""
+    rows: List[List[dict]] = []
+    for match in sorted(matches, key=lambda m: (m["top"], m["x0"])):
+        row = rows[-1] if rows else None
+        if row is not None and match["top"] < max(m["bottom"] for m in row):
+            row.append(match)
+        else:
+            rows.append([match])
+
+    anchors = []
+    for row in rows:
+        bbox = (
+            min(m["x0"] for m in row),
+            min(m["top"] for m in row),
+            max(m["x1"] for m in row),
+            max(m["bottom"] for m in row),
+        )
+        lines = [m for m in row if _LINE_TEXT.match(m["text"])]
+        labels = [m for m in row if not _LINE_TEXT.match(m["text"])]
+        if lines:
+            x, y = lines[0]["x0"], max(lines[0]["top"] - TAB_HEIGHT, 0)
+        else:
+            x, y = max(m["x1"] for m in labels) + LABEL_GAP, bbox[1]
+        anchors.append(
+            SignatureAnchor(
+                page=page_num,
+                x=round(x, 2),
+                y=round(y, 2),
+                bbox=tuple(round(v, 2) for v in bbox),
+                label=labels[0]["text"] if labels else LINE,
+                source=TEXT,
+            )
+        )
+    return anchors
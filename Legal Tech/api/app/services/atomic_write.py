@@ -0,0 +1,31 @@
+import os
+import uuid
+from pathlib import Path
+
+
+def atomic_write_bytes(path: str | Path, data: bytes) -> None:
+    """
+    Write a file so that readers see either the old content or all of the new.
+
+    The data goes to a hidden temporary file in the same directory, which
+    then replaces ``path`` in one rename. Missing parent directories are
+    created, and the temporary file is removed if the write fails.
+
+    Args:
+        path: The file to write
+        data: Its new content
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{uuid.uuid4().hex}{path.suffix}")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(path: str | Path, text: str) -> None:
+    """Write text atomically, as ``atomic_write_bytes``, encoded as UTF-8."""
+    atomic_write_bytes(path, text.encode("utf-8"))
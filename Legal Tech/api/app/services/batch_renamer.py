@@ -0,0 +1,195 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from app.services.renamer import RenamerService
+
+LOCAL = "local"
+MODEL = "model"
+CACHE = "cache"
+FALLBACK = "fallback"
+
+
+class RenameSuggestion(BaseModel):
+    """Suggested filename for one PDF"""
+    old_filename: str
+    new_filename: str
+    # LOCAL if named offline from the text, MODEL if the LLM answered, CACHE if
+    # it had already named the same text, FALLBACK if the regex-based name was used
+    source: str
+    # Confidence of the offline namer, for LOCAL suggestions
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+
+class RenameSummary(BaseModel):
+    """How the suggestions for one job were produced"""
+    files: int
+    # Number of suggestions per source
+    sources: Dict[str, int]
+    # Fraction of files named without a model call, offline or from the cache
+    local_fraction: float
+    # Average model call latency times the files that skipped the model;
+    # None until the renamer has timed a model call
+    estimated_seconds_saved: Optional[float] = None
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``, so
+    short bursts go through immediately while the sustained rate stays bounded.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens, i.e. the largest burst
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # Waiters queue on the lock, so tokens are handed out first come, first served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BatchRenamer:
+    """Generates rename suggestions for many PDFs at once.
+
+    Documents the renamer can name offline with enough confidence never
+    reach the model. Model calls for the rest run concurrently up to a fixed
+    limit, are paced by a token bucket to stay under the provider's rate
+    limit, and are each bounded by a timeout. A failed or timed-out call only
+    affects its own file, which gets the regex-based fallback name instead.
+    """
+
+    def __init__(
+        self,
+        renamer: RenamerService,
+        concurrency: int = 4,
+        rate_per_second: float = 2.0,
+        burst: int = 4,
+        timeout: float = 20.0,
+    ):
+        """
+        Args:
+            renamer: Service that extracts text and talks to the model
+            concurrency: Maximum number of files processed at the same time
+            rate_per_second: Sustained model calls per second
+            burst: Model calls allowed back to back before pacing kicks in
+            timeout: Seconds to wait for each model call
+        """
+        self.renamer = renamer
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.timeout = timeout
+
+    async def suggest_all(
+        self, files: Sequence[Tuple[str | Path, str]]
+    ) -> List[RenameSuggestion]:
+        """
+        Suggest filenames for every PDF.
+
+        Args:
+            files: Pairs of (stored PDF, current display name) to name; the
+                display name is reported as ``old_filename``, so suggestions
+                can be applied with the rename endpoints as they are
+
+        Returns:
+            One suggestion per PDF, in the same order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(pdf_path: Path, filename: str) -> RenameSuggestion:
+            async with semaphore:
+                return await self._suggest(pdf_path, filename)
+
+        return await asyncio.gather(
+            *(run(Path(pdf_path), filename) for pdf_path, filename in files)
+        )
+
+    async def _suggest(self, pdf_path: Path, filename: str) -> RenameSuggestion:
+        try:
+            # pdfplumber and OCR are blocking; keep them off the event loop
+            text = await asyncio.to_thread(self.renamer._extract_text_from_pdf, str(pdf_path))
+        except Exception as e:
+            return self._fallback(filename, Path(filename).stem, e)
+
+        # Clear documents are named offline; like cached ones, they skip the rate limiter
+        local = self.renamer.local_suggestion(text)
+        if local is not None:
+            return RenameSuggestion(
+                old_filename=filename,
+                new_filename=local.name,
+                source=LOCAL,
+                confidence=local.confidence,
+            )
+
+        # Cached suggestions cost no model call, so they skip the rate limiter too;
+        # a memory miss reads the on-disk store, so the lookup runs off the event loop
+        cached = await asyncio.to_thread(self.renamer.cached_suggestion, text)
+        if cached is not None:
+            return RenameSuggestion(old_filename=filename, new_filename=cached, source=CACHE)
+
+        await self.rate_limiter.acquire()
+        try:
+            name = await asyncio.wait_for(self.renamer._ask_model(text), self.timeout)
+        except asyncio.TimeoutError:
+            return self._fallback(filename, text, f"Timed out after {self.timeout}s")
+        except Exception as e:
+            return self._fallback(filename, text, e)
+        if not name:
+            return self._fallback(filename, text, "Model returned an empty name")
+
+        return RenameSuggestion(old_filename=filename, new_filename=name, source=MODEL)
+
+    def summarize(self, suggestions: Sequence[RenameSuggestion]) -> RenameSummary:
+        """
+        Report the share of a job named without the model and the time that saved.
+
+        Args:
+            suggestions: Result of ``suggest_all``
+
+        Returns:
+            Counts per source, local fraction and estimated seconds saved
+        """
+        sources = dict.fromkeys((LOCAL, CACHE, MODEL, FALLBACK), 0)
+        for suggestion in suggestions:
+            sources[suggestion.source] += 1
+        skipped = sources[LOCAL] + sources[CACHE]
+        model_seconds = self.renamer.model_seconds
+        return RenameSummary(
+            files=len(suggestions),
+            sources=sources,
+            local_fraction=skipped / len(suggestions) if suggestions else 0.0,
+            estimated_seconds_saved=(
+                round(skipped * model_seconds, 3) if model_seconds is not None else None
+            ),
+        )
+
+    def _fallback(self, filename: str, text: str, error) -> RenameSuggestion:
+        return RenameSuggestion(
+            old_filename=filename,
+            new_filename=self.renamer._generate_fallback_name(text),
+            source=FALLBACK,
+            error=str(error) or type(error).__name__,
+        )
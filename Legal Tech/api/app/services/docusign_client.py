@@ -1,17 +1,34 @@
-from docusign_esign import EnvelopeDefinition, Document, Signer, SignHere, Tabs, EnvelopesApi
-from docusign_esign.client.api_client import ApiClient
-from typing import List, Dict
+import base64
+from typing import List, Dict, Optional
 import os
-from .signature_detector import SignatureDetector
+from .anchor_index import SignatureAnchorIndexer
 
 class DocuSignClient:
-    def __init__(self, account_id: str, access_token: str, base_path: str):
-        """Initialize DocuSign client with account credentials."""
+    def __init__(
+        self,
+        account_id: str,
+        access_token: str,
+        base_path: str,
+        anchors: Optional[SignatureAnchorIndexer] = None,
+    ):
+        """Initialize DocuSign client with account credentials.
+
+        Args:
+            account_id: DocuSign account ID
+            access_token: OAuth access token
+            base_path: REST API base path
+            anchors: Finds and caches signature locations; a default one if None
+        """
+        # The DocuSign SDK is large; load it only once a client is created
+        from docusign_esign import EnvelopesApi
+        from docusign_esign.client.api_client import ApiClient
+
         self.account_id = account_id
         self.api_client = ApiClient()
         self.api_client.host = base_path
         self.api_client.set_default_header("Authorization", f"Bearer {access_token}")
         self.envelopes_api = EnvelopesApi(self.api_client)
+        self.anchors = anchors if anchors is not None else SignatureAnchorIndexer()
 
     def create_envelope(
         self,
@@ -22,6 +39,11 @@ class DocuSignClient:
         """
         Create a DocuSign envelope with signature tabs placed at detected signature locations.
         
+        The document is scanned once for all of its signature locations (or
+        its stored anchor index is reused), and each recipient's tab is then
+        looked up from it: the n-th recipient signing on a page gets the n-th
+        signature location on that page.
+        
         Args:
             subject: Email subject for the envelope
             pdf_path: Path to the PDF document
@@ -29,38 +51,40 @@ class DocuSignClient:
             
         Returns:
             str: The created envelope ID
+            
+        Raises:
+            ValueError: If a recipient's page has no signature location left
         """
+        from docusign_esign import Document, EnvelopeDefinition, Signer, SignHere, Tabs
+
         # Read the PDF file
         with open(pdf_path, 'rb') as file:
             pdf_bytes = file.read()
 
         # Create document object
         document = Document(
-            document_base64=pdf_bytes,
+            document_base64=base64.b64encode(pdf_bytes).decode("ascii"),
             name=os.path.basename(pdf_path),
             file_extension='pdf',
             document_id='1'
         )
 
-        # Initialize signature detector
-        signature_detector = SignatureDetector(pdf_path)
+        # One scan finds every signature location; recipients are then lookups
+        index = self.anchors.index(pdf_path)
+        try:
+            placements = index.assign([int(recipient['page_no']) for recipient in recipients])
+        except LookupError as e:
+            raise ValueError(str(e)) from e
 
         # Create signers with signature tabs
         signers = []
-        for recipient in recipients:
-            # Get signature coordinates for the specified page
-            signature_coords = signature_detector.detect_signature(recipient['page_no'])
-            
-            if not signature_coords:
-                raise ValueError(f"No signature location found on page {recipient['page_no']}")
-
-            # Create sign here tab
+        for recipient, anchor in zip(recipients, placements, strict=True):
+            # Create sign here tab at the anchor's position on its page
             sign_here = SignHere(
-                anchor_string="Signature",
-                anchor_units="pixels",
-                anchor_x_offset=str(signature_coords['x']),
-                anchor_y_offset=str(signature_coords['y']),
-                page_number=str(recipient['page_no'])
+                document_id='1',
+                page_number=str(anchor.page),
+                x_position=str(round(anchor.x)),
+                y_position=str(round(anchor.y)),
             )
 
             # Create tabs object
@@ -90,4 +114,4 @@ class DocuSignClient:
             envelope_definition=envelope_definition
         )
 
-        return envelope_summary.envelope_id 
\ No newline at end of file
+        return envelope_summary.envelope_id 
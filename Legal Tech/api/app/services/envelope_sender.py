@@ -0,0 +1,263 @@
+import asyncio
+import base64
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+from pydantic import BaseModel
+
+from app.services.anchor_index import SignatureAnchorIndexer
+
+SENT = "sent"
+FAILED = "failed"
+
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Failures of requests that never reached the API, and so created nothing
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Hidden envelope custom field holding the key that identifies a send across retries
+KEY_FIELD = "bulkSendKey"
+
+
+class EnvelopeRequest(BaseModel):
+    """One envelope of a bulk send: a document and the people who sign it"""
+    pdf_path: str
+    subject: str
+    # Dictionaries with name, email and page_no, as for DocuSignClient.create_envelope
+    recipients: List[Dict[str, str]]
+
+
+class EnvelopeResult(BaseModel):
+    """Outcome of sending one envelope"""
+    pdf_path: str
+    status: str
+    envelope_id: Optional[str] = None
+    # Requests made, including retries; 0 if the envelope could not be built
+    attempts: int = 0
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    # Value of the envelope's KEY_FIELD custom field, to find it if the outcome is unclear
+    key: Optional[str] = None
+
+
+class BulkEnvelopeSender:
+    """Sends many envelopes to the eSignature REST API at once.
+
+    All envelopes of a run share one pool of keep-alive HTTP connections, and
+    at most ``concurrency`` are built and in flight at a time, so a run of
+    hundreds of envelopes neither opens a connection per envelope nor holds
+    every document in memory. Rate-limited (429) and failed (5xx) requests
+    are retried with exponential backoff and jitter, honouring Retry-After.
+    Each envelope gets its own result; one failure does not stop the run.
+
+    Creating an envelope is not idempotent, so a request is only resent
+    blindly when it provably created nothing: the connection failed, or the
+    API answered 429, or 503 with Retry-After. After any other failure the
+    envelope may exist, so the sender first looks it up by the unique key
+    stored in its hidden custom field and only resends if it is not found.
+    """
+
+    def __init__(
+        self,
+        account_id: str,
+        access_token: str,
+        base_path: str,
+        anchors: Optional[SignatureAnchorIndexer] = None,
+        concurrency: int = 8,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            account_id: DocuSign account ID
+            access_token: OAuth access token
+            base_path: REST API base path, e.g. ``https://demo.docusign.net/restapi``
+            anchors: Finds and caches signature locations; a default one if None
+            concurrency: Envelopes built and sent at the same time, and the
+                size of the connection pool
+            max_retries: Retries per envelope after the first attempt
+            backoff: Seconds before the first retry; doubled for each next one
+            max_backoff: Longest wait between two attempts
+            timeout: Seconds allowed for each request
+            transport: Optional httpx transport, replaceable for tests
+        """
+        self.url = f"{base_path.rstrip('/')}/v2.1/accounts/{account_id}/envelopes"
+        self.access_token = access_token
+        self.anchors = anchors if anchors is not None else SignatureAnchorIndexer()
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.transport = transport
+
+    def _definition(self, envelope: EnvelopeRequest, key: str) -> dict:
+        """The envelope definition JSON, with tabs placed from the anchor index."""
+        index = self.anchors.index(envelope.pdf_path)
+        try:
+            placements = index.assign([int(r["page_no"]) for r in envelope.recipients])
+        except LookupError as e:
+            raise ValueError(str(e)) from e
+
+        signers = []
+        pairs = zip(envelope.recipients, placements, strict=True)
+        for n, (recipient, anchor) in enumerate(pairs, start=1):
+            signers.append(
+                {
+                    "email": recipient["email"],
+                    "name": recipient["name"],
+                    "recipientId": str(n),
+                    "routingOrder": str(n),
+                    "tabs": {
+                        "signHereTabs": [
+                            {
+                                "documentId": "1",
+                                "pageNumber": str(anchor.page),
+                                "xPosition": str(round(anchor.x)),
+                                "yPosition": str(round(anchor.y)),
+                            }
+                        ]
+                    },
+                }
+            )
+        document = base64.b64encode(Path(envelope.pdf_path).read_bytes()).decode("ascii")
+        return {
+            "emailSubject": envelope.subject,
+            "documents": [
+                {
+                    "documentBase64": document,
+                    "name": os.path.basename(envelope.pdf_path),
+                    "fileExtension": "pdf",
+                    "documentId": "1",
+                }
+            ],
+            "recipients": {"signers": signers},
+            "customFields": {
+                "textCustomFields": [
+                    {"name": KEY_FIELD, "value": key, "show": "false", "required": "false"}
+                ]
+            },
+            "status": "sent",
+        }
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        if response is not None:
+            try:
+                return min(float(response.headers["Retry-After"]), self.max_backoff)
+            except (KeyError, ValueError):
+                pass
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        # Full jitter keeps envelopes that failed together from retrying together
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    def _never_processed(response: httpx.Response) -> bool:
+        """Whether an error response guarantees that no envelope was created."""
+        return response.status_code == 429 or (
+            response.status_code == 503 and "Retry-After" in response.headers
+        )
+
+    async def _find_envelope(
+        self, client: httpx.AsyncClient, key: str, since: str
+    ) -> Optional[str]:
+        """ID of the envelope created with ``key`` since ``since``, or None if there is none."""
+        response = await client.get(
+            self.url, params={"from_date": since, "custom_field": f"{KEY_FIELD}={key}"}
+        )
+        response.raise_for_status()
+        envelopes = response.json().get("envelopes") or []
+        return envelopes[0]["envelopeId"] if envelopes else None
+
+    async def _deliver(
+        self, client: httpx.AsyncClient, definition: dict, result: EnvelopeResult
+    ) -> None:
+        """Create the envelope, retrying without ever creating it twice."""
+        # Lookups cover envelopes created from now on, with margin for clock skew
+        since = (datetime.now(timezone.utc) - timedelta(minutes=15)).isoformat()
+        # Whether an earlier attempt may have created the envelope
+        unsure = False
+        while True:
+            result.attempts += 1
+            response = None
+            try:
+                if unsure:
+                    envelope_id = await self._find_envelope(client, result.key, since)
+                    if envelope_id is not None:
+                        result.status = SENT
+                        result.envelope_id = envelope_id
+                        result.error = None
+                        return
+                    unsure = False
+                response = await client.post(self.url, json=definition)
+            except httpx.HTTPError as e:
+                result.status_code = None
+                result.error = str(e) or type(e).__name__
+                unsure = unsure or not isinstance(e, NOT_SENT_ERRORS)
+                retryable = True
+            else:
+                result.status_code = response.status_code
+                if response.is_success:
+                    result.status = SENT
+                    result.error = None
+                    result.envelope_id = response.json()["envelopeId"]
+                    return
+                result.error = response.text[:500] or response.reason_phrase
+                retryable = response.status_code in RETRY_STATUSES
+                unsure = not self._never_processed(response)
+            if not retryable or result.attempts > self.max_retries:
+                return
+            await asyncio.sleep(self._retry_delay(result.attempts, response))
+
+    async def _send(self, client: httpx.AsyncClient, envelope: EnvelopeRequest) -> EnvelopeResult:
+        start = time.perf_counter()
+        result = EnvelopeResult(pdf_path=envelope.pdf_path, status=FAILED, key=uuid.uuid4().hex)
+        try:
+            # Anchor lookup and base64 encoding read the PDF; keep them off the event loop
+            definition = await asyncio.to_thread(self._definition, envelope, result.key)
+            await self._deliver(client, definition, result)
+        except Exception as e:
+            # A malformed envelope or unreadable response fails only this envelope
+            result.status = FAILED
+            result.envelope_id = None
+            result.error = f"{type(e).__name__}: {e}"
+        result.seconds = time.perf_counter() - start
+        return result
+
+    async def send_all(self, envelopes: Sequence[EnvelopeRequest]) -> List[EnvelopeResult]:
+        """
+        Send every envelope.
+
+        Args:
+            envelopes: Envelopes to create and send
+
+        Returns:
+            One result per envelope, in the same order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        async with httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {self.access_token}"},
+            limits=limits,
+            timeout=self.timeout,
+            transport=self.transport,
+        ) as client:
+
+            async def run(envelope: EnvelopeRequest) -> EnvelopeResult:
+                async with semaphore:
+                    return await self._send(client, envelope)
+
+            return await asyncio.gather(*(run(envelope) for envelope in envelopes))
@@ -0,0 +1,286 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from app.services.manifest_store import Manifest, load_manifest, save_manifest
+from app.services.page_renderer import PageRenderer
+from app.services.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    from app.services.signature_detector import SignatureDetector
+
+# Called in the server process with (stage, unix timestamp) as a worker starts each stage
+StageCallback = Callable[[str, float], None]
+
+
+def _extract_file(
+    pdf_path: str,
+    out_dir: str,
+    detector_options: Dict[str, Any],
+    events=None,
+    token: Optional[str] = None,
+) -> Manifest:
+    """Worker entry point: run signature extraction for one PDF."""
+    on_stage = None
+    if events is not None:
+        on_stage = lambda stage: events.put((token, stage, time.time()))  # noqa: E731
+    # Imported here so the server process does not load the PDF stack at startup
+    from app.services.signature_detector import SignatureDetector
+
+    detector = SignatureDetector(**detector_options)
+    return detector.extract_pages(pdf_path, out_dir, on_stage=on_stage)
+
+
+class ExtractionEngine:
+    """Runs signature extraction for many PDFs across a pool of worker processes.
+
+    pdfplumber and PDFium work is CPU-bound, so it is dispatched to separate
+    processes and awaited from the event loop instead of being run inline.
+    Workers are started with ``spawn`` so the pool is safe to create from a
+    multi-threaded server process.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        detector_options: Optional[Dict[str, Any]] = None,
+        renderer: Optional[PageRenderer] = None,
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes. ``None`` or ``0`` uses one
+                worker per CPU.
+            cache: Optional result cache, checked before dispatching to a worker
+            detector_options: Keyword arguments for the workers' SignatureDetector
+            renderer: Optional page renderer used by ``render``
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.detector_options = detector_options or {}
+        self.renderer = renderer
+        self._detector: Optional["SignatureDetector"] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._events = None
+        self._events_lock = threading.Lock()
+        self._listeners: Dict[str, tuple] = {}
+        # Files whose stored manifest was current vs. files that had to be processed
+        self.reused = 0
+        self.processed = 0
+
+    @property
+    def detector(self) -> "SignatureDetector":
+        """Same configuration as the workers' detector; only used for cache keys.
+
+        Created on first use, which is when this process imports the PDF
+        libraries, rather than when the engine is built at startup.
+        """
+        if self._detector is None:
+            from app.services.signature_detector import SignatureDetector
+
+            self._detector = SignatureDetector(**self.detector_options)
+        return self._detector
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _event_queue(self):
+        """Queue that workers use to report stage changes, started on first use."""
+        with self._events_lock:
+            if self._events is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+                self._events = self._manager.Queue()
+                threading.Thread(
+                    target=self._pump_events, args=(self._events,), daemon=True
+                ).start()
+            return self._events
+
+    def _pump_events(self, events) -> None:
+        """Forward worker stage events to their listeners' event loops."""
+        while True:
+            try:
+                item = events.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            token, stage, timestamp = item
+            listener = self._listeners.get(token)
+            if listener is None:
+                continue
+            loop, callback, flushed = listener
+            if stage is None:
+                loop.call_soon_threadsafe(flushed.set_result, None)
+            else:
+                loop.call_soon_threadsafe(callback, stage, timestamp)
+
+    async def extract(
+        self,
+        pdf_path: str | Path,
+        out_dir: str | Path,
+        on_stage: Optional[StageCallback] = None,
+        content_hash: Optional[str] = None,
+    ) -> Manifest:
+        """
+        Extract signature pages from one PDF in a worker process.
+
+        A manifest stored in ``out_dir`` by an earlier run is returned as is
+        when the PDF and detector configuration are unchanged and its outputs
+        still exist. Otherwise the result cache, when configured, is checked
+        before dispatching to a worker.
+
+        Args:
+            pdf_path: Path to the PDF file
+            out_dir: Directory to save extracted pages and images
+            on_stage: Optional callback run on the event loop with the stage name
+                and start timestamp as the worker enters each stage. Every stage
+                event is delivered before this call returns.
+            content_hash: SHA-256 of the PDF if already known
+
+        Returns:
+            Dictionary mapping page numbers to their PDF and PNG file paths
+        """
+        fingerprint = self.detector.config_fingerprint()
+        # Hashing, stat calls and file placement are I/O bound; keep them off the event loop
+        manifest = await asyncio.to_thread(
+            load_manifest, pdf_path, out_dir, fingerprint, content_hash
+        )
+        if manifest is not None:
+            self.reused += 1
+            return manifest
+        self.processed += 1
+
+        if self.cache is None:
+            manifest = await self._extract_in_worker(pdf_path, out_dir, on_stage)
+        else:
+            key = await asyncio.to_thread(self.detector.cache_key, pdf_path, content_hash)
+            manifest = await asyncio.to_thread(self.cache.get, key, Path(pdf_path).stem, out_dir)
+            if manifest is None:
+                manifest = await self._extract_in_worker(pdf_path, out_dir, on_stage)
+                await asyncio.to_thread(self.cache.put, key, manifest)
+        await asyncio.to_thread(
+            save_manifest, pdf_path, out_dir, fingerprint, manifest, content_hash
+        )
+        return manifest
+
+    async def _extract_in_worker(
+        self, pdf_path: str | Path, out_dir: str | Path, on_stage: Optional[StageCallback]
+    ) -> Manifest:
+        loop = asyncio.get_running_loop()
+        if on_stage is None:
+            return await loop.run_in_executor(
+                self.executor, _extract_file, str(pdf_path), str(out_dir), self.detector_options
+            )
+
+        # Starting the queue's manager process on first use takes a while
+        events = await asyncio.to_thread(self._event_queue)
+        token = uuid.uuid4().hex
+        flushed = loop.create_future()
+        self._listeners[token] = (loop, on_stage, flushed)
+        try:
+            return await loop.run_in_executor(
+                self.executor,
+                _extract_file,
+                str(pdf_path),
+                str(out_dir),
+                self.detector_options,
+                events,
+                token,
+            )
+        finally:
+            # The worker's events were queued before it returned, so once this
+            # marker comes back through the same queue they have all been delivered.
+            # Putting it is a round trip to the queue's manager process
+            await asyncio.to_thread(events.put, (token, None, 0.0))
+            await asyncio.wait([flushed], timeout=5)
+            del self._listeners[token]
+
+    async def render(
+        self,
+        pdf_path: str | Path,
+        page_num: int,
+        dpi: int,
+        max_width: Optional[int] = None,
+        content_hash: Optional[str] = None,
+    ) -> Path:
+        """
+        Render one page to PNG in a worker process, reusing cached renders.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: 1-based page index
+            dpi: Render resolution
+            max_width: Downscale the render to at most this many pixels wide
+            content_hash: SHA-256 of the PDF if already known
+
+        Returns:
+            Path to the PNG in the render cache
+
+        Raises:
+            ValueError: If the page does not exist
+        """
+        if self.renderer is None:
+            raise RuntimeError("No page renderer configured")
+        if content_hash is not None:
+            cached = self.renderer.cached_path(content_hash, page_num, dpi, max_width)
+            if await asyncio.to_thread(cached.exists):
+                return cached
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            self.renderer.render,
+            str(pdf_path),
+            page_num,
+            dpi,
+            max_width,
+            content_hash,
+        )
+
+    async def extract_all(
+        self, files: Iterable[Tuple[Path, Path]]
+    ) -> AsyncIterator[Tuple[Path, Manifest]]:
+        """
+        Extract many PDFs concurrently, yielding each manifest as soon as it is ready.
+
+        Args:
+            files: Pairs of (PDF path, output directory)
+
+        Yields:
+            Pairs of (PDF path, manifest) in completion order
+        """
+
+        async def run(pdf_path: Path, out_dir: Path) -> Tuple[Path, Manifest]:
+            return pdf_path, await self.extract(pdf_path, out_dir)
+
+        tasks = [asyncio.ensure_future(run(pdf_path, out_dir)) for pdf_path, out_dir in files]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._events.put(None)
+            self._manager.shutdown()
+            self._manager = None
+            self._events = None
+        self._listeners.clear()
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.services.extraction_engine import ExtractionEngine, Manifest
+from app.services.job_state import (
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    FileState,
+    InMemoryJobStateBackend,
+    JobStateBackend,
+)
+from app.services.metadata_store import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress(BaseModel):
+    """File counts for a job"""
+    total: int
+    queued: int
+    processing: int
+    completed: int
+    failed: int
+
+
+class JobManifest(BaseModel):
+    """Response model for the job manifest endpoint"""
+    job_id: str
+    status: str
+    progress: JobProgress
+    files: List[FileState]
+
+
+class ExtractionPipeline:
+    """Runs signature extraction in the background as soon as files are uploaded.
+
+    Each file goes through detect -> subset -> render in an extraction worker
+    while its state, progress and per-stage timings are recorded in the job
+    state backend, so the manifest can be read from any worker process,
+    watchers are woken as soon as anything changes, and downloads can reuse
+    finished results.
+    """
+
+    def __init__(
+        self,
+        engine: ExtractionEngine,
+        store: Optional[MetadataStore] = None,
+        state: Optional[JobStateBackend] = None,
+    ):
+        """
+        Args:
+            engine: Runs the extraction work
+            store: Optional metadata index that finished files' artifacts are recorded in
+            state: Where job state is kept; defaults to this process's memory
+        """
+        self.engine = engine
+        self.store = store
+        self.state = state if state is not None else InMemoryJobStateBackend()
+        # Jobs running in this process, with their local paths and results
+        self.jobs: Dict[str, List[FileState]] = {}
+        self._tasks: Dict[str, List[asyncio.Task]] = {}
+        # Events set whenever a job running here changes, one per watcher
+        self._watchers: Dict[str, Set[asyncio.Event]] = {}
+
+    async def submit(
+        self, job_id: str, files: List[FileState], pdf_paths: List[Path], job_dir: Path
+    ) -> None:
+        """
+        Enqueue a job's files for extraction.
+
+        Args:
+            job_id: The job the files belong to
+            files: Initial state for each file
+            pdf_paths: Stored PDF for each file, in the same order
+            job_dir: Job directory; each PDF's output goes in a subdirectory named after it
+        """
+        # The backend write can wait on another worker's database lock
+        await asyncio.to_thread(self.state.create_job, job_id, files)
+        self.jobs[job_id] = files
+        tasks = []
+        for file_state, pdf_path in zip(files, pdf_paths, strict=True):
+            file_state._pdf_path = pdf_path
+            file_state._out_dir = job_dir / pdf_path.stem
+            tasks.append(asyncio.create_task(self._process(job_id, file_state)))
+        self._tasks[job_id] = tasks
+
+    def _transition(
+        self, job_id: str, file_state: FileState, status: str, timestamp: float, **changes
+    ) -> None:
+        """Record a transition in the backend and mirror the result locally."""
+        updated = self.state.transition(job_id, file_state.id, status, timestamp, **changes)
+        if updated is not None and updated is not file_state:
+            file_state.status = updated.status
+            file_state.timings = updated.timings
+            file_state.pages = updated.pages
+            file_state.error = updated.error
+            file_state._state_since = updated._state_since
+
+    def _notify(self, job_id: str) -> None:
+        """Wake everyone watching a job. Must run on the event loop."""
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+
+    async def _record_stage(
+        self,
+        job_id: str,
+        file_state: FileState,
+        stage: str,
+        timestamp: float,
+        previous: Optional[asyncio.Task],
+    ) -> None:
+        """Write a stage transition off the event loop, after the file's previous one."""
+        if previous is not None:
+            await asyncio.wait([previous])
+        await asyncio.to_thread(self._transition, job_id, file_state, stage, timestamp)
+        self._notify(job_id)
+
+    @staticmethod
+    def _log_stage_failure(task: asyncio.Task) -> None:
+        """Log a failed stage write; nothing else awaits its result."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.exception("Recording a stage transition failed", exc_info=task.exception())
+
+    async def _process(self, job_id: str, file_state: FileState) -> FileState:
+        last_stage: Optional[asyncio.Task] = None
+
+        def on_stage(stage: str, timestamp: float) -> None:
+            # Runs on the event loop. The write can wait on another worker's
+            # database lock, so it is queued behind the file's earlier writes
+            # instead of being made here
+            nonlocal last_stage
+            last_stage = asyncio.create_task(
+                self._record_stage(job_id, file_state, stage, timestamp, last_stage)
+            )
+            last_stage.add_done_callback(self._log_stage_failure)
+
+        try:
+            manifest = await self.engine.extract(
+                file_state._pdf_path,
+                file_state._out_dir,
+                on_stage=on_stage,
+                content_hash=file_state.sha256,
+            )
+            if self.store is not None:
+                await asyncio.to_thread(self.store.set_artifacts, file_state.id, manifest)
+        except asyncio.CancelledError:
+            if last_stage is not None:
+                last_stage.cancel()
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        else:
+            error = None
+        # The final state must not be overwritten by a stage write still queued
+        if last_stage is not None:
+            await asyncio.wait([last_stage])
+        if error is not None:
+            await asyncio.to_thread(
+                self._transition, job_id, file_state, FAILED, time.time(), error=error
+            )
+        else:
+            file_state._manifest = manifest
+            await asyncio.to_thread(
+                self._transition,
+                job_id,
+                file_state,
+                COMPLETED,
+                time.time(),
+                pages=sorted(manifest),
+            )
+        self._notify(job_id)
+        return file_state
+
+    def manifest(self, job_id: str) -> Optional[JobManifest]:
+        """
+        Build the current manifest for a job, wherever it is running.
+
+        Returns:
+            The manifest, or None if the job is unknown to the state backend
+        """
+        files = self.state.get_job(job_id)
+        if files is None:
+            return None
+
+        counts = {QUEUED: 0, COMPLETED: 0, FAILED: 0}
+        for file_state in files:
+            if file_state.status in counts:
+                counts[file_state.status] += 1
+        processing = len(files) - sum(counts.values())
+        status = "processing" if counts[QUEUED] or processing else COMPLETED
+
+        return JobManifest(
+            job_id=job_id,
+            status=status,
+            progress=JobProgress(
+                total=len(files),
+                queued=counts[QUEUED],
+                processing=processing,
+                completed=counts[COMPLETED],
+                failed=counts[FAILED],
+            ),
+            files=files,
+        )
+
+    async def watch(
+        self, job_id: str, poll_interval: float = 1.0
+    ) -> AsyncIterator[JobManifest]:
+        """
+        Yield a job's manifest every time it changes, until the job is done.
+
+        Jobs running in this process wake watchers on every state change.
+        Jobs running in another worker process are picked up by re-reading
+        the state backend every ``poll_interval`` seconds.
+
+        Args:
+            job_id: The job to watch
+            poll_interval: Seconds between backend reads when nothing was signalled
+
+        Yields:
+            The current manifest, then each changed manifest; the last one
+            yielded has status completed. Nothing is yielded for an unknown job.
+        """
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(event)
+        try:
+            last = None
+            while True:
+                # Cleared before reading, so a change during the read is not missed
+                event.clear()
+                manifest = await asyncio.to_thread(self.manifest, job_id)
+                if manifest is None:
+                    return
+                # Compare snapshots: in-memory state objects change in place
+                snapshot = manifest.model_dump_json()
+                if snapshot != last:
+                    yield manifest
+                    last = snapshot
+                if manifest.status == COMPLETED:
+                    return
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(event.wait(), poll_interval)
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(event)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def running_jobs(self) -> Set[str]:
+        """Jobs with files still being processed in this process."""
+        return {
+            job_id
+            for job_id, tasks in list(self._tasks.items())
+            if not all(task.done() for task in tasks)
+        }
+
+    def forget(self, job_id: str) -> None:
+        """Drop this process's results for a job, e.g. after its outputs were deleted."""
+        self.jobs.pop(job_id, None)
+        self._tasks.pop(job_id, None)
+
+    def delete(self, job_id: str) -> None:
+        """Forget a job here and in the state backend."""
+        self.forget(job_id)
+        self.state.delete_job(job_id)
+
+    async def wait(self, job_id: str) -> Dict[Path, Manifest]:
+        """
+        Wait for every file in a job to finish.
+
+        Returns:
+            Manifest of each successfully processed PDF, keyed by its path
+        """
+        await asyncio.gather(*self._tasks.get(job_id, []))
+        return {
+            file_state._pdf_path: file_state._manifest
+            for file_state in self.jobs.get(job_id, [])
+            if file_state.status == COMPLETED
+        }
+
+    async def results(self, job_id: str) -> AsyncIterator[Tuple[Path, Manifest]]:
+        """
+        Yield each successfully processed PDF of a job as soon as it finishes.
+
+        Yields:
+            Pairs of (PDF path, manifest) in completion order
+        """
+        for next_done in asyncio.as_completed(self._tasks.get(job_id, [])):
+            file_state = await next_done
+            if file_state.status == COMPLETED:
+                yield file_state._pdf_path, file_state._manifest
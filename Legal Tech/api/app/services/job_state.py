@@ -0,0 +1,307 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from app.services.manifest_store import Manifest
+
+QUEUED = "queued"
+DETECTING = "detecting"
+SUBSETTING = "subsetting"
+RENDERING = "rendering"
+COMPLETED = "completed"
+FAILED = "failed"
+
+TERMINAL_STATES = {COMPLETED, FAILED}
+
+
+class FileState(BaseModel):
+    """Processing state of one uploaded PDF"""
+    id: str
+    filename: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    status: str = QUEUED
+    pages: List[int] = Field(default_factory=list)
+    # Seconds spent in each state, filled in as the file moves through the pipeline
+    timings: Dict[str, float] = Field(default_factory=dict)
+    error: Optional[str] = None
+
+    _pdf_path: Path = PrivateAttr()
+    _out_dir: Path = PrivateAttr()
+    _manifest: Manifest = PrivateAttr(default_factory=dict)
+    _state_since: float = PrivateAttr(default_factory=time.time)
+
+    @property
+    def state_since(self) -> float:
+        """When the file entered its current state."""
+        return self._state_since
+
+    def move_to(self, status: str, timestamp: float) -> None:
+        """Enter a new state, recording how long the previous one lasted."""
+        self.timings[self.status] = round(max(timestamp - self._state_since, 0.0), 4)
+        self.status = status
+        self._state_since = timestamp
+
+
+def apply_transition(
+    file_state: FileState,
+    status: str,
+    timestamp: float,
+    pages: Optional[List[int]] = None,
+    error: Optional[str] = None,
+    expected: Optional[Collection[str]] = None,
+) -> bool:
+    """
+    Move a file to a new state unless the transition is not allowed.
+
+    Files never leave a terminal state, and when ``expected`` is given the
+    file must currently be in one of those states.
+
+    Returns:
+        Whether the transition was applied
+    """
+    if file_state.status in TERMINAL_STATES:
+        return False
+    if expected is not None and file_state.status not in expected:
+        return False
+    file_state.move_to(status, timestamp)
+    if pages is not None:
+        file_state.pages = pages
+    if error is not None:
+        file_state.error = error
+    return True
+
+
+class JobStateBackend(ABC):
+    """Where the processing state of jobs and their files is kept.
+
+    Every transition is atomic with respect to other callers of the same
+    backend, including other processes for backends that support it, so
+    any worker can report a job's manifest regardless of which one runs it.
+    """
+
+    @abstractmethod
+    def create_job(self, job_id: str, files: List[FileState]) -> None:
+        """Record a new job with its files in their initial state."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[List[FileState]]:
+        """Current state of a job's files, or None if the job is unknown."""
+
+    @abstractmethod
+    def transition(
+        self,
+        job_id: str,
+        file_id: str,
+        status: str,
+        timestamp: float,
+        pages: Optional[List[int]] = None,
+        error: Optional[str] = None,
+        expected: Optional[Collection[str]] = None,
+    ) -> Optional[FileState]:
+        """
+        Atomically move a file to a new state.
+
+        Args:
+            job_id: The job containing the file
+            file_id: The file to update
+            status: New state
+            timestamp: When the new state was entered
+            pages: Detected signature pages, if known
+            error: Failure message, if any
+            expected: Only apply the transition if the file is in one of these states
+
+        Returns:
+            The updated file, or None if the file is unknown, already in a
+            terminal state or not in an ``expected`` state
+        """
+
+    @abstractmethod
+    def set_filename(self, job_id: str, file_id: str, filename: str) -> None:
+        """Change a file's display name."""
+
+    @abstractmethod
+    def delete_job(self, job_id: str) -> None:
+        """Forget a job and its files."""
+
+
+class InMemoryJobStateBackend(JobStateBackend):
+    """Job state held in this process only; for a single worker and tests."""
+
+    def __init__(self):
+        self._jobs: Dict[str, List[FileState]] = {}
+        self._lock = threading.Lock()
+
+    def create_job(self, job_id: str, files: List[FileState]) -> None:
+        with self._lock:
+            self._jobs[job_id] = files
+
+    def get_job(self, job_id: str) -> Optional[List[FileState]]:
+        with self._lock:
+            files = self._jobs.get(job_id)
+            return list(files) if files is not None else None
+
+    def _find(self, job_id: str, file_id: str) -> Optional[FileState]:
+        return next((f for f in self._jobs.get(job_id, []) if f.id == file_id), None)
+
+    def transition(
+        self,
+        job_id: str,
+        file_id: str,
+        status: str,
+        timestamp: float,
+        pages: Optional[List[int]] = None,
+        error: Optional[str] = None,
+        expected: Optional[Collection[str]] = None,
+    ) -> Optional[FileState]:
+        with self._lock:
+            file_state = self._find(job_id, file_id)
+            if file_state is None:
+                return None
+            if not apply_transition(file_state, status, timestamp, pages, error, expected):
+                return None
+            return file_state
+
+    def set_filename(self, job_id: str, file_id: str, filename: str) -> None:
+        with self._lock:
+            file_state = self._find(job_id, file_id)
+            if file_state is not None:
+                file_state.filename = filename
+
+    def delete_job(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class SqliteJobStateBackend(JobStateBackend):
+    """Job state in a local SQLite database shared by every worker process.
+
+    Transitions read and write a file's row inside one ``BEGIN IMMEDIATE``
+    transaction, so concurrent workers never lose or interleave updates, and
+    WAL mode lets manifest reads proceed while another process writes.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Durable enough for progress reporting, and no fsync per stage change
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_files ("
+            "job_id TEXT NOT NULL, file_id TEXT NOT NULL, position INTEGER NOT NULL, "
+            "state_since REAL NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, file_id))"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _load(state_since: float, data: str) -> FileState:
+        file_state = FileState.model_validate_json(data)
+        file_state._state_since = state_since
+        return file_state
+
+    def create_job(self, job_id: str, files: List[FileState]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO job_files (job_id, file_id, position, state_since, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, f.id, position, f._state_since, f.model_dump_json())
+                    for position, f in enumerate(files)
+                ],
+            )
+
+    def get_job(self, job_id: str) -> Optional[List[FileState]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state_since, data FROM job_files WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        if not rows:
+            return None
+        return [self._load(*row) for row in rows]
+
+    def _update(self, job_id: str, file_id: str, change) -> Optional[FileState]:
+        """Apply ``change`` to a file's state in one transaction; it returns False to abort."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT state_since, data FROM job_files WHERE job_id = ? AND file_id = ?",
+                (job_id, file_id),
+            ).fetchone()
+            if row is None:
+                return None
+            file_state = self._load(*row)
+            if change(file_state) is False:
+                return None
+            conn.execute(
+                "UPDATE job_files SET state_since = ?, data = ? WHERE job_id = ? AND file_id = ?",
+                (file_state._state_since, file_state.model_dump_json(), job_id, file_id),
+            )
+        return file_state
+
+    def transition(
+        self,
+        job_id: str,
+        file_id: str,
+        status: str,
+        timestamp: float,
+        pages: Optional[List[int]] = None,
+        error: Optional[str] = None,
+        expected: Optional[Collection[str]] = None,
+    ) -> Optional[FileState]:
+        return self._update(
+            job_id,
+            file_id,
+            lambda f: apply_transition(f, status, timestamp, pages, error, expected),
+        )
+
+    def set_filename(self, job_id: str, file_id: str, filename: str) -> None:
+        self._update(job_id, file_id, lambda f: setattr(f, "filename", filename))
+
+    def delete_job(self, job_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_state_backend(kind: str, db_path: str | Path) -> JobStateBackend:
+    """
+    Build the configured job state backend.
+
+    Args:
+        kind: "sqlite" to share state between worker processes, or "memory"
+        db_path: Database file for the SQLite backend
+
+    Returns:
+        The backend
+    """
+    if kind == "sqlite":
+        return SqliteJobStateBackend(db_path)
+    if kind == "memory":
+        return InMemoryJobStateBackend()
+    raise ValueError(f"Unknown job state backend: {kind}")
@@ -0,0 +1,178 @@
+from typing import List, Tuple
+
+import numpy as np
+import pypdfium2.raw as pdfium_c
+from pydantic import BaseModel
+
+from app.services.pdf_document import PdfDocumentSession
+
+VECTOR = "vector"
+RASTER = "raster"
+
+
+class SignatureLine(BaseModel):
+    """A horizontal stroke long enough to be a signature line"""
+    page: int
+    # (x0, top, x1, bottom) in PDF points, measured from the top-left like pdfplumber
+    bbox: Tuple[float, float, float, float]
+    source: str
+
+
+class SignatureLineDetector:
+    """Finds drawn signature lines on pages that have no typed underscores.
+
+    Vector lines and thin rectangles are read straight from the page objects.
+    Pages that only contain images (scans) are rendered at a low resolution
+    and searched for long, dark horizontal runs with vectorized NumPy.
+    """
+
+    def __init__(
+        self,
+        min_length: float = 144,
+        max_thickness: float = 4,
+        raster_dpi: int = 50,
+        dark_threshold: int = 128,
+    ):
+        """
+        Args:
+            min_length: Shortest stroke that counts as a signature line, in points
+            max_thickness: Thickest stroke that still counts as a line, in points
+            raster_dpi: Resolution used to search image-only pages
+            dark_threshold: Gray level (0-255) below which a pixel counts as ink
+        """
+        self.min_length = min_length
+        self.max_thickness = max_thickness
+        self.raster_dpi = raster_dpi
+        self.dark_threshold = dark_threshold
+
+    def detect(self, session: PdfDocumentSession) -> List[SignatureLine]:
+        """
+        Find signature lines on every page of a document.
+
+        Args:
+            session: Parsed PDF document
+
+        Returns:
+            Detected lines, in page order
+        """
+        lines = []
+        for page_num in range(1, session.page_count + 1):
+            lines.extend(self.detect_page(session, page_num))
+        return lines
+
+    def detect_page(self, session: PdfDocumentSession, page_num: int) -> List[SignatureLine]:
+        """
+        Find signature lines on one page.
+
+        Args:
+            session: Parsed PDF document
+            page_num: 1-based page index
+
+        Returns:
+            Vector lines, or raster lines if the page only contains images
+        """
+        with session.pdfium_page(page_num) as page:
+            lines, has_images = self._vector_lines(page, page_num)
+            if lines or not has_images:
+                return lines
+
+            textpage = page.get_textpage()
+            try:
+                has_text = textpage.count_chars() > 0
+            finally:
+                textpage.close()
+            if has_text:
+                return []
+            return self._raster_lines(page, page_num)
+
+    def _vector_lines(self, page, page_num: int) -> Tuple[List[SignatureLine], bool]:
+        """Horizontal path objects on the page, and whether it has any images."""
+        page_height = page.get_height()
+        lines = []
+        has_images = False
+        for obj in page.get_objects(
+            filter=[pdfium_c.FPDF_PAGEOBJ_PATH, pdfium_c.FPDF_PAGEOBJ_IMAGE]
+        ):
+            if obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+                has_images = True
+                continue
+            left, bottom, right, top = obj.get_pos()
+            if right - left >= self.min_length and top - bottom <= self.max_thickness:
+                lines.append(
+                    SignatureLine(
+                        page=page_num,
+                        bbox=(left, page_height - top, right, page_height - bottom),
+                        source=VECTOR,
+                    )
+                )
+        return lines, has_images
+
+    def _raster_lines(self, page, page_num: int) -> List[SignatureLine]:
+        """Long dark horizontal runs in a low-resolution grayscale render."""
+        scale = self.raster_dpi / 72
+        # Nearest-neighbour downsampling is much cheaper than smoothing and
+        # keeps strokes at full darkness instead of averaging them towards white
+        bitmap = page.render(scale=scale, grayscale=True, no_smoothimage=True)
+        pixels = bitmap.to_numpy()
+        if pixels.ndim == 3:
+            pixels = pixels[..., 0]
+        runs = horizontal_runs(pixels < self.dark_threshold, int(self.min_length * scale))
+
+        lines = []
+        max_rows = max(int(self.max_thickness * scale), 1)
+        for row_start, row_end, x0, x1 in merge_runs(runs):
+            if row_end - row_start + 1 > max_rows:
+                continue  # A filled block, not a stroke
+            lines.append(
+                SignatureLine(
+                    page=page_num,
+                    bbox=(x0 / scale, row_start / scale, x1 / scale, (row_end + 1) / scale),
+                    source=RASTER,
+                )
+            )
+        return lines
+
+
+def horizontal_runs(mask: np.ndarray, min_length: int) -> np.ndarray:
+    """
+    Find horizontal runs of True pixels at least ``min_length`` long.
+
+    Args:
+        mask: 2-D boolean image
+        min_length: Shortest run to keep, in pixels
+
+    Returns:
+        Array of (row, start column, end column) rows, end exclusive, in
+        row-major order
+    """
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    # Starts and ends pair up because both are listed in row-major order
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    keep = ends - starts >= min_length
+    return np.column_stack((rows[keep], starts[keep], ends[keep]))
+
+
+def merge_runs(runs: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Merge runs on adjacent rows that overlap horizontally into single strokes.
+
+    Args:
+        runs: Output of ``horizontal_runs``
+
+    Returns:
+        (first row, last row, start column, end column) of each stroke
+    """
+    strokes: List[List[int]] = []
+    for row, start, end in runs.tolist():
+        for stroke in strokes:
+            if stroke[1] >= row - 1 and start < stroke[3] and end > stroke[2]:
+                stroke[1] = row
+                stroke[2] = min(stroke[2], start)
+                stroke[3] = max(stroke[3], end)
+                break
+        else:
+            strokes.append([row, row, start, end])
+    return [tuple(stroke) for stroke in strokes]
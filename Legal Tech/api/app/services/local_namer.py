@@ -0,0 +1,250 @@
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = (
+    r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+_ORDINAL = r"(?:st|nd|rd|th)?"
+
+# (pattern, group order) for each supported date format
+_DATE_PATTERNS = [
+    # 2024-03-15, 2024/03/15, 2024.03.15
+    (re.compile(r"\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b"), "ymd"),
+    # 03/15/2024, 3-15-2024; read as day first when the first number cannot be a month
+    (re.compile(r"\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b"), "mdy"),
+    # March 15, 2024 / Mar. 15th 2024
+    (re.compile(rf"\b{_MONTH}\s+(\d{{1,2}}){_ORDINAL},?\s+(\d{{4}})\b", re.I), "Mdy"),
+    # 15 March 2024 / 15th day of March, 2024
+    (
+        re.compile(rf"\b(\d{{1,2}}){_ORDINAL}\s+(?:day\s+of\s+)?{_MONTH},?\s+(\d{{4}})\b", re.I),
+        "dMy",
+    ),
+]
+# Words that mark the date a document is dated or takes effect, shortly before the date
+_DATE_ANCHOR = re.compile(
+    r"(dated|effective|as of|entered into|made on|executed on|date[d]?:)[^.\n]{0,30}$", re.I
+)
+
+# Document types, most specific first; the earliest mention in the text wins
+_DOC_TYPES = [
+    (r"non[- ]?disclosure agreement|confidentiality agreement|\bnda\b", "nda"),
+    (r"master services? agreement", "msa"),
+    (r"statement of work", "sow"),
+    (r"memorandum of understanding", "mou"),
+    (r"letter of intent", "loi"),
+    (r"employment agreement", "employment_agreement"),
+    (r"offer letter", "offer_letter"),
+    (r"engagement letter", "engagement_letter"),
+    (r"(?:asset|stock|share)? ?purchase agreement", "purchase_agreement"),
+    (r"loan agreement|credit agreement", "loan_agreement"),
+    (r"promissory note", "promissory_note"),
+    (r"settlement agreement", "settlement_agreement"),
+    (r"operating agreement", "operating_agreement"),
+    (r"partnership agreement", "partnership_agreement"),
+    (r"licen[cs]e agreement", "license_agreement"),
+    (r"consulting agreement", "consulting_agreement"),
+    (r"services? agreement", "services_agreement"),
+    (r"lease agreement|\blease\b", "lease"),
+    (r"power of attorney", "power_of_attorney"),
+    (r"last will and testament", "will"),
+    (r"\bamendment\b", "amendment"),
+    (r"\baddendum\b", "addendum"),
+    (r"\binvoice\b", "invoice"),
+    (r"\baffidavit\b", "affidavit"),
+    (r"\bsubpoena\b", "subpoena"),
+    (r"\bcomplaint\b", "complaint"),
+    (r"\bmotion\b", "motion"),
+    (r"board resolutions?|written consent", "resolution"),
+    (r"\bbylaws\b", "bylaws"),
+]
+_DOC_TYPES = [(re.compile(pattern, re.I), label) for pattern, label in _DOC_TYPES]
+# Says what the document is, but not which kind of agreement
+_GENERIC_DOC_TYPE = re.compile(r"\bagreement\b|\bcontract\b", re.I)
+
+_NAME = r"[A-Z][\w&'-]*(?:\s+(?:of|&|[A-Z][\w&'-]*))*"
+# Legal-entity suffixes; not part of the name used in filenames
+_SUFFIXES = [
+    "Inc", "LLC", "L.L.C", "Ltd", "Limited", "Corp", "Corporation", "Co",
+    "LLP", "LP", "L.P", "GmbH", "plc", "N.A",
+]
+# Organisations: capitalised words followed by a legal-entity suffix
+_COMPANY = re.compile(
+    rf"\b({_NAME}),?\s+(?:{'|'.join(re.escape(s) for s in _SUFFIXES)})\b\.?"
+)
+# People or organisations named in a "between X and Y" clause
+_BETWEEN = re.compile(rf"\bbetween\s+({_NAME})[^;]{{0,80}}?\s+and\s+({_NAME})")
+# Capitalised words that start sentences or clauses rather than names
+_NOT_NAMES = {"the", "this", "that", "by", "and", "between", "party", "parties", "agreement"}
+
+# Confidence contributed by each signal; a document scoring at least the
+# renamer's threshold (0.8 by default) needs a date and a document type,
+# plus a party unless the type is specific
+DATE_WEIGHT = 0.4
+AMBIGUOUS_DATE_WEIGHT = 0.25
+DOC_TYPE_WEIGHT = 0.35
+GENERIC_DOC_TYPE_WEIGHT = 0.2
+PARTY_WEIGHT = 0.15
+TWO_PARTIES_WEIGHT = 0.25
+
+
+class LocalSuggestion(BaseModel):
+    """Filename derived from a document's text without the model"""
+    name: str
+    # 0 to 1; how much of a date, a document type and parties was found
+    confidence: float
+    date: Optional[str] = None
+    doc_type: Optional[str] = None
+    parties: List[str] = []
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+class LocalNamer:
+    """Deterministic filename suggestions from dates, document types and parties.
+
+    Legal documents usually state on their first page what they are, who
+    they are between and when they were made. This reads those from the text
+    with regular expressions and scores how complete the result is, so that
+    well-formed documents can be named without a model round trip. Names
+    follow the model prompt's format: ``YYYY-MM-DD_<type>_<parties>``.
+    """
+
+    def __init__(self, max_length: int = 60):
+        """
+        Args:
+            max_length: Longest name to suggest; parties are dropped to fit
+        """
+        self.max_length = max_length
+
+    def find_date(self, text: str) -> Tuple[Optional[str], bool]:
+        """
+        The document's date in ISO format.
+
+        A date introduced by words like "dated" or "effective" is preferred;
+        otherwise the first date in the text is used.
+
+        Returns:
+            The date, or None, and whether it is unambiguous: anchored, or
+            the only distinct date in the text
+        """
+        found = []
+        for pattern, order in _DATE_PATTERNS:
+            for match in pattern.finditer(text):
+                parsed = self._parse_date(match.groups(), order)
+                if parsed is not None:
+                    anchored = _DATE_ANCHOR.search(text[max(match.start() - 40, 0):match.start()])
+                    found.append((match.start(), parsed, anchored is not None))
+        if not found:
+            return None, False
+        found.sort()
+        for _, parsed, anchored in found:
+            if anchored:
+                return parsed, True
+        return found[0][1], len({parsed for _, parsed, _ in found}) == 1
+
+    @staticmethod
+    def _parse_date(groups: Tuple[str, ...], order: str) -> Optional[str]:
+        try:
+            if order == "ymd":
+                year, month, day = (int(g) for g in groups)
+            elif order == "mdy":
+                month, day, year = (int(g) for g in groups)
+                if month > 12:
+                    month, day = day, month
+            elif order == "Mdy":
+                month, day, year = _MONTHS[groups[0][:3].lower()], int(groups[1]), int(groups[2])
+            else:
+                day, month, year = int(groups[0]), _MONTHS[groups[1][:3].lower()], int(groups[2])
+            if not 1900 <= year <= 2100:
+                return None
+            return date(year, month, day).isoformat()
+        except (KeyError, ValueError):
+            return None
+
+    def find_doc_type(self, text: str) -> Tuple[Optional[str], bool]:
+        """
+        The kind of document, e.g. ``nda`` or ``lease``.
+
+        Returns:
+            The type, or None, and whether it is specific rather than just
+            "agreement"
+        """
+        best = None
+        for pattern, label in _DOC_TYPES:
+            match = pattern.search(text)
+            if match is not None and (best is None or match.start() < best[0]):
+                best = (match.start(), label)
+        if best is not None:
+            return best[1], True
+        if _GENERIC_DOC_TYPE.search(text):
+            return "agreement", False
+        return None, False
+
+    def find_parties(self, text: str) -> List[str]:
+        """Up to two party names: organisations first, then a "between" clause."""
+        parties: List[str] = []
+
+        def add(name: str) -> None:
+            words = [
+                w
+                for w in name.split()
+                if w.lower() not in _NOT_NAMES and w.rstrip(".,") not in _SUFFIXES
+            ]
+            slug = _slug(" ".join(words[:2]))
+            if slug and slug not in parties and len(parties) < 2:
+                parties.append(slug)
+
+        for match in _COMPANY.finditer(text):
+            add(match.group(1))
+        if len(parties) < 2:
+            match = _BETWEEN.search(text)
+            if match is not None:
+                add(match.group(1))
+                add(match.group(2))
+        return parties
+
+    def suggest(self, text: str) -> LocalSuggestion:
+        """
+        Name a document from its text.
+
+        Args:
+            text: Text of the start of the document
+
+        Returns:
+            The suggested name and how confident the suggestion is
+        """
+        found_date, date_certain = self.find_date(text)
+        doc_type, type_specific = self.find_doc_type(text)
+        parties = self.find_parties(text)
+
+        confidence = 0.0
+        if found_date:
+            confidence += DATE_WEIGHT if date_certain else AMBIGUOUS_DATE_WEIGHT
+        if doc_type:
+            confidence += DOC_TYPE_WEIGHT if type_specific else GENERIC_DOC_TYPE_WEIGHT
+        if parties:
+            confidence += TWO_PARTIES_WEIGHT if len(parties) > 1 else PARTY_WEIGHT
+
+        parts = [p for p in (found_date, doc_type) if p]
+        name = "_".join(parts + parties)
+        # Drop parties from the end until the name fits
+        while len(name) > self.max_length and len(parts) < len(parts + parties):
+            parties = parties[:-1]
+            name = "_".join(parts + parties)
+        return LocalSuggestion(
+            name=name[: self.max_length],
+            confidence=round(min(confidence, 1.0), 2),
+            date=found_date,
+            doc_type=doc_type,
+            parties=parties,
+        )
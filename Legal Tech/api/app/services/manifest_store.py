@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.services.atomic_write import atomic_write_text
+from app.services.result_cache import file_digest
+
+# Maps page numbers to their subset PDF and PNG file paths
+Manifest = Dict[int, Dict[str, str]]
+
+MANIFEST_FILE = "manifest.json"
+
+
+def manifest_path(out_dir: str | Path) -> Path:
+    """Where the manifest of a PDF's extraction is kept: in its output directory."""
+    return Path(out_dir) / MANIFEST_FILE
+
+
+def load_manifest(
+    pdf_path: str | Path,
+    out_dir: str | Path,
+    detector_fingerprint: str,
+    content_hash: Optional[str] = None,
+) -> Optional[Manifest]:
+    """
+    The stored extraction result for a PDF, if it is still current.
+
+    A result is current when it was produced by the same detector
+    configuration from the same file contents, and every file it lists still
+    exists. Size and modification time are compared first; the file is only
+    hashed again when its modification time changed but its size did not.
+
+    Args:
+        pdf_path: The source PDF
+        out_dir: The PDF's output directory
+        detector_fingerprint: ``SignatureDetector.config_fingerprint()``
+        content_hash: SHA-256 of the PDF if already known
+
+    Returns:
+        The stored manifest, or None if the PDF must be processed again
+    """
+    try:
+        data = json.loads(manifest_path(out_dir).read_text())
+        fingerprint = data["fingerprint"]
+        stat = Path(pdf_path).stat()
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if fingerprint.get("detector") != detector_fingerprint:
+        return None
+    if fingerprint.get("size") != stat.st_size:
+        return None
+    if content_hash is not None:
+        if content_hash != fingerprint.get("sha256"):
+            return None
+    elif (
+        fingerprint.get("mtime_ns") != stat.st_mtime_ns
+        # Touched but possibly unchanged; only the contents can tell
+        and file_digest(pdf_path) != fingerprint.get("sha256")
+    ):
+        return None
+
+    manifest = {int(page_num): files for page_num, files in data.get("pages", {}).items()}
+    for files in manifest.values():
+        if not all(os.path.exists(path) for path in files.values()):
+            return None  # An output was deleted since
+    return manifest
+
+
+def save_manifest(
+    pdf_path: str | Path,
+    out_dir: str | Path,
+    detector_fingerprint: str,
+    manifest: Manifest,
+    content_hash: Optional[str] = None,
+) -> None:
+    """
+    Persist an extraction result with the fingerprint of the PDF it came from.
+
+    Args:
+        pdf_path: The source PDF
+        out_dir: The PDF's output directory
+        detector_fingerprint: ``SignatureDetector.config_fingerprint()``
+        manifest: Manifest returned by extraction
+        content_hash: SHA-256 of the PDF if already known
+    """
+    stat = Path(pdf_path).stat()
+    data = {
+        "fingerprint": {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": content_hash or file_digest(pdf_path),
+            "detector": detector_fingerprint,
+        },
+        "pages": manifest,
+    }
+    atomic_write_text(manifest_path(out_dir), json.dumps(data))
@@ -0,0 +1,346 @@
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel
+
+# Artifact kinds derived from an uploaded file
+SUBSET_PDF = "subset_pdf"
+PAGE_PNG = "png"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    accessed_at REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS files_by_job_and_name ON files(job_id, filename);
+CREATE TABLE IF NOT EXISTS artifacts (
+    file_id TEXT NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (file_id, kind, page)
+);
+CREATE TABLE IF NOT EXISTS downloads (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS locks (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class JobRecord(BaseModel):
+    """A job as stored in the metadata index"""
+    id: str
+    created_at: float
+    # Last time the job's files were served; drives expiry and eviction
+    accessed_at: float
+
+
+class FileRecord(BaseModel):
+    """An uploaded file as stored in the metadata index"""
+    id: str
+    job_id: str
+    # Display name; renames only change this, never the stored file
+    filename: str
+    path: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+
+class ArtifactRecord(BaseModel):
+    """A file derived from an upload, such as a subset PDF or page PNG"""
+    file_id: str
+    kind: str
+    # 1-based page the artifact belongs to
+    page: int
+    path: str
+
+
+class AmbiguousFilenameError(ValueError):
+    """Raised when a job holds several files with the requested name."""
+
+
+class MetadataStore:
+    """SQLite index of jobs, their files and derived artifacts.
+
+    Replaces directory scans with indexed lookups by job, file ID and display
+    name. Renames are metadata updates inside a transaction, so the stored
+    files never move and concurrent renames cannot interleave. One connection
+    is shared by all threads of a process, serialized by a lock; WAL mode lets
+    other processes read while one writes.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False, timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        # Indexes created before access tracking lack the column
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "accessed_at" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN accessed_at REAL")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements atomically, taking the write lock up front."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def create_job(self, job_id: str, files: Sequence[FileRecord]) -> None:
+        """
+        Record a job and its uploaded files.
+
+        Args:
+            job_id: The new job's ID
+            files: The job's files, in upload order
+        """
+        with self._transaction() as conn:
+            now = time.time()
+            conn.execute(
+                "INSERT INTO jobs (id, created_at, accessed_at) VALUES (?, ?, ?)",
+                (job_id, now, now),
+            )
+            conn.executemany(
+                "INSERT INTO files (id, job_id, position, filename, path, size, sha256) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (f.id, job_id, position, f.filename, f.path, f.size, f.sha256)
+                    for position, f in enumerate(files)
+                ],
+            )
+
+    def job_exists(self, job_id: str) -> bool:
+        return bool(self._query("SELECT 1 FROM jobs WHERE id = ?", (job_id,)))
+
+    def list_jobs(self) -> List[JobRecord]:
+        """Every job, least recently accessed first."""
+        rows = self._query(
+            "SELECT id, created_at, COALESCE(accessed_at, created_at) AS accessed_at "
+            "FROM jobs ORDER BY 3"
+        )
+        return [JobRecord(**dict(row)) for row in rows]
+
+    def touch_job(self, job_id: str, min_interval: float = 60.0) -> None:
+        """
+        Record that a job's files were just used.
+
+        Args:
+            job_id: The job
+            min_interval: Skip the write if the job was touched this recently
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET accessed_at = ? "
+                "WHERE id = ? AND COALESCE(accessed_at, created_at) < ?",
+                (now, job_id, now - min_interval),
+            )
+
+    def delete_job(self, job_id: str) -> None:
+        """Remove a job along with its files and artifacts."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def list_files(self, job_id: str) -> List[FileRecord]:
+        """The files of a job, in upload order."""
+        rows = self._query(
+            "SELECT id, job_id, filename, path, size, sha256 FROM files "
+            "WHERE job_id = ? ORDER BY position",
+            (job_id,),
+        )
+        return [FileRecord(**dict(row)) for row in rows]
+
+    def get_file(self, job_id: str, file_id: str) -> Optional[FileRecord]:
+        """Look up one file of a job by its ID."""
+        rows = self._query(
+            "SELECT id, job_id, filename, path, size, sha256 FROM files "
+            "WHERE id = ? AND job_id = ?",
+            (file_id, job_id),
+        )
+        return FileRecord(**dict(rows[0])) if rows else None
+
+    def rename_file(self, job_id: str, old_filename: str, new_filename: str) -> FileRecord:
+        """
+        Change a file's display name.
+
+        Args:
+            job_id: The job containing the file
+            old_filename: Current display name, matched exactly
+            new_filename: New display name
+
+        Returns:
+            The updated file
+
+        Raises:
+            LookupError: If no file in the job has ``old_filename``
+            AmbiguousFilenameError: If several files have ``old_filename``
+            FileExistsError: If another file already has ``new_filename``
+        """
+        return self.rename_files(job_id, [(old_filename, new_filename)])[0]
+
+    def rename_files(
+        self, job_id: str, renames: Sequence[Tuple[str, str]]
+    ) -> List[FileRecord]:
+        """
+        Apply several renames atomically: either all succeed or none do.
+
+        Args:
+            job_id: The job containing the files
+            renames: Pairs of (current name, new name), applied in order
+
+        Returns:
+            The updated files, in the same order
+
+        Raises:
+            LookupError, AmbiguousFilenameError, FileExistsError: As for
+                ``rename_file``
+        """
+        renamed_ids = []
+        with self._transaction() as conn:
+            for old_filename, new_filename in renames:
+                matches = conn.execute(
+                    "SELECT id FROM files WHERE job_id = ? AND filename = ?",
+                    (job_id, old_filename),
+                ).fetchall()
+                if not matches:
+                    raise LookupError(f"File not found: {old_filename}")
+                if len(matches) > 1:
+                    raise AmbiguousFilenameError(f"Several files are named {old_filename}")
+                if new_filename != old_filename and conn.execute(
+                    "SELECT 1 FROM files WHERE job_id = ? AND filename = ?",
+                    (job_id, new_filename),
+                ).fetchone():
+                    raise FileExistsError(f"A file named {new_filename} already exists")
+                conn.execute(
+                    "UPDATE files SET filename = ? WHERE id = ?", (new_filename, matches[0]["id"])
+                )
+                renamed_ids.append(matches[0]["id"])
+
+        by_id = {f.id: f for f in self.list_files(job_id)}
+        return [by_id[file_id] for file_id in renamed_ids]
+
+    def set_artifacts(self, file_id: str, manifest: Dict[int, Dict[str, str]]) -> None:
+        """
+        Replace the recorded artifacts of a file with an extraction result.
+
+        Args:
+            file_id: The source file
+            manifest: Manifest returned by signature extraction
+        """
+        rows = []
+        for page_num, page_info in manifest.items():
+            rows.append((file_id, SUBSET_PDF, page_num, page_info["pdf"]))
+            if "png" in page_info:
+                rows.append((file_id, PAGE_PNG, page_num, page_info["png"]))
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM artifacts WHERE file_id = ?", (file_id,))
+            conn.executemany(
+                "INSERT INTO artifacts (file_id, kind, page, path) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def list_artifacts(self, file_id: str, kind: Optional[str] = None) -> List[ArtifactRecord]:
+        """Recorded artifacts of a file, optionally of one kind, in page order."""
+        sql = "SELECT file_id, kind, page, path FROM artifacts WHERE file_id = ?"
+        params: list = [file_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        rows = self._query(sql + " ORDER BY page, kind", params)
+        return [ArtifactRecord(**dict(row)) for row in rows]
+
+    def signature_pages(self, file_id: str) -> List[int]:
+        """Pages detected as signature pages, once extraction has finished."""
+        return [a.page for a in self.list_artifacts(file_id, SUBSET_PDF)]
+
+    def start_download(self, job_id: str) -> str:
+        """Record that a download of a job's files has started, returning its id."""
+        download_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO downloads (id, job_id, started_at) VALUES (?, ?, ?)",
+                (download_id, job_id, time.time()),
+            )
+        return download_id
+
+    def finish_download(self, download_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM downloads WHERE id = ?", (download_id,))
+
+    def active_downloads(self, since: float) -> Set[str]:
+        """
+        Jobs being downloaded by any worker.
+
+        Args:
+            since: Ignore downloads started before this time, e.g. by a
+                worker that exited without finishing them
+        """
+        rows = self._query("SELECT DISTINCT job_id FROM downloads WHERE started_at >= ?", (since,))
+        return {row["job_id"] for row in rows}
+
+    def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Take a named lock shared by every process using this database.
+
+        The lock is granted if it is free, expired or already held by
+        ``owner``, and lapses after ``ttl`` seconds unless released.
+
+        Returns:
+            Whether ``owner`` now holds the lock
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM locks WHERE name = ?", (name,)
+            ).fetchone()
+            if row is not None and row["owner"] != owner and row["expires_at"] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)",
+                (name, owner, now + ttl),
+            )
+        return True
+
+    def release_lock(self, name: str, owner: str) -> None:
+        """Release a lock taken with ``acquire_lock``, if ``owner`` still holds it."""
+        with self._lock:
+            self._conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
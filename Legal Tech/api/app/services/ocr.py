@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from app.services.atomic_write import atomic_write_text
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class OcrQueueFullError(RuntimeError):
+    """Raised when too many OCR jobs are already waiting for a worker."""
+
+
+def _run_tesseract(image: Image.Image, lang: str) -> str:
+    """Worker entry point: OCR one image with the local tesseract binary."""
+    import pytesseract
+
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+class OcrCache:
+    """Disk cache of OCR results keyed by the hash of the image pixels.
+
+    Identical renders (the same page of the same scan, at the same DPI and
+    crop) are recognized once, no matter which job or process asks.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(image: Image.Image, lang: str) -> str:
+        """Cache key for an image's pixels and the OCR language."""
+        digest = hashlib.sha256(f"{lang}|{image.mode}|{image.size}|".encode())
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        atomic_write_text(self._path(key), text)
+
+
+class OcrService:
+    """Runs Tesseract OCR across a pool of worker processes.
+
+    At most ``max_pending`` images are queued or running at once; further
+    submissions wait for a slot, or fail with ``OcrQueueFullError`` after a
+    timeout, instead of piling up unbounded work. Results are cached by image
+    content, so a page is never recognized twice.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: int = 32,
+        lang: str = "eng",
+        dpi: int = 150,
+        cache: Optional[OcrCache] = None,
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes. ``None`` or ``0`` uses one
+                worker per CPU.
+            max_pending: Maximum number of images queued or being recognized
+            lang: Tesseract language code(s), e.g. "eng" or "eng+deu"
+            dpi: Resolution callers should render pages at before OCR
+            cache: Optional cache of previous results
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.lang = lang
+        self.dpi = dpi
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, image: Image.Image, timeout: Optional[float] = None) -> "Future[str]":
+        """
+        Queue an image for OCR.
+
+        Args:
+            image: Image to recognize
+            timeout: Seconds to wait for a queue slot; ``None`` waits indefinitely
+
+        Returns:
+            Future resolving to the recognized text
+
+        Raises:
+            OcrQueueFullError: If no slot became free within ``timeout``
+        """
+        key = OcrCache.key(image, self.lang) if self.cache is not None else None
+        if key is not None:
+            text = self.cache.get(key)
+            if text is not None:
+                with self._lock:
+                    self.hits += 1
+                future: "Future[str]" = Future()
+                future.set_result(text)
+                return future
+
+        if not self._slots.acquire(timeout=timeout):
+            raise OcrQueueFullError(f"{self.max_pending} OCR jobs already pending")
+        with self._lock:
+            self.misses += 1
+        try:
+            future = self.executor.submit(_run_tesseract, image, self.lang)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        def on_done(done: "Future[str]") -> None:
+            self._slots.release()
+            if key is not None and not done.cancelled() and done.exception() is None:
+                self.cache.put(key, done.result())
+
+        future.add_done_callback(on_done)
+        return future
+
+    def ocr(self, image: Image.Image) -> str:
+        """Recognize one image, waiting for a queue slot if necessary."""
+        return self.submit(image).result()
+
+    def ocr_many(self, images: Sequence[Image.Image]) -> List[str]:
+        """
+        Recognize several images in parallel.
+
+        Args:
+            images: Images to recognize
+
+        Returns:
+            Recognized text for each image, in the same order
+        """
+        futures = [self.submit(image) for image in images]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, float]:
+        """Cache hit/miss counters and queue occupancy for this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "max_pending": self.max_pending,
+                "max_workers": self.max_workers,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_default_service: Optional[OcrService] = None
+
+
+def default_ocr_service() -> OcrService:
+    """Process-wide OCR service used when no service is configured explicitly."""
+    global _default_service
+    if _default_service is None:
+        _default_service = OcrService()
+    return _default_service
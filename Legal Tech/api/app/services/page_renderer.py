@@ -0,0 +1,80 @@
+import io
+from pathlib import Path
+from typing import Optional
+
+from app.services.atomic_write import atomic_write_bytes
+from app.services.pdf_document import PdfDocumentSession
+from app.services.result_cache import file_digest
+
+
+class PageRenderer:
+    """Renders single PDF pages to PNG on demand and keeps them on disk.
+
+    Renders are keyed by (content hash, page, DPI, width), so the same page
+    of the same document is rasterized once no matter how many jobs or
+    requests ask for it. Instances only hold a directory path and can be
+    sent to worker processes.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def render_key(
+        content_hash: str, page_num: int, dpi: int, max_width: Optional[int] = None
+    ) -> str:
+        """Stable identifier of a render, also used as its ETag."""
+        key = f"{content_hash}_p{page_num}_{dpi}dpi"
+        if max_width:
+            key += f"_w{max_width}"
+        return key
+
+    def cached_path(
+        self, content_hash: str, page_num: int, dpi: int, max_width: Optional[int] = None
+    ) -> Path:
+        key = self.render_key(content_hash, page_num, dpi, max_width)
+        return self.cache_dir / content_hash[:2] / f"{key}.png"
+
+    def render(
+        self,
+        pdf_path: str | Path,
+        page_num: int,
+        dpi: int,
+        max_width: Optional[int] = None,
+        content_hash: Optional[str] = None,
+    ) -> Path:
+        """
+        Get a PNG of a page, rasterizing it only if it is not cached yet.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: 1-based page index
+            dpi: Render resolution
+            max_width: Downscale the render to at most this many pixels wide
+            content_hash: SHA-256 of the PDF if already known
+
+        Returns:
+            Path to the cached PNG
+
+        Raises:
+            ValueError: If the page does not exist
+        """
+        content_hash = content_hash or file_digest(pdf_path)
+        png_path = self.cached_path(content_hash, page_num, dpi, max_width)
+        if png_path.exists():
+            return png_path
+
+        with PdfDocumentSession(pdf_path) as session:
+            if not 1 <= page_num <= session.page_count:
+                raise ValueError(f"Page {page_num} does not exist")
+            image = session.render_page(page_num, resolution=dpi)
+        if max_width and image.width > max_width:
+            from PIL import Image
+
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        atomic_write_bytes(png_path, buffer.getvalue())
+        return png_path
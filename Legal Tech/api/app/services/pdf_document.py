@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import io
+import math
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+# The parsers are imported on first use so that importing the app stays cheap
+if TYPE_CHECKING:
+    import pdfplumber
+    import pypdfium2
+    from PIL import Image
+
+# PDFium is not thread-safe; every call into it from this process goes through this lock
+PDFIUM_LOCK = threading.RLock()
+
+
+class PdfDocumentSession:
+    """A PDF parsed once and shared by text extraction, subsetting and rendering.
+
+    The file is read from disk a single time. Text and layout come from one
+    pdfplumber document, while page subsetting and rasterization both use one
+    PDFium document built from the same bytes. Each parser is created lazily,
+    so a session that only detects pages never pays for PDFium.
+
+    For large documents, a session with a page ``window`` keeps memory flat
+    regardless of page count: the file is not held in memory, pdfplumber only
+    builds the pages of the current window, and both parsers are reopened
+    once a window's worth of pages has been read, dropping the objects,
+    fonts and caches they accumulated.
+    """
+
+    def __init__(
+        self,
+        pdf_path: str | Path,
+        window: Optional[int] = None,
+        max_render_pixels: Optional[int] = None,
+    ):
+        """
+        Args:
+            pdf_path: The PDF to open
+            window: Reopen the parsers every this many pages; None keeps them
+                open, with the whole file in memory, for the session's lifetime
+            max_render_pixels: Lower the resolution of renders that would
+                exceed this many pixels, bounding the memory of one bitmap
+        """
+        self.path = Path(pdf_path)
+        self.window = window
+        self.max_render_pixels = max_render_pixels
+        # Windowed sessions let the parsers read from disk instead
+        self._data = self.path.read_bytes() if window is None else None
+        self._plumber = None
+        self._plumber_first = 1
+        self._pdfium = None
+        self._pdfium_pages = 0
+        self._page_count: Optional[int] = None
+
+    def __enter__(self) -> "PdfDocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def plumber(self) -> pdfplumber.PDF:
+        """The pdfplumber document used for text and layout."""
+        if self._plumber is None:
+            import pdfplumber
+
+            source = io.BytesIO(self._data) if self._data is not None else self.path
+            self._plumber = pdfplumber.open(source)
+            self._plumber_first = 1
+        return self._plumber
+
+    def _plumber_page(self, page_num: int) -> pdfplumber.page.Page:
+        """A pdfplumber page, opening the window that contains it if needed."""
+        if self.window is None:
+            return self.plumber.pages[page_num - 1]
+        first = page_num - (page_num - 1) % self.window
+        if self._plumber is None or self._plumber_first != first:
+            import pdfplumber
+
+            self._close_plumber()
+            self._plumber = pdfplumber.open(self.path, pages=range(first, first + self.window))
+            self._plumber_first = first
+        return self._plumber.pages[page_num - first]
+
+    @property
+    def pdfium(self) -> pypdfium2.PdfDocument:
+        """The PDFium document used for subsetting and rendering."""
+        with PDFIUM_LOCK:
+            if self._pdfium is None:
+                import pypdfium2
+
+                source = self._data if self._data is not None else str(self.path)
+                self._pdfium = pypdfium2.PdfDocument(source)
+                self._pdfium_pages = 0
+            return self._pdfium
+
+    @contextmanager
+    def pdfium_page(self, page_num: int) -> Iterator[pypdfium2.PdfPage]:
+        """
+        Load one PDFium page, holding the PDFium lock until it is closed.
+
+        In a windowed session the document is reopened after every
+        ``window`` pages loaded this way.
+
+        Args:
+            page_num: 1-based page index
+        """
+        with PDFIUM_LOCK:
+            page = self.pdfium[page_num - 1]
+            try:
+                yield page
+            finally:
+                page.close()
+                self._pdfium_pages += 1
+                if self.window is not None and self._pdfium_pages >= self.window:
+                    self._close_pdfium()
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            # PDFium counts pages without building pdfplumber's page list
+            if self._plumber is None or self.window is not None:
+                with PDFIUM_LOCK:
+                    self._page_count = len(self.pdfium)
+            else:
+                self._page_count = len(self.plumber.pages)
+        return self._page_count
+
+    def page_text(self, page_num: int) -> str:
+        """
+        Extract the layout-aware text of a page.
+
+        The page's parsed objects are released once the text has been read,
+        so scanning a long document does not keep every page in memory.
+
+        Args:
+            page_num: 1-based page index
+
+        Returns:
+            The page text, or an empty string if the page has no text layer
+        """
+        page = self._plumber_page(page_num)
+        try:
+            return page.extract_text() or ""
+        finally:
+            page.close()
+
+    def search_page(self, page_num: int, pattern: re.Pattern) -> List[dict]:
+        """
+        Find every match of a pattern in a page's layout text, with positions.
+
+        Args:
+            page_num: 1-based page index
+            pattern: Compiled pattern; its flags are respected
+
+        Returns:
+            pdfplumber search results: ``text``, ``x0``, ``top``, ``x1`` and
+            ``bottom`` in points from the top-left
+        """
+        page = self._plumber_page(page_num)
+        try:
+            return page.search(pattern, return_chars=False, return_groups=False)
+        finally:
+            page.close()
+
+    def page_chars_text(self, page_num: int, limit: Optional[int] = None) -> str:
+        """
+        Read a page's raw character stream from PDFium's text page.
+
+        Much cheaper than ``page_text``: no pdfminer parsing and no word or
+        line clustering, only the characters in content order with the
+        separators PDFium generates between words and lines.
+
+        Args:
+            page_num: 1-based page index
+            limit: Read at most this many characters from the start of the page
+
+        Returns:
+            The raw character stream of the page
+        """
+        with self.pdfium_page(page_num) as page:
+            textpage = page.get_textpage()
+            try:
+                if limit is None:
+                    return textpage.get_text_bounded()
+                count = min(limit, textpage.count_chars())
+                if count <= 0:
+                    return ""
+                return textpage.get_text_range(0, count, force_this=True)[:limit]
+            finally:
+                textpage.close()
+
+    def iter_page_text(self) -> Iterable[str]:
+        """Yield the text of every page in order."""
+        for page_num in range(1, self.page_count + 1):
+            yield self.page_text(page_num)
+
+    def write_subset(self, page_nums: List[int], output_path: str | Path) -> Path:
+        """
+        Write a new PDF containing only the given pages.
+
+        Args:
+            page_nums: 1-based page indices, in output order
+            output_path: Where to save the subset PDF
+
+        Returns:
+            Path to the written PDF
+        """
+        import pypdfium2
+
+        output_path = Path(output_path)
+        with PDFIUM_LOCK:
+            subset = pypdfium2.PdfDocument.new()
+            try:
+                subset.import_pages(self.pdfium, pages=[n - 1 for n in page_nums])
+                subset.save(output_path)
+            finally:
+                subset.close()
+        return output_path
+
+    def render_page(
+        self, page_num: int, resolution: int = 300, top_fraction: float = 1.0
+    ) -> Image.Image:
+        """
+        Rasterize a page.
+
+        Matches the output of pdfplumber's ``page.to_image(resolution=...)`` but
+        reuses the session's PDFium document instead of reopening the file.
+        With ``max_render_pixels`` set, oversized pages are rendered at a
+        lower resolution instead.
+
+        Args:
+            page_num: 1-based page index
+            resolution: Render resolution in DPI
+            top_fraction: Render only this fraction of the page, from the top
+
+        Returns:
+            RGB image of the page
+        """
+        with self.pdfium_page(page_num) as page:
+            width, height = page.get_size()
+            # PDFium crops (left, bottom, right, top) in points
+            crop_bottom = height * (1 - top_fraction) if top_fraction < 1 else 0
+            scale = resolution / 72
+            if self.max_render_pixels:
+                area = width * (height - crop_bottom)
+                if area * scale * scale > self.max_render_pixels:
+                    scale = math.sqrt(self.max_render_pixels / area)
+                    # PDFium rounds bitmap dimensions up
+                    while math.ceil(width * scale) * math.ceil(
+                        (height - crop_bottom) * scale
+                    ) > self.max_render_pixels:
+                        scale *= 0.995
+            bitmap = page.render(
+                scale=scale,
+                crop=(0, crop_bottom, 0, 0),
+                no_smoothtext=True,
+                no_smoothpath=True,
+                no_smoothimage=True,
+                prefer_bgrx=True,
+            )
+            image = bitmap.to_pil().convert("RGB")
+            # Free PDFium's buffer now rather than whenever the bitmap is collected
+            bitmap.close()
+            return image
+
+    def _close_plumber(self) -> None:
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+
+    def _close_pdfium(self) -> None:
+        with PDFIUM_LOCK:
+            if self._pdfium is not None:
+                self._pdfium.close()
+                self._pdfium = None
+
+    def close(self) -> None:
+        self._close_plumber()
+        self._close_pdfium()
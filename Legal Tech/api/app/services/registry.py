@@ -0,0 +1,95 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownServiceError(KeyError):
+    """Raised when a service is requested that was never registered."""
+
+
+class ServiceRegistry:
+    """Shared services built on first use instead of at import time.
+
+    Each service is registered with a factory and, optionally, the modules
+    it needs. Nothing is imported or built until a request first asks for
+    the service, so the app starts without loading the Gemini SDK, OCR
+    bindings or PDF parsers. Production deployments that would rather pay
+    that cost before serving traffic call ``warm_up`` at startup.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...]]] = {}
+        self._instances: Dict[str, Any] = {}
+        # Reentrant so a factory can ask for the services it depends on
+        self._lock = threading.RLock()
+
+    def register(
+        self, name: str, factory: Callable[[], Any], preload: Sequence[str] = ()
+    ) -> None:
+        """
+        Add a service, replacing any instance built from an earlier factory.
+
+        Args:
+            name: Name the service is looked up by
+            factory: Builds the service; called at most once
+            preload: Modules the service imports lazily, loaded by ``warm_up``
+        """
+        with self._lock:
+            self._factories[name] = (factory, tuple(preload))
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        The service registered under ``name``, built on the first call.
+
+        Raises:
+            UnknownServiceError: If no service has that name
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise UnknownServiceError(name)
+                factory, _ = self._factories[name]
+                self._instances[name] = factory()
+            return self._instances[name]
+
+    def loaded(self) -> List[str]:
+        """Names of the services built so far."""
+        return list(self._instances)
+
+    def warm_up(self, names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        Import and build services ahead of their first request.
+
+        Args:
+            names: Services to warm up; all registered services by default
+
+        Returns:
+            Seconds spent on each service
+        """
+        timings = {}
+        for name in names if names is not None else list(self._factories):
+            start = time.perf_counter()
+            for module in self._factories[name][1]:
+                importlib.import_module(module)
+            self.get(name)
+            timings[name] = time.perf_counter() - start
+            logger.info("Warmed up %s in %.0f ms", name, timings[name] * 1000)
+        return timings
+
+    def shutdown(self) -> None:
+        """Shut down the services built so far that hold worker pools, newest first."""
+        with self._lock:
+            instances = list(self._instances.values())
+        for service in reversed(instances):
+            shutdown = getattr(service, "shutdown", None)
+            if callable(shutdown):
+                shutdown()
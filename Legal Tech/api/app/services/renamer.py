@@ -1,32 +1,77 @@
+import asyncio
 import re
+import time
 from datetime import datetime
-from typing import Optional
-import google.generativeai as genai
-from pdfplumber import open as pdf_open
-import pytesseract
-from PIL import Image
-import io
+from typing import Iterator, Optional
+from app.services.local_namer import LocalNamer, LocalSuggestion
+from app.services.ocr import OcrService
+from app.services.suggestion_cache import SuggestionCache
+from app.services.text_index import PageTextIndex
 
 class RenamerService:
-    def __init__(self, api_key: str):
+    # Bump when the prompt changes so cached suggestions from the old one are ignored
+    PROMPT_VERSION = 1
+    # Scanned documents: fraction of the first page, from the top, to OCR
+    OCR_HEADER_FRACTION = 0.25
+    # Weight of the latest model call in the running average of model latency
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[SuggestionCache] = None,
+        ocr: Optional[OcrService] = None,
+        local: Optional[LocalNamer] = None,
+        min_local_confidence: float = 0.8,
+    ):
+        """
+        Args:
+            api_key: Gemini API key
+            cache: Optional store of earlier model suggestions
+            ocr: OCR service for scanned documents
+            local: Offline namer tried before the model; a default one if None
+            min_local_confidence: Local suggestions at least this confident are
+                used without asking the model; above 1 always asks the model
+        """
+        # The Gemini SDK is slow to import, so it is only loaded once a renamer is built
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel("gemini-pro")
+        self.cache = cache
+        self.ocr = ocr
+        self.local = local if local is not None else LocalNamer()
+        self.min_local_confidence = min_local_confidence
+        # Running average of model call latency, None until the first call
+        self.model_seconds: Optional[float] = None
         
+    def _iter_text(self, index: PageTextIndex, max_chars: int) -> Iterator[str]:
+        """Yield the document's text page by page, stopping exactly at ``max_chars``."""
+        remaining = max_chars
+        for page_num in range(1, index.page_count + 1):
+            if remaining <= 0:
+                return
+            text = index.session.page_chars_text(page_num, limit=remaining)
+            if text:
+                remaining -= len(text)
+                yield text
+
     def _extract_text_from_pdf(self, pdf_path: str, max_chars: int = 500) -> str:
-        """Extract text from PDF, using OCR if no text layer exists."""
+        """Extract text from PDF, using OCR if no text layer exists.
+
+        Only the first ``max_chars`` characters are read, always from PDFium's
+        character stream, so the text (and the suggestion cache key and
+        offline naming score derived from it) does not depend on whether
+        detection has finished. The text index only supplies the page count
+        and the OCR of documents without a text layer.
+        """
         try:
-            with pdf_open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                    if len(text) >= max_chars:
-                        break
+            with PageTextIndex(pdf_path, ocr=self.ocr) as index:
+                text = "".join(self._iter_text(index, max_chars))
                 
                 if not text.strip():
-                    # No text layer, try OCR on first page
-                    first_page = pdf.pages[0]
-                    img = first_page.to_image()
-                    text = pytesseract.image_to_string(img.original)
+                    # No text layer; OCR the top of the first page, where titles and dates are
+                    text = index.ocr_text(1, top_fraction=self.OCR_HEADER_FRACTION)
                 
                 return text[:max_chars]
         except Exception as e:
@@ -53,33 +98,71 @@ class RenamerService:
         fallback = f"{date_str}_{title}"
         return self._clean_filename(fallback)
 
-    async def suggest_filename(self, pdf_path: str) -> str:
-        """Generate a suggested filename for the PDF."""
-        try:
-            # Extract text from PDF
-            text = self._extract_text_from_pdf(pdf_path)
-            
-            # Build prompt for Gemini
-            prompt = f"""You are an expert paralegal. Suggest a concise snake_case filename (max 60 chars) using YYYY-MM-DD + short descriptive title for this document:
+    def _build_prompt(self, text: str) -> str:
+        """Prompt asking the model for a filename for the given document text."""
+        return (
+            "You are an expert paralegal. Suggest a concise snake_case filename (max 60 chars) "
+            "using YYYY-MM-DD + short descriptive title for this document:\n\n"
+            f"{text}\n\n"
+            "Respond with ONLY the filename, no explanation or additional text."
+        )
 
-{text}
+    def local_suggestion(self, text: str) -> Optional[LocalSuggestion]:
+        """Offline suggestion for the text, if confident enough to skip the model."""
+        suggestion = self.local.suggest(text)
+        if suggestion.name and suggestion.confidence >= self.min_local_confidence:
+            return suggestion
+        return None
 
-Respond with ONLY the filename, no explanation or additional text."""
+    def cached_suggestion(self, text: str) -> Optional[str]:
+        """Previous model suggestion for the same text and prompt, if cached."""
+        if self.cache is None:
+            return None
+        return self.cache.get(SuggestionCache.key(text, self.PROMPT_VERSION))
 
-            # Get suggestion from Gemini
-            response = await self.model.generate_content(
-                prompt,
-                generation_config={"temperature": 0.2}
-            )
-            
-            # Clean and validate the response
-            suggested_name = self._clean_filename(response.text)
-            if len(suggested_name) > 60:
-                suggested_name = suggested_name[:60]
-                
-            return suggested_name
+    async def _suggest_from_text(self, text: str) -> str:
+        """Name already extracted text locally, from the cache, or else with Gemini."""
+        local = self.local_suggestion(text)
+        if local is not None:
+            return local.name
+        # The cache may read from disk; keep it off the event loop
+        cached = await asyncio.to_thread(self.cached_suggestion, text)
+        if cached is not None:
+            return cached
+        return await self._ask_model(text)
+
+    async def _ask_model(self, text: str) -> str:
+        """Ask Gemini for a filename and cache the answer."""
+        start = time.perf_counter()
+        # The SDK's generate_content blocks; its async variant does not
+        response = await self.model.generate_content_async(
+            self._build_prompt(text),
+            generation_config={"temperature": 0.2}
+        )
+        seconds = time.perf_counter() - start
+        if self.model_seconds is None:
+            self.model_seconds = seconds
+        else:
+            self.model_seconds += self.LATENCY_SMOOTHING * (seconds - self.model_seconds)
+        
+        # Clean and validate the response
+        suggested_name = self._clean_filename(response.text)
+        if len(suggested_name) > 60:
+            suggested_name = suggested_name[:60]
+        
+        if self.cache is not None and suggested_name:
+            key = SuggestionCache.key(text, self.PROMPT_VERSION)
+            await asyncio.to_thread(self.cache.put, key, suggested_name)
+        return suggested_name
+
+    async def suggest_filename(self, pdf_path: str) -> str:
+        """Generate a suggested filename for the PDF."""
+        # Extract text from PDF once, off the event loop; the fallback reuses it
+        text = await asyncio.to_thread(self._extract_text_from_pdf, pdf_path)
+        try:
+            # Named offline when the text is clear enough, else by Gemini
+            return await self._suggest_from_text(text)
             
         except Exception as e:
             # Fallback to regex-based naming
-            text = self._extract_text_from_pdf(pdf_path)
-            return self._generate_fallback_name(text) 
\ No newline at end of file
+            return self._generate_fallback_name(text)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PAGES_FILE = "pages.json"
+SUBSET_FILE = "sigpages.pdf"
+
+
+def file_digest(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _place(src: Path, dest: Path) -> None:
+    """Hard-link ``src`` to ``dest``, copying when linking is not possible."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class ResultCache:
+    """Content-addressed disk cache of signature extraction results.
+
+    Entries are keyed by the PDF's SHA-256 plus the detector configuration,
+    and hold the detected page list, the subset PDF and any rendered PNGs.
+    Total size is bounded by evicting the least recently used entries.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content_hash: str, config: str) -> str:
+        """Cache key for a PDF's content hash and a detector configuration fingerprint."""
+        return hashlib.sha256(f"{content_hash}:{config}".encode()).hexdigest()
+
+    def get(
+        self, key: str, basename: str, out_dir: str | Path
+    ) -> Optional[Dict[int, Dict[str, str]]]:
+        """
+        Look up an entry and materialize it in ``out_dir``.
+
+        Files are placed under the same names ``extract_pages`` would have
+        written, so callers cannot tell a hit from a fresh extraction.
+
+        Args:
+            key: Cache key from ``key()``
+            basename: Stem of the source PDF, used to name the output files
+            out_dir: Directory to place the cached subset PDF and PNGs in
+
+        Returns:
+            The manifest, or None on a miss
+        """
+        entry = self.root / key
+        try:
+            pages = json.loads((entry / PAGES_FILE).read_text())
+            out_dir = Path(out_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+            manifest = {}
+            output_pdf = out_dir / f"{basename}_sigpages.pdf"
+            if pages:
+                _place(entry / SUBSET_FILE, output_pdf)
+            for page_num in pages:
+                manifest[page_num] = {"pdf": str(output_pdf)}
+                cached_png = entry / f"page{page_num}.png"
+                if cached_png.exists():
+                    png_path = out_dir / f"{basename}_page{page_num}.png"
+                    _place(cached_png, png_path)
+                    manifest[page_num]["png"] = str(png_path)
+        except (OSError, ValueError):
+            # Missing, partially evicted or corrupt entries count as misses
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Entry mtime doubles as the LRU timestamp
+        os.utime(entry)
+        with self._lock:
+            self.hits += 1
+        return manifest
+
+    def put(self, key: str, manifest: Dict[int, Dict[str, str]]) -> None:
+        """
+        Store an extraction result, then evict old entries if over budget.
+
+        Args:
+            key: Cache key from ``key()``
+            manifest: Manifest returned by ``extract_pages``
+        """
+        entry = self.root / key
+        if entry.exists():
+            return
+
+        staging = self.root / f".tmp-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            pages = sorted(manifest)
+            if pages:
+                shutil.copyfile(manifest[pages[0]]["pdf"], staging / SUBSET_FILE)
+            for page_num in pages:
+                # PNGs are absent when pages are rendered on demand instead
+                if "png" in manifest[page_num]:
+                    shutil.copyfile(manifest[page_num]["png"], staging / f"page{page_num}.png")
+            # Written last: an entry is only valid once its page list exists
+            (staging / PAGES_FILE).write_text(json.dumps(pages))
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same entry first, or a source file vanished
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(last used, size in bytes, path) of every complete entry."""
+        entries = []
+        for entry in self.root.iterdir():
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue  # Removed by a concurrent eviction
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process and the current size of the cache."""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
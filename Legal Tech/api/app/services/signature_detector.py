@@ -1,21 +1,141 @@
-import pdfplumber
 import re
 from pathlib import Path
-from typing import List, Dict
-import PyPDF2
-import os
+from typing import Callable, List, Optional
+from app.services.line_detector import SignatureLineDetector
+from app.services.manifest_store import Manifest
+from app.services.pdf_document import PdfDocumentSession
+from app.services.result_cache import ResultCache, file_digest
+from app.services.text_index import TEXT_INDEX_FILE, PageTextIndex
+
+# Detection modes: layout-aware text per page, or the raw character stream
+LAYOUT_MODE = "layout"
+FAST_MODE = "fast"
 
 
 class SignatureDetector:
     """Detects pages containing signatures in PDF documents."""
 
-    def __init__(self):
+    # Bump when detection or rendering changes in a way that invalidates cached results
+    VERSION = 3
+
+    def __init__(
+        self,
+        resolution: int = 300,
+        cache: Optional[ResultCache] = None,
+        mode: str = LAYOUT_MODE,
+        tail_pages: int = 0,
+        stop_after: Optional[int] = None,
+        detect_lines: bool = True,
+        render_pngs: bool = True,
+        page_window: Optional[int] = None,
+        max_render_pixels: Optional[int] = None,
+    ):
+        """
+        Args:
+            resolution: DPI used to render signature pages to PNG
+            cache: Optional cache of previous extraction results
+            mode: LAYOUT_MODE runs pdfplumber's layout-aware text extraction on
+                every page; FAST_MODE scans each page's raw PDFium character
+                stream with one combined matcher
+            tail_pages: Scan this many pages from the end of the document
+                first, last page first, before the rest
+            stop_after: Stop scanning once this many signature pages are found
+            detect_lines: Look for drawn signature lines on pages without a
+                text layer, such as scanned counterparts
+            render_pngs: Render each signature page to PNG during extraction.
+                When False only the subset PDF is written and pages are
+                rasterized later, on demand, by the PageRenderer
+            page_window: Large-document mode: process pages in windows of
+                this many pages, releasing parser state between windows so
+                memory stays flat as page count grows
+            max_render_pixels: Render oversized pages at a lower resolution
+                so no single bitmap exceeds this many pixels
+        """
+        if mode not in (LAYOUT_MODE, FAST_MODE):
+            raise ValueError(f"Unknown detection mode: {mode}")
         # Compile regex patterns for better performance
         self.signature_patterns = [
             re.compile(r"Signature", re.IGNORECASE),
             re.compile(r"Signed by", re.IGNORECASE),
             re.compile(r"_{40,}"),  # 40 or more underscores
         ]
+        self.resolution = resolution
+        self.cache = cache
+        self.mode = mode
+        self.tail_pages = tail_pages
+        self.stop_after = stop_after
+        self.line_detector = SignatureLineDetector() if detect_lines else None
+        self.render_pngs = render_pngs
+        self.page_window = page_window
+        self.max_render_pixels = max_render_pixels
+        self.combined_pattern = self._combine_patterns()
+
+    def _combine_patterns(self) -> re.Pattern:
+        """
+        Merge all signature patterns into a single alternation for fast mode.
+
+        Each pattern keeps its own case sensitivity through a scoped inline
+        flag. Word and line breaks in the raw character stream are not always
+        where layout extraction puts them, so a literal space in a pattern
+        matches any run of whitespace. It still needs at least one, so
+        run-together text such as "Signedby" is rejected as in layout mode.
+        """
+        parts = []
+        for pattern in self.signature_patterns:
+            body = pattern.pattern.replace(" ", r"\s+")
+            flag = "i" if pattern.flags & re.IGNORECASE else ""
+            parts.append(f"(?{flag}:{body})" if flag else f"(?:{body})")
+        return re.compile("|".join(parts))
+
+    def config_fingerprint(self) -> str:
+        """Identifies the detector settings that affect extraction output."""
+        patterns = ",".join(f"{p.pattern}/{p.flags}" for p in self.signature_patterns)
+        scan = f"{self.mode}|tail={self.tail_pages}|stop={self.stop_after}"
+        if self.line_detector is not None:
+            scan += "|lines"
+        render = f"{self.resolution}dpi" if self.render_pngs else "norender"
+        if self.render_pngs and self.max_render_pixels:
+            render += f"|max{self.max_render_pixels}px"
+        return f"v{self.VERSION}|{patterns}|{scan}|{render}"
+
+    def _page_order(self, total_pages: int) -> List[int]:
+        """1-based page numbers in the order they should be scanned."""
+        tail_start = max(total_pages - self.tail_pages, 0) + 1
+        tail = list(range(total_pages, tail_start - 1, -1))
+        return tail + list(range(1, tail_start))
+
+    def _page_has_signature(
+        self,
+        session: PdfDocumentSession,
+        page_num: int,
+        text_index: Optional[PageTextIndex] = None,
+    ) -> bool:
+        if self.mode == FAST_MODE:
+            text = session.page_chars_text(page_num)
+            if self.combined_pattern.search(text):
+                return True
+        else:
+            if text_index is not None:
+                text = text_index.page_text(page_num)
+            else:
+                text = session.page_text(page_num)
+            if any(pattern.search(text) for pattern in self.signature_patterns):
+                return True
+        
+        # Scanned pages have no text to match; look for drawn signature lines instead
+        if self.line_detector is not None and not text.strip():
+            return bool(self.line_detector.detect_page(session, page_num))
+        return False
+
+    def open_session(self, pdf_path: str | Path) -> PdfDocumentSession:
+        """Open a PDF with this detector's page window and render pixel cap."""
+        return PdfDocumentSession(
+            pdf_path, window=self.page_window, max_render_pixels=self.max_render_pixels
+        )
+
+    def cache_key(self, pdf_path: str | Path, content_hash: Optional[str] = None) -> str:
+        """Result cache key for a PDF under this detector's configuration."""
+        return ResultCache.key(content_hash or file_digest(pdf_path), self.config_fingerprint())
 
     def detect_pages(self, pdf_path: str | Path) -> List[int]:
         """
@@ -27,68 +147,101 @@ class SignatureDetector:
         Returns:
             List of 1-based page indices containing signatures
         """
-        signature_pages = []
+        with self.open_session(pdf_path) as session:
+            return self.detect_pages_in(session)
+
+    def detect_pages_in(
+        self, session: PdfDocumentSession, text_index: Optional[PageTextIndex] = None
+    ) -> List[int]:
+        """
+        Detect pages containing signatures in an already opened document.
         
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            
-            for page_num, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text() or ""
-                
-                # Check for signature patterns
-                if any(pattern.search(text) for pattern in self.signature_patterns):
-                    signature_pages.append(page_num)
+        Args:
+            session: Parsed PDF document
+            text_index: Optional shared page text index; layout mode reads
+                page text from it instead of extracting it again
             
-            # If no signatures found, add the last page
-            if not signature_pages and total_pages > 0:
-                signature_pages.append(total_pages)
+        Returns:
+            List of 1-based page indices containing signatures
+        """
+        signature_pages = []
+        total_pages = session.page_count
+        
+        for page_num in self._page_order(total_pages):
+            # Check for signature patterns
+            if self._page_has_signature(session, page_num, text_index):
+                signature_pages.append(page_num)
+                if self.stop_after and len(signature_pages) >= self.stop_after:
+                    break
+        
+        # If no signatures found, add the last page
+        if not signature_pages and total_pages > 0:
+            signature_pages.append(total_pages)
         
-        return signature_pages
+        return sorted(signature_pages)
 
-    def extract_pages(self, pdf_path: str | Path, out_dir: str | Path) -> Dict[int, Dict[str, str]]:
+    def extract_pages(
+        self,
+        pdf_path: str | Path,
+        out_dir: str | Path,
+        on_stage: Optional[Callable[[str], None]] = None,
+        content_hash: Optional[str] = None,
+    ) -> Manifest:
         """
         Extract pages containing signatures and generate PNG images.
         
         Args:
             pdf_path: Path to the PDF file
             out_dir: Directory to save extracted pages and images
+            on_stage: Optional callback invoked with "detecting", "subsetting"
+                and, when rendering PNGs, "rendering" as each stage starts
+            content_hash: SHA-256 of the PDF if already known, used as the cache key
             
         Returns:
-            Dictionary mapping page numbers to their PDF and PNG file paths
+            Dictionary mapping page numbers to their PDF and PNG file paths.
+            Entries have no "png" key when ``render_pngs`` is off.
         """
         pdf_path = Path(pdf_path)
         out_dir = Path(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
         
-        # Get pages with signatures
-        signature_pages = self.detect_pages(pdf_path)
-        if not signature_pages:
-            return {}
-            
-        # Create output PDF with signature pages
-        basename = pdf_path.stem
-        output_pdf = out_dir / f"{basename}_sigpages.pdf"
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key(pdf_path, content_hash)
+            cached = self.cache.get(cache_key, pdf_path.stem, out_dir)
+            if cached is not None:
+                return cached
         
-        with PyPDF2.PdfReader(pdf_path) as reader:
-            writer = PyPDF2.PdfWriter()
-            for page_num in signature_pages:
-                writer.add_page(reader.pages[page_num - 1])
-            
-            with open(output_pdf, "wb") as f:
-                writer.write(f)
+        report = on_stage or (lambda _stage: None)
         
-        # Generate PNG images and build manifest
-        manifest = {}
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num in signature_pages:
-                page = pdf.pages[page_num - 1]
-                image = page.to_image(resolution=300)
-                png_path = out_dir / f"{basename}_page{page_num}.png"
-                image.save(png_path)
+        with self.open_session(pdf_path) as session:
+            # Get pages with signatures
+            report("detecting")
+            if self.mode == LAYOUT_MODE:
+                # Layout text is persisted next to the output for the renamer and search
+                with PageTextIndex(pdf_path, out_dir / TEXT_INDEX_FILE, session=session) as index:
+                    signature_pages = self.detect_pages_in(session, index)
+            else:
+                signature_pages = self.detect_pages_in(session)
+            if not signature_pages:
+                return {}
                 
-                manifest[page_num] = {
-                    "pdf": str(output_pdf),
-                    "png": str(png_path)
-                }
+            # Create output PDF with signature pages
+            basename = pdf_path.stem
+            output_pdf = out_dir / f"{basename}_sigpages.pdf"
+            report("subsetting")
+            session.write_subset(signature_pages, output_pdf)
+            
+            manifest = {page_num: {"pdf": str(output_pdf)} for page_num in signature_pages}
+            if self.render_pngs:
+                # Generate PNG images
+                report("rendering")
+                for page_num in signature_pages:
+                    image = session.render_page(page_num, resolution=self.resolution)
+                    png_path = out_dir / f"{basename}_page{page_num}.png"
+                    image.save(png_path)
+                    manifest[page_num]["png"] = str(png_path)
         
-        return manifest 
\ No newline at end of file
+        if cache_key is not None:
+            self.cache.put(cache_key, manifest)
+        return manifest
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.services.job_pipeline import ExtractionPipeline
+from app.services.job_state import TERMINAL_STATES
+from app.services.metadata_store import JobRecord, MetadataStore
+
+logger = logging.getLogger(__name__)
+
+# Held in the metadata database while a worker sweeps
+SWEEP_LOCK = "storage-sweep"
+
+
+class SweepReport(BaseModel):
+    """What one storage sweep found and removed"""
+    bytes_before: int
+    bytes_after: int
+    # Jobs removed entirely, because they expired or to meet the quota
+    expired_jobs: List[str] = Field(default_factory=list)
+    evicted_jobs: List[str] = Field(default_factory=list)
+    # Jobs whose derived outputs were removed, keeping the uploaded originals
+    trimmed_jobs: List[str] = Field(default_factory=list)
+    cache_files_evicted: int = 0
+
+
+def _tree_size(path: Path) -> int:
+    """Bytes used by the files under ``path``, or by ``path`` itself if it is a file."""
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                continue  # Removed while walking
+    return total
+
+
+class StorageManager:
+    """Keeps job storage and render caches within a TTL and a disk quota.
+
+    Each sweep first deletes jobs that have not been accessed within the
+    TTL. If usage is still above the quota, space is reclaimed cheapest
+    first until usage is back under the low watermark: cached page renders,
+    then the derived outputs of each job (subset PDFs, PNGs, text indexes
+    and manifests), then whole jobs including their uploaded originals, in
+    least recently used order. Jobs still being processed or downloaded by
+    any worker are never touched. Derived outputs are recreated on demand by
+    the next download or render.
+
+    Every worker runs a sweeper, but sweeps take a lock in the shared
+    metadata database, so only one of them sweeps at a time.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str | Path,
+        store: MetadataStore,
+        job_ttl: float,
+        max_bytes: int,
+        pipeline: Optional[ExtractionPipeline] = None,
+        cache_dirs: Sequence[str | Path] = (),
+        low_watermark: float = 0.9,
+        download_timeout: float = 3600.0,
+        lock_ttl: float = 600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            storage_dir: Directory holding one subdirectory per job
+            store: Metadata index of the jobs
+            job_ttl: Seconds since its last access after which a job is deleted
+            max_bytes: Quota for the storage and cache directories together
+            pipeline: Optional pipeline whose unfinished jobs are protected and
+                whose results are dropped for removed outputs
+            cache_dirs: Caches of derived files to evict first, such as page renders
+            low_watermark: Fraction of ``max_bytes`` to evict down to once over quota
+            download_timeout: Seconds after which a download that never finished,
+                e.g. because its worker exited, stops protecting its job
+            lock_ttl: Seconds after which the sweep lock of a worker that died
+                mid-sweep lapses
+            clock: Current time in seconds, replaceable for tests
+        """
+        self.storage_dir = Path(storage_dir)
+        self.store = store
+        self.job_ttl = job_ttl
+        self.max_bytes = max_bytes
+        self.pipeline = pipeline
+        self.cache_dirs = [Path(d) for d in cache_dirs]
+        self.low_watermark = low_watermark
+        self.download_timeout = download_timeout
+        self.lock_ttl = lock_ttl
+        self.clock = clock
+        self.sweeps = 0
+        self.expired_jobs = 0
+        self.evicted_jobs = 0
+        self.trimmed_jobs = 0
+        self.cache_files_evicted = 0
+        self.bytes_freed = 0
+        self.last_sweep: Optional[SweepReport] = None
+        self._lock = threading.Lock()
+        self._owner = uuid.uuid4().hex
+
+    def _protected(self, jobs: List[JobRecord], now: float) -> set:
+        """Jobs that some worker is still processing or downloading."""
+        protected = self.store.active_downloads(now - self.download_timeout)
+        if self.pipeline is None:
+            return protected
+        protected |= self.pipeline.running_jobs()
+        for job in jobs:
+            files = self.pipeline.state.get_job(job.id) or []
+            # A file stuck for longer than the TTL belongs to a worker that exited
+            if any(
+                f.status not in TERMINAL_STATES and now - f.state_since < self.job_ttl
+                for f in files
+            ):
+                protected.add(job.id)
+        return protected
+
+    def _downloading(self, job_id: str, now: float) -> bool:
+        """Whether a download of the job started since the sweep's protection check."""
+        return job_id in self.store.active_downloads(now - self.download_timeout)
+
+    def _job_sizes(self, job_dir: Path) -> Tuple[int, int]:
+        """(original bytes, derived bytes) of a job directory."""
+        originals = derived = 0
+        if not job_dir.is_dir():
+            return 0, 0
+        for entry in job_dir.iterdir():
+            try:
+                if entry.is_dir():
+                    derived += _tree_size(entry)
+                else:
+                    originals += entry.stat().st_size
+            except OSError:
+                continue
+        return originals, derived
+
+    def _cache_files(self) -> List[Tuple[float, int, Path]]:
+        """(last modified, size, path) of every cached file, oldest first."""
+        files = []
+        for cache_dir in self.cache_dirs:
+            for root, _, names in os.walk(cache_dir):
+                for name in names:
+                    path = Path(root) / name
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    files.append((max(stat.st_mtime, stat.st_atime), stat.st_size, path))
+        return sorted(files)
+
+    def usage(self) -> int:
+        """Bytes currently used by job storage and the managed caches."""
+        return sum(_tree_size(d) for d in [self.storage_dir, *self.cache_dirs] if d.exists())
+
+    def _delete_job(self, job_id: str) -> None:
+        shutil.rmtree(self.storage_dir / job_id, ignore_errors=True)
+        self.store.delete_job(job_id)
+        if self.pipeline is not None:
+            self.pipeline.delete(job_id)
+
+    def _trim_job(self, job_id: str) -> None:
+        job_dir = self.storage_dir / job_id
+        for entry in job_dir.iterdir():
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+        for record in self.store.list_files(job_id):
+            self.store.set_artifacts(record.id, {})
+        if self.pipeline is not None:
+            self.pipeline.forget(job_id)
+
+    def sweep(self) -> Optional[SweepReport]:
+        """
+        Expire old jobs, then evict until usage is under the quota.
+
+        Returns:
+            What was removed, or None if another worker is sweeping
+        """
+        with self._lock:
+            if not self.store.acquire_lock(SWEEP_LOCK, self._owner, self.lock_ttl):
+                return None
+            try:
+                return self._sweep()
+            finally:
+                self.store.release_lock(SWEEP_LOCK, self._owner)
+
+    def _sweep(self) -> SweepReport:
+        now = self.clock()
+        usage = self.usage()
+        report = SweepReport(bytes_before=usage, bytes_after=usage)
+
+        jobs = self.store.list_jobs()
+        protected = self._protected(jobs, now)
+        jobs = [job for job in jobs if job.id not in protected]
+        # Downloads do not wait for the sweep lock, so each job is checked again
+        # right before anything of it is removed
+        for job in jobs:
+            if now - job.accessed_at > self.job_ttl and not self._downloading(job.id, now):
+                self._delete_job(job.id)
+                report.expired_jobs.append(job.id)
+        expired = set(report.expired_jobs)
+        jobs = [job for job in jobs if job.id not in expired]
+
+        usage = self.usage()
+        target = self.max_bytes * self.low_watermark
+        if usage > self.max_bytes:
+            # Cached renders are the cheapest to recreate
+            for _, size, path in self._cache_files():
+                if usage <= target:
+                    break
+                path.unlink(missing_ok=True)
+                usage -= size
+                report.cache_files_evicted += 1
+
+            sizes: Dict[str, Tuple[int, int]] = {
+                job.id: self._job_sizes(self.storage_dir / job.id) for job in jobs
+            }
+            # Then the derived outputs of the least recently used jobs
+            for job in jobs:
+                if usage <= target:
+                    break
+                derived = sizes[job.id][1]
+                if derived and not self._downloading(job.id, now):
+                    self._trim_job(job.id)
+                    usage -= derived
+                    report.trimmed_jobs.append(job.id)
+            # Then the jobs themselves
+            for job in jobs:
+                if usage <= target:
+                    break
+                if self._downloading(job.id, now):
+                    continue
+                self._delete_job(job.id)
+                usage -= sizes[job.id][0]
+                report.evicted_jobs.append(job.id)
+
+        report.bytes_after = self.usage()
+        self.sweeps += 1
+        self.expired_jobs += len(report.expired_jobs)
+        self.evicted_jobs += len(report.evicted_jobs)
+        self.trimmed_jobs += len(report.trimmed_jobs)
+        self.cache_files_evicted += report.cache_files_evicted
+        self.bytes_freed += max(report.bytes_before - report.bytes_after, 0)
+        self.last_sweep = report
+        return report
+
+    async def run(self, interval: float) -> None:
+        """Sweep every ``interval`` seconds until cancelled."""
+        while True:
+            try:
+                report = await asyncio.to_thread(self.sweep)
+                if report is not None and report.bytes_before != report.bytes_after:
+                    logger.info(
+                        "Storage sweep freed %d bytes: %d expired, %d evicted, %d trimmed jobs",
+                        report.bytes_before - report.bytes_after,
+                        len(report.expired_jobs),
+                        len(report.evicted_jobs),
+                        len(report.trimmed_jobs),
+                    )
+            except Exception:
+                logger.exception("Storage sweep failed")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, float]:
+        """Eviction counters for this process and the result of the last sweep."""
+        last = self.last_sweep
+        return {
+            "sweeps": self.sweeps,
+            "expired_jobs": self.expired_jobs,
+            "evicted_jobs": self.evicted_jobs,
+            "trimmed_jobs": self.trimmed_jobs,
+            "cache_files_evicted": self.cache_files_evicted,
+            "bytes_freed": self.bytes_freed,
+            "bytes_used": last.bytes_after if last is not None else 0,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.services.atomic_write import atomic_write_text
+
+
+class SuggestionCache:
+    """Two-level cache of model filename suggestions.
+
+    Entries are keyed by a hash of the text sent to the model plus the prompt
+    version. A bounded in-memory LRU answers repeat lookups without I/O, and
+    every entry is also written to a small JSON file on disk so suggestions
+    survive restarts. Entries older than ``ttl`` seconds are treated as misses.
+    """
+
+    def __init__(self, root: str | Path, max_memory_entries: int = 1024, ttl: float = 30 * 86400):
+        """
+        Args:
+            root: Directory of the on-disk store
+            max_memory_entries: Entries kept in the in-memory LRU
+            ttl: Seconds a suggestion stays valid
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, prompt_version: int | str) -> str:
+        """Cache key for the text sent to the model and the prompt it was sent with."""
+        return hashlib.sha256(f"{prompt_version}\0{text}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, name: str, created: float) -> None:
+        # Caller holds the lock
+        self._memory[key] = (name, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a suggestion.
+
+        Args:
+            key: Cache key from ``key()``
+
+        Returns:
+            The suggested filename, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text())
+            name, created = data["name"], float(data["created"])
+        except (OSError, ValueError, KeyError, TypeError):
+            name = None
+        else:
+            if now - created > self.ttl:
+                path.unlink(missing_ok=True)
+                name = None
+
+        with self._lock:
+            if name is None:
+                self.misses += 1
+                return None
+            self._remember(key, name, created)
+            self.disk_hits += 1
+        return name
+
+    def put(self, key: str, name: str) -> None:
+        """
+        Store a suggestion in memory and on disk.
+
+        Args:
+            key: Cache key from ``key()``
+            name: Suggested filename
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, name, created)
+
+        atomic_write_text(self._path(key), json.dumps({"name": name, "created": created}))
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process and the size of the in-memory LRU."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "ttl": self.ttl,
+            }
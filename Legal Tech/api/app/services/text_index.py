@@ -0,0 +1,204 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.atomic_write import atomic_write_text
+from app.services.ocr import OcrService, default_ocr_service
+from app.services.pdf_document import PdfDocumentSession
+
+TEXT_INDEX_FILE = "text_index.json"
+
+
+def text_index_path(pdf_path: str | Path) -> Path:
+    """Where a stored PDF's index lives: in its output directory inside the job."""
+    pdf_path = Path(pdf_path)
+    return pdf_path.parent / pdf_path.stem / TEXT_INDEX_FILE
+
+
+class PageTextIndex:
+    """Per-file cache of layout text and OCR results for a stored PDF.
+
+    Layout-mode detection reads page text through the index, and the renamer
+    keeps the OCR of scanned documents' headers in it. Results are persisted
+    as JSON next to the job, so detecting the same file again (for example
+    with other detector settings) or renaming a scanned document again does
+    not repeat pdfplumber's extraction or Tesseract. The renamer's own text
+    comes from PDFium's raw character stream, read through ``session``,
+    since layout text differs from it in spacing and line breaks. The PDF is
+    only opened when something is missing from the index.
+    """
+
+    # Bump when extraction changes in a way that invalidates stored text
+    VERSION = 2
+
+    def __init__(
+        self,
+        pdf_path: str | Path,
+        path: Optional[str | Path] = None,
+        session: Optional[PdfDocumentSession] = None,
+        ocr: Optional[OcrService] = None,
+    ):
+        """
+        Args:
+            pdf_path: The indexed PDF
+            path: Where to persist the index; defaults to ``text_index_path(pdf_path)``
+            session: Already open session to extract missing pages with
+            ocr: OCR service for pages without a text layer; defaults to the
+                process-wide service, started on first use
+        """
+        self.pdf_path = Path(pdf_path)
+        self.path = Path(path) if path is not None else text_index_path(pdf_path)
+        self._ocr_service = ocr
+        self._session = session
+        self._owns_session = False
+        # Pages served from the index vs. extracted (or OCR'd) by this instance
+        self.reused = 0
+        self.extracted = 0
+        self._dirty = False
+
+        stat = self.pdf_path.stat()
+        self._fingerprint = f"v{self.VERSION}|{stat.st_size}|{stat.st_mtime_ns}"
+        self._page_count: Optional[int] = None
+        self._text: Dict[int, str] = {}
+        # Keyed by page number and DPI, plus the rendered fraction for partial pages
+        self._ocr: Dict[str, str] = {}
+        self._load()
+
+    def __enter__(self) -> "PageTextIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _read(self) -> Optional[dict]:
+        """The stored index, if there is one for this version of the file."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("fingerprint") != self._fingerprint:
+            return None  # Built for another version of the file
+        return data
+
+    def _load(self) -> None:
+        data = self._read()
+        if data is None:
+            return
+        self._page_count = data.get("page_count")
+        self._text = {int(n): text for n, text in data.get("text", {}).items()}
+        self._ocr = dict(data.get("ocr", {}))
+
+    @property
+    def session(self) -> PdfDocumentSession:
+        if self._session is None:
+            self._session = PdfDocumentSession(self.pdf_path)
+            self._owns_session = True
+        return self._session
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._page_count = self.session.page_count
+            self._dirty = True
+        return self._page_count
+
+    def page_text(self, page_num: int) -> str:
+        """
+        Layout-aware text of a page, extracting it on first use.
+
+        Args:
+            page_num: 1-based page index
+
+        Returns:
+            The page text, or an empty string if the page has no text layer
+        """
+        if page_num in self._text:
+            self.reused += 1
+            return self._text[page_num]
+        text = self.session.page_text(page_num)
+        self._text[page_num] = text
+        self.extracted += 1
+        self._dirty = True
+        return text
+
+    @property
+    def ocr_service(self) -> OcrService:
+        if self._ocr_service is None:
+            self._ocr_service = default_ocr_service()
+        return self._ocr_service
+
+    def ocr_text(self, page_num: int, top_fraction: float = 1.0) -> str:
+        """
+        OCR text of a page, running Tesseract on first use.
+
+        Args:
+            page_num: 1-based page index
+            top_fraction: Only OCR this fraction of the page, from the top
+
+        Returns:
+            Text recognized in a grayscale render of the page
+        """
+        return self.ocr_texts([page_num], top_fraction)[page_num]
+
+    def ocr_texts(self, page_nums: List[int], top_fraction: float = 1.0) -> Dict[int, str]:
+        """
+        OCR text of several pages, recognizing the missing ones in parallel.
+
+        Pages are rendered here, one at a time since PDFium is not
+        thread-safe, and recognized concurrently by the OCR service.
+
+        Args:
+            page_nums: 1-based page indices
+            top_fraction: Only OCR this fraction of each page, from the top
+
+        Returns:
+            Recognized text keyed by page number
+        """
+        dpi = self.ocr_service.dpi
+        keys = {}
+        for page_num in page_nums:
+            key = f"{page_num}@{dpi}"
+            if top_fraction < 1:
+                key += f":{top_fraction}"
+            keys[page_num] = key
+
+        missing = [page_num for page_num in page_nums if keys[page_num] not in self._ocr]
+        self.reused += len(page_nums) - len(missing)
+        futures = []
+        for page_num in missing:
+            image = self.session.render_page(page_num, resolution=dpi, top_fraction=top_fraction)
+            futures.append(self.ocr_service.submit(image.convert("L")))
+        for page_num, future in zip(missing, futures, strict=True):
+            self._ocr[keys[page_num]] = future.result()
+            self.extracted += 1
+            self._dirty = True
+        return {page_num: self._ocr[keys[page_num]] for page_num in page_nums}
+
+    def save(self) -> None:
+        """Persist newly extracted pages, if any."""
+        if not self._dirty:
+            return
+        # Keep pages another process added since this index was loaded
+        stored = self._read() or {}
+        for n, text in stored.get("text", {}).items():
+            self._text.setdefault(int(n), text)
+        for key, text in stored.get("ocr", {}).items():
+            self._ocr.setdefault(key, text)
+        self._page_count = self._page_count or stored.get("page_count")
+
+        data = {
+            "fingerprint": self._fingerprint,
+            "page_count": self._page_count,
+            "text": self._text,
+            "ocr": self._ocr,
+        }
+        atomic_write_text(self.path, json.dumps(data))
+        self._dirty = False
+
+    def close(self) -> None:
+        """Save the index and close the PDF if this index opened it."""
+        self.save()
+        if self._owns_session:
+            self._session.close()
+            self._session = None
+            self._owns_session = False
@@ -0,0 +1,72 @@
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"File {filename} exceeds the maximum upload size of {max_bytes} bytes")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+class StoredUpload(BaseModel):
+    """An upload written to disk"""
+    path: Path
+    size: int
+    sha256: str
+
+
+def _write_chunk(dest: BinaryIO, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    dest.write(chunk)
+
+
+async def save_upload(
+    upload: UploadFile, dest: Path, max_bytes: int, chunk_size: int = 1024 * 1024
+) -> StoredUpload:
+    """
+    Stream an upload to disk in fixed-size chunks, hashing it on the way.
+
+    Disk writes and hashing run in the threadpool so the event loop never
+    blocks on them, and at most one chunk of the file is held in memory.
+    A partially written file is removed if the upload fails or is too large.
+
+    Args:
+        upload: The uploaded file
+        dest: Where to write it
+        max_bytes: Maximum accepted size
+        chunk_size: Bytes read and written per step
+
+    Returns:
+        StoredUpload: Path, size and SHA-256 of the written file
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than ``max_bytes``
+    """
+    # Multipart parsing already knows the size; reject before copying anything
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(upload.filename, max_bytes)
+
+    digest = hashlib.sha256()
+    size = 0
+    out = await asyncio.to_thread(open, dest, "wb")
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(upload.filename, max_bytes)
+            await asyncio.to_thread(_write_chunk, out, digest, chunk)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        dest.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(out.close)
+
+    return StoredUpload(path=dest, size=size, sha256=digest.hexdigest())
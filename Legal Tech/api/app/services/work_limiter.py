@@ -0,0 +1,191 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+# Classes of CPU-heavy request work, each with its own concurrency limit
+RENDER = "render"
+OCR = "ocr"
+ZIP = "zip"
+
+
+class WorkRejectedError(RuntimeError):
+    """Raised when CPU work is not admitted because its class is saturated."""
+
+    def __init__(self, work_class: str, retry_after: int, queue_full: bool):
+        """
+        Args:
+            work_class: The saturated work class
+            retry_after: Suggested seconds before retrying
+            queue_full: True if the request was turned away without queueing,
+                False if it queued but no slot freed up in time
+        """
+        reason = "queue is full" if queue_full else "timed out waiting for a slot"
+        super().__init__(f"Too much {work_class} work in progress: {reason}")
+        self.work_class = work_class
+        self.retry_after = retry_after
+        self.queue_full = queue_full
+
+
+class _WorkClass:
+    def __init__(self, limit: int, max_queued: int):
+        self.limit = limit
+        self.max_queued = max_queued
+        self.running = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long one unit of work holds a slot
+        self.avg_seconds: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+
+class WorkTicket:
+    """A slot held by one unit of admitted work; release it exactly once."""
+
+    def __init__(self, limiter: "WorkLimiter", work_class: str):
+        self.work_class = work_class
+        self._limiter = limiter
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        """Give the slot back. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        self._limiter._finish(self.work_class, time.monotonic() - self._started)
+
+
+class WorkLimiter:
+    """Admission control for CPU-bound work started by requests.
+
+    Every work class has a limit on how many units run at once and on how
+    many may wait behind them. Requests beyond that are rejected immediately,
+    and queued requests give up after a timeout, so heavy endpoints fail fast
+    with a retry hint instead of piling up work that slows every request.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        max_queued: int = 16,
+        queue_timeout: float = 10.0,
+    ):
+        """
+        Args:
+            limits: Maximum concurrent units of work per class
+            max_queued: Maximum units waiting for a slot, per class
+            queue_timeout: Seconds a unit may wait for a slot before it is rejected
+        """
+        self.queue_timeout = queue_timeout
+        self._classes = {
+            name: _WorkClass(max(limit, 1), max_queued) for name, limit in limits.items()
+        }
+        self._lock = threading.Lock()
+
+    def _retry_after(self, work: _WorkClass) -> int:
+        """Seconds until a slot is likely free, from queue length and recent durations."""
+        avg_seconds = work.avg_seconds or 1.0
+        waves = (len(work.waiters) + work.running) / work.limit
+        return min(max(math.ceil(avg_seconds * waves), 1), 60)
+
+    async def acquire(self, work_class: str, timeout: Optional[float] = None) -> WorkTicket:
+        """
+        Wait for a slot in a work class.
+
+        Args:
+            work_class: Class of the work, e.g. ``RENDER``
+            timeout: Seconds to wait for a slot; defaults to ``queue_timeout``
+
+        Returns:
+            A ticket to release once the work is done
+
+        Raises:
+            WorkRejectedError: If the class's queue is full, or no slot freed
+                up within the timeout
+        """
+        work = self._classes[work_class]
+        with self._lock:
+            if work.running < work.limit and not work.waiters:
+                work.running += 1
+                work.admitted += 1
+                return WorkTicket(self, work_class)
+            if len(work.waiters) >= work.max_queued:
+                work.rejected += 1
+                raise WorkRejectedError(work_class, self._retry_after(work), queue_full=True)
+            waiter = asyncio.get_running_loop().create_future()
+            work.waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout if timeout is None else timeout)
+        except BaseException as e:
+            with self._lock:
+                if waiter in work.waiters:
+                    work.waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just as we gave up; pass it on
+                    self._hand_on(work)
+                if isinstance(e, asyncio.TimeoutError):
+                    work.timed_out += 1
+                    raise WorkRejectedError(
+                        work_class, self._retry_after(work), queue_full=False
+                    ) from None
+            raise
+        with self._lock:
+            work.admitted += 1
+        return WorkTicket(self, work_class)
+
+    @asynccontextmanager
+    async def admit(self, work_class: str) -> AsyncIterator[WorkTicket]:
+        """Hold a slot in a work class for the duration of a ``with`` block."""
+        ticket = await self.acquire(work_class)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _finish(self, work_class: str, seconds: float) -> None:
+        work = self._classes[work_class]
+        with self._lock:
+            if work.avg_seconds is None:
+                work.avg_seconds = seconds
+            else:
+                work.avg_seconds = 0.8 * work.avg_seconds + 0.2 * seconds
+            self._hand_on(work)
+
+    def _hand_on(self, work: _WorkClass) -> None:
+        """Pass a freed slot to the next live waiter, or free it. Call with the lock held."""
+        while work.waiters:
+            waiter = work.waiters.popleft()
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(self._grant, work, waiter)
+                return
+        work.running -= 1
+
+    def _grant(self, work: _WorkClass, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # The waiter was cancelled before the slot reached it
+            with self._lock:
+                self._hand_on(work)
+        else:
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Occupancy and admission counters per work class."""
+        with self._lock:
+            return {
+                name: {
+                    "limit": work.limit,
+                    "running": work.running,
+                    "queued": len(work.waiters),
+                    "admitted": work.admitted,
+                    "rejected": work.rejected,
+                    "timed_out": work.timed_out,
+                    "avg_seconds": round(work.avg_seconds or 0.0, 4),
+                }
+                for name, work in self._classes.items()
+            }
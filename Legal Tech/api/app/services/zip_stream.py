@@ -0,0 +1,76 @@
+import zipfile
+from pathlib import Path
+from typing import Iterator, List
+
+# Formats that are already compressed and gain nothing from deflate
+STORED_SUFFIXES = {".png"}
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that collects written bytes until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+class ZipStream:
+    """Builds a ZIP archive incrementally and hands back its bytes as they are produced.
+
+    The archive is written to a non-seekable sink, so ``zipfile`` emits data
+    descriptors after each entry instead of seeking back to patch headers.
+    At most one read chunk and its compressed output are held in memory at a
+    time, regardless of how many or how large the entries are.
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024):
+        self.chunk_size = chunk_size
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED)
+        self.names = set()
+
+    def add_file(self, path: str | Path, arcname: str) -> Iterator[bytes]:
+        """
+        Append a file to the archive.
+
+        Args:
+            path: File to add
+            arcname: Name of the entry inside the archive
+
+        Yields:
+            Archive bytes as they are written
+        """
+        path = Path(path)
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        if path.suffix.lower() in STORED_SUFFIXES:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        self.names.add(arcname)
+
+        with open(path, "rb") as src, self._zip.open(info, "w") as dest:
+            while chunk := src.read(self.chunk_size):
+                dest.write(chunk)
+                yield from self._sink.drain()
+        yield from self._sink.drain()
+
+    def close(self) -> Iterator[bytes]:
+        """
+        Finish the archive.
+
+        Yields:
+            The remaining bytes, including the central directory
+        """
+        self._zip.close()
+        yield from self._sink.drain()
@@ -0,0 +1,97 @@
+"""End-of-quarter signature runs: one envelope at a time vs. the bulk sender.
+
+Sends a batch of envelopes to a local stub of the eSignature API that
+answers after a fixed latency and rate-limits a share of first attempts.
+The old path is modelled as one blocking call per envelope on a fresh
+connection without retries; the bulk sender shares a connection pool,
+keeps several envelopes in flight and retries 429 responses without
+creating duplicates. The script reports wall time, envelopes sent and
+connections opened for both.
+
+Usage::
+
+    python -m benchmarks.bulk_envelopes --envelopes 200 --latency 0.1 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.anchor_index import SignatureAnchorIndexer
+from app.services.envelope_sender import SENT, BulkEnvelopeSender, EnvelopeRequest
+from benchmarks.common import make_binder
+from benchmarks.esign_stub import StubESignServer
+
+
+def make_envelopes(pdf_path: Path, count: int, rate_limited: float):
+    every = round(1 / rate_limited) if rate_limited else 0
+    return [
+        EnvelopeRequest(
+            pdf_path=str(pdf_path),
+            subject=f"Quarter-end consent {i}" + (" [429]" if every and i % every == 0 else ""),
+            recipients=[{"name": f"Signer {i}", "email": f"signer{i}@example.com", "page_no": "5"}],
+        )
+        for i in range(count)
+    ]
+
+
+async def one_at_a_time(server: StubESignServer, anchors, envelopes):
+    results = []
+    for envelope in envelopes:
+        # A new client per envelope: a new connection and no retries
+        sender = BulkEnvelopeSender(
+            "acct", "token", server.base_path, anchors=anchors, concurrency=1, max_retries=0
+        )
+        results.extend(await sender.send_all([envelope]))
+    return results
+
+
+async def bulk(server: StubESignServer, anchors, envelopes, concurrency: int):
+    sender = BulkEnvelopeSender(
+        "acct", "token", server.base_path, anchors=anchors, concurrency=concurrency, backoff=0.05
+    )
+    return await sender.send_all(envelopes)
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_binder(Path(tmp) / "consent.pdf", 10, signature_every=5)
+        anchors = SignatureAnchorIndexer()
+        anchors.index(pdf_path)  # Stored once; both runs reuse it
+        envelopes = make_envelopes(pdf_path, args.envelopes, args.rate_limited)
+        print(
+            f"{args.envelopes} envelopes, {args.latency}s API latency, "
+            f"{args.rate_limited:.0%} rate-limited on first attempt"
+        )
+        runs = (
+            ("one at a time (before)", lambda server: one_at_a_time(server, anchors, envelopes)),
+            (
+                f"bulk, concurrency {args.concurrency}",
+                lambda server: bulk(server, anchors, envelopes, args.concurrency),
+            ),
+        )
+        for label, send in runs:
+            with StubESignServer(latency=args.latency) as server:
+                start = time.perf_counter()
+                results = await send(server)
+                seconds = time.perf_counter() - start
+            sent = sum(result.status == SENT for result in results)
+            print(
+                f"  {label:<24} {seconds:7.2f} s   sent {sent:4d}/{len(results)}   "
+                f"connections {len(server.connections):4d}   requests {len(server.requests):4d}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--envelopes", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate-limited", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Helpers shared by the benchmark scripts.
+
+Each benchmark is run from the ``api`` directory as a module, for example
+``python -m benchmarks.document_session``.
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+
+def make_binder(path: Path, pages: int, signature_every: int = 25) -> Path:
+    """Write a synthetic closing binder with a signature block every few pages."""
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page_num in range(1, pages + 1):
+        text = c.beginText(72, 720)
+        for line in range(40):
+            text.textLine(
+                f"Section {page_num}.{line} The parties agree to the terms set out herein."
+            )
+        c.drawText(text)
+        if page_num % signature_every == 0:
+            c.drawString(72, 120, "Signature: " + "_" * 40)
+            c.drawString(72, 100, "Signed by: Authorized Signatory")
+        c.showPage()
+    c.save()
+    return path
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MiB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB elsewhere
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def timed(func: Callable[[], object]) -> Dict[str, float]:
+    """Run ``func`` once and report wall time and peak RSS."""
+    start = time.perf_counter()
+    func()
+    return {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_isolated(module: str, *args: str) -> Dict[str, float]:
+    """Run one benchmark variant in a fresh interpreter so peak RSS is not shared."""
+    output = subprocess.run(
+        [sys.executable, "-m", module, *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
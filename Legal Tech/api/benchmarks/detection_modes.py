@@ -0,0 +1,51 @@
+"""Pages per second of signature detection in layout and fast modes.
+
+Both modes must report the same pages; the script exits with an error if
+they do not. The ``fast+tail`` variant scans the last pages first and stops
+after the first match, as configured by DETECTION_TAIL_PAGES and
+DETECTION_STOP_AFTER.
+
+Usage::
+
+    python -m benchmarks.detection_modes --pages 300
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.signature_detector import FAST_MODE, LAYOUT_MODE, SignatureDetector
+from benchmarks.common import make_binder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    args = parser.parse_args()
+
+    variants = {
+        "layout": SignatureDetector(mode=LAYOUT_MODE),
+        "fast": SignatureDetector(mode=FAST_MODE),
+        "fast+tail": SignatureDetector(mode=FAST_MODE, tail_pages=50, stop_after=1),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_binder(Path(tmp) / "binder.pdf", args.pages)
+        print(f"{args.pages}-page binder")
+        results = {}
+        for name, detector in variants.items():
+            start = time.perf_counter()
+            results[name] = detector.detect_pages(pdf_path)
+            seconds = time.perf_counter() - start
+            print(
+                f"  {name:<10} {args.pages / seconds:8.1f} pages/s   "
+                f"{seconds:6.2f} s   {len(results[name])} signature pages"
+            )
+
+    if results["fast"] != results["layout"]:
+        raise SystemExit("fast mode found different pages than layout mode")
+
+
+if __name__ == "__main__":
+    main()
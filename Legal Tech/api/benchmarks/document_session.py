@@ -0,0 +1,85 @@
+"""Wall time and peak RSS of signature page extraction, before and after
+``PdfDocumentSession``.
+
+The ``legacy`` variant reproduces the previous ``extract_pages`` flow, which
+parsed the PDF three times (pdfplumber for detection, PyPDF2 for the subset,
+pdfplumber again for rendering, which itself reopens PDFium per page).
+
+Usage::
+
+    python -m benchmarks.document_session --pages 500
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+import pdfplumber
+import PyPDF2
+
+from app.services.signature_detector import SignatureDetector
+from benchmarks.common import make_binder, run_isolated, timed
+
+
+def legacy_extract_pages(pdf_path: Path, out_dir: Path) -> dict:
+    detector = SignatureDetector()
+    signature_pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num, page in enumerate(pdf.pages, start=1):
+            text = page.extract_text() or ""
+            if any(pattern.search(text) for pattern in detector.signature_patterns):
+                signature_pages.append(page_num)
+
+    output_pdf = out_dir / f"{pdf_path.stem}_sigpages.pdf"
+    reader = PyPDF2.PdfReader(pdf_path)
+    writer = PyPDF2.PdfWriter()
+    for page_num in signature_pages:
+        writer.add_page(reader.pages[page_num - 1])
+    with open(output_pdf, "wb") as f:
+        writer.write(f)
+
+    manifest = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in signature_pages:
+            png_path = out_dir / f"{pdf_path.stem}_page{page_num}.png"
+            pdf.pages[page_num - 1].to_image(resolution=300).save(png_path)
+            manifest[page_num] = {"pdf": str(output_pdf), "png": str(png_path)}
+    return manifest
+
+
+def session_extract_pages(pdf_path: Path, out_dir: Path) -> dict:
+    return SignatureDetector().extract_pages(pdf_path, out_dir)
+
+
+VARIANTS = {"legacy": legacy_extract_pages, "session": session_extract_pages}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--variant", choices=sorted(VARIANTS))
+    parser.add_argument("--pdf", type=Path)
+    args = parser.parse_args()
+
+    if args.variant:
+        with tempfile.TemporaryDirectory() as out_dir:
+            result = timed(lambda: VARIANTS[args.variant](args.pdf, Path(out_dir)))
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_binder(Path(tmp) / "binder.pdf", args.pages)
+        print(f"{args.pages}-page binder")
+        for variant in VARIANTS:
+            result = run_isolated(
+                "benchmarks.document_session", "--variant", variant, "--pdf", str(pdf_path)
+            )
+            print(
+                f"  {variant:<8} {result['seconds']:7.2f} s   "
+                f"peak RSS {result['peak_rss_mb']:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
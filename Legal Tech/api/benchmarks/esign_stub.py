@@ -0,0 +1,153 @@
+"""A local stand-in for the eSignature REST API's envelope endpoint.
+
+Used by the bulk envelope tests and benchmark. It accepts
+``POST <base path>/v2.1/accounts/<account>/envelopes`` over keep-alive HTTP/1.1,
+and ``GET`` on the same path to find envelopes by a ``custom_field=name=value``
+filter. It answers after a configurable latency and records every request,
+the connection it arrived on and how many were in flight at once. Markers in
+an envelope's subject script failures: ``[429]`` and ``[503]`` fail the
+first attempt, ``[502]`` creates the envelope but fails the first response
+as a gateway would, ``[500]`` fails every attempt and ``[400]`` is rejected.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+_ENVELOPES = re.compile(r"/v2\.1/accounts/[^/]+/envelopes$")
+
+
+class StubESignServer:
+    """Runs the stub on a free local port in a background thread."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: List[Dict] = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Created envelopes: (envelope ID, custom fields)
+        self.envelopes: List[tuple] = []
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_path(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/restapi"
+
+    def __enter__(self) -> "StubESignServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _respond(self, subject: str) -> tuple:
+        """(status, headers) for an envelope, from the markers in its subject."""
+        with self._lock:
+            attempt = self._attempts[subject] = self._attempts.get(subject, 0) + 1
+        if "[400]" in subject:
+            return 400, {}
+        if "[500]" in subject:
+            return 500, {}
+        if "[429]" in subject and attempt == 1:
+            return 429, {"Retry-After": "0"}
+        if "[503]" in subject and attempt == 1:
+            return 503, {}
+        if "[502]" in subject and attempt == 1:
+            return 502, {}
+        return 201, {}
+
+    def _create(self, envelope: dict) -> str:
+        fields = envelope.get("customFields", {}).get("textCustomFields", [])
+        envelope_id = str(uuid.uuid4())
+        with self._lock:
+            self.envelopes.append((envelope_id, {f["name"]: f["value"] for f in fields}))
+        return envelope_id
+
+    def _find(self, query: str) -> List[str]:
+        """IDs of the envelopes matching a ``custom_field=name=value`` filter."""
+        name, _, value = parse_qs(query).get("custom_field", [""])[0].partition("=")
+        with self._lock:
+            return [
+                envelope_id for envelope_id, fields in self.envelopes if fields.get(name) == value
+            ]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, _format, *_args):
+                pass
+
+            def _record(self, body) -> None:
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    stub.connections.add(self.client_address)
+                    stub.requests.append(
+                        {
+                            "method": self.command,
+                            "path": self.path,
+                            "authorization": self.headers.get("Authorization"),
+                            "envelope": body,
+                        }
+                    )
+
+            def _reply(self, status: int, payload: dict, headers: Dict[str, str]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._record(None)
+                try:
+                    time.sleep(stub.latency)
+                    url = urlsplit(self.path)
+                    if not _ENVELOPES.search(url.path):
+                        self._reply(404, {"errorCode": "STUB_ERROR"}, {})
+                        return
+                    ids = stub._find(url.query)
+                    envelopes = [{"envelopeId": envelope_id} for envelope_id in ids]
+                    self._reply(200, {"envelopes": envelopes, "resultSetSize": str(len(ids))}, {})
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self._record(body)
+                try:
+                    time.sleep(stub.latency)
+                    status, headers = stub._respond(body.get("emailSubject", ""))
+                    if not _ENVELOPES.search(self.path):
+                        status = 404
+                    elif status in (201, 502):
+                        envelope_id = stub._create(body)
+                    if status == 201:
+                        payload = {"envelopeId": envelope_id, "status": "sent"}
+                    else:
+                        payload = {"errorCode": "STUB_ERROR", "message": f"HTTP {status}"}
+                    self._reply(status, payload, headers)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+        return Handler
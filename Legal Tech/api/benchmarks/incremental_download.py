@@ -0,0 +1,78 @@
+"""Repeat downloads of an unchanged job: stored manifests vs. the result cache.
+
+A job's first download extracts every PDF. On a later download each PDF used
+to go through the engine again: it was hashed for the result cache and its
+outputs were placed again, or it was re-extracted without a cache. With
+stored manifests an unchanged PDF costs a stat call and a JSON read. The
+script times the first download and then a repeat download in three
+configurations.
+
+Usage::
+
+    python -m benchmarks.incremental_download --files 40 --pages 5
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.extraction_engine import ExtractionEngine
+from app.services.manifest_store import manifest_path
+from app.services.result_cache import ResultCache
+from benchmarks.common import make_binder
+
+
+async def download(engine: ExtractionEngine, files) -> float:
+    start = time.perf_counter()
+    async for _ in engine.extract_all(files):
+        pass
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = []
+        for i in range(args.files):
+            pdf_path = make_binder(tmp / f"doc{i}.pdf", args.pages, signature_every=5)
+            files.append((pdf_path, tmp / f"doc{i}"))
+
+        engine = ExtractionEngine(
+            max_workers=args.workers, cache=ResultCache(tmp / "cache", max_bytes=10**10)
+        )
+        try:
+            print(f"{args.files} files x {args.pages} pages")
+            print(f"  first download                 {await download(engine, files):6.2f} s")
+
+            def forget_manifests():
+                for _, out_dir in files:
+                    manifest_path(out_dir).unlink()
+
+            forget_manifests()
+            seconds = await download(engine, files)
+            print(f"  repeat, result cache only      {seconds:6.2f} s")
+
+            forget_manifests()
+            cache, engine.cache = engine.cache, None
+            seconds = await download(engine, files)
+            print(f"  repeat, no cache (before)      {seconds:6.2f} s")
+            engine.cache = cache
+
+            seconds = await download(engine, files)
+            print(f"  repeat, stored manifests       {seconds:6.2f} s")
+        finally:
+            engine.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Milliseconds per page of signature line detection on scanned pages.
+
+Builds a PDF of image-only pages (150 DPI scans with a few lines of text and
+a signature line on every fifth page) and times SignatureLineDetector over
+all of them on one core. The target is under 20 ms per page.
+
+Usage::
+
+    python -m benchmarks.line_detection --pages 100
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services.line_detector import SignatureLineDetector
+from app.services.pdf_document import PdfDocumentSession
+
+TARGET_MS_PER_PAGE = 20
+
+
+def make_scanned_binder(path: Path, pages: int) -> Path:
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page_num in range(1, pages + 1):
+        scan = Image.new("L", (1275, 1650), 255)
+        draw = ImageDraw.Draw(scan)
+        for line in range(40):
+            draw.text(
+                (150, 150 + line * 30), f"Section {page_num}.{line} The parties agree", fill=0
+            )
+        if page_num % 5 == 0:
+            draw.line((150, 1450, 750, 1450), fill=0, width=4)
+        scan_path = path.parent / f"scan{page_num}.png"
+        scan.save(scan_path)
+        c.drawImage(str(scan_path), 0, 0, *letter)
+        c.showPage()
+    c.save()
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_scanned_binder(Path(tmp) / "scanned.pdf", args.pages)
+        with PdfDocumentSession(pdf_path) as session:
+            start = time.perf_counter()
+            lines = SignatureLineDetector().detect(session)
+            seconds = time.perf_counter() - start
+
+    ms_per_page = seconds * 1000 / args.pages
+    print(f"{args.pages} scanned pages: {ms_per_page:.1f} ms/page, {len(lines)} lines found")
+    if ms_per_page > TARGET_MS_PER_PAGE:
+        raise SystemExit(f"slower than the {TARGET_MS_PER_PAGE} ms/page target")
+
+
+if __name__ == "__main__":
+    main()
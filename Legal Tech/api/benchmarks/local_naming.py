@@ -0,0 +1,110 @@
+"""Rename suggestions for a job: every file through the model vs. offline first.
+
+Builds a job in which some documents state their type, parties and date on
+the first page and the rest are vague, then names the job with the batch
+renamer twice against a stub model with a fixed latency: once with the
+offline tier disabled, as before, and once with it enabled. The script
+reports the wall time, how many files each source named, and the job
+summary's share of files served locally and estimated latency saved.
+
+Usage::
+
+    python -m benchmarks.local_naming --files 40 --clear 0.7 --latency 0.8
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services.batch_renamer import BatchRenamer
+from app.services.renamer import RenamerService
+
+DOC_TYPES = ["NON-DISCLOSURE AGREEMENT", "LEASE AGREEMENT", "PROMISSORY NOTE", "SERVICES AGREEMENT"]
+PARTIES = ["Acme Corp.", "Globex LLC", "Initech Inc.", "Umbrella Ltd."]
+
+
+class StubModel:
+    """Stands in for Gemini: answers after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, _prompt, **_config):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text="2024-01-01 Reviewed Document")
+
+
+def make_document(path: Path, lines) -> Path:
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for n, line in enumerate(lines):
+        c.drawString(72, 720 - 16 * n, line)
+    c.showPage()
+    c.save()
+    return path
+
+
+def make_job(directory: Path, files: int, clear: float):
+    paths = []
+    for i in range(files):
+        if i < files * clear:
+            lines = [
+                DOC_TYPES[i % len(DOC_TYPES)],
+                f"This agreement is dated March {i % 28 + 1}, 2024",
+                f"between {PARTIES[i % 4]} and {PARTIES[(i + 1) % 4]}",
+            ]
+        else:
+            lines = [f"Notes from the call, item {i}", "Follow up on the open points next week"]
+        paths.append(make_document(directory / f"doc{i}.pdf", lines))
+    return paths
+
+
+async def name_job(paths, args, min_local_confidence: float) -> None:
+    renamer = RenamerService(api_key="dummy-key", min_local_confidence=min_local_confidence)
+    renamer.model = StubModel(args.latency)
+    batch = BatchRenamer(
+        renamer, concurrency=args.concurrency, rate_per_second=args.rate, burst=args.concurrency
+    )
+    start = time.perf_counter()
+    suggestions = await batch.suggest_all([(path, path.name) for path in paths])
+    seconds = time.perf_counter() - start
+    summary = batch.summarize(suggestions)
+    label = "offline tier" if min_local_confidence <= 1 else "model only (before)"
+    print(
+        f"  {label:<20} {seconds:6.2f} s   model calls {renamer.model.calls:3d}   "
+        f"local {summary.local_fraction:5.0%}   "
+        f"est. saved {summary.estimated_seconds_saved or 0:6.1f} s"
+    )
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_job(Path(tmp), args.files, args.clear)
+        print(
+            f"{args.files} files, {args.clear:.0%} clear, model latency {args.latency}s, "
+            f"concurrency {args.concurrency}, {args.rate} calls/s"
+        )
+        await name_job(paths, args, min_local_confidence=1.1)
+        await name_job(paths, args, min_local_confidence=args.min_confidence)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--clear", type=float, default=0.7)
+    parser.add_argument("--latency", type=float, default=0.8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0)
+    parser.add_argument("--min-confidence", type=float, default=0.8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Job progress delivery: manifest polling vs. the pushed event stream.
+
+Uploads a batch of binders to the extraction pipeline and follows the job
+the way the web app does: either by fetching the manifest on a fixed
+interval, as App.tsx used to, or by consuming the pipeline's change stream
+that backs ``/api/job/{job_id}/events``. The script reports how many
+manifests each client fetched and, per file, how long after it completed
+the client saw it complete.
+
+Usage::
+
+    python -m benchmarks.progress_stream --files 8 --pages 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.services.extraction_engine import ExtractionEngine
+from app.services.job_pipeline import ExtractionPipeline
+from app.services.job_state import COMPLETED, FileState
+from benchmarks.common import make_binder
+
+Observed = Tuple[int, Dict[str, float]]
+
+
+async def poll(pipeline: ExtractionPipeline, job_id: str, interval: float) -> Observed:
+    """Fetch the manifest every ``interval`` seconds until the job is done."""
+    requests, seen = 0, {}
+    while True:
+        await asyncio.sleep(interval)
+        manifest = pipeline.manifest(job_id)
+        requests += 1
+        for file_state in manifest.files:
+            if file_state.status == COMPLETED:
+                seen.setdefault(file_state.id, time.time())
+        if manifest.status == COMPLETED:
+            return requests, seen
+
+
+async def stream(pipeline: ExtractionPipeline, job_id: str, _interval: float) -> Observed:
+    """Receive a manifest each time the job changes."""
+    requests, seen = 1, {}  # One long-lived connection
+    async for manifest in pipeline.watch(job_id):
+        for file_state in manifest.files:
+            if file_state.status == COMPLETED:
+                seen.setdefault(file_state.id, time.time())
+    return requests, seen
+
+
+async def follow(
+    engine: ExtractionEngine, pdf_paths: List[Path], job_dir: Path, client, interval: float
+):
+    pipeline = ExtractionPipeline(engine)
+    job_id = client.__name__
+    files = [FileState(id=str(n), filename=p.name) for n, p in enumerate(pdf_paths)]
+    start = time.perf_counter()
+    await pipeline.submit(job_id, files, pdf_paths, job_dir / job_id)
+    requests, seen = await client(pipeline, job_id, interval)
+    seconds = time.perf_counter() - start
+    # Completion timestamps recorded by the pipeline when each file finished
+    lags = [seen[f.id] - f._state_since for f in files]
+    return requests, lags, seconds
+
+
+async def run(args) -> None:
+    engine = ExtractionEngine(max_workers=args.workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_paths = [
+            make_binder(Path(tmp) / f"doc{i}.pdf", args.pages + 5 * i) for i in range(args.files)
+        ]
+        print(f"{args.files} files x ~{args.pages} pages, poll interval {args.interval}s")
+        try:
+            for client in (poll, stream):
+                requests, lags, seconds = await follow(
+                    engine, pdf_paths, Path(tmp), client, args.interval
+                )
+                print(
+                    f"  {client.__name__:<7} {requests:4d} requests   "
+                    f"update lag mean {statistics.mean(lags) * 1000:7.1f} ms  "
+                    f"max {max(lags) * 1000:7.1f} ms   job {seconds:5.2f} s"
+                )
+        finally:
+            engine.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cold start of the API: importing ``app.main`` in a fresh interpreter.
+
+The Gemini SDK, Tesseract bindings, PDF parsers and the DocuSign SDK are
+loaded by the services that use them on first use, not when the app is
+imported. Each trial imports the app in a new process and records how long
+that took and which of those heavy modules it loaded anyway; a final run
+times ``services.warm_up()``, the cost deferred to the first requests (or
+paid at startup with ``WARM_UP_SERVICES``). The script exits with status 1
+if the median import time exceeds the budget or a heavy module is loaded.
+
+Usage::
+
+    python -m benchmarks.startup --trials 5 --budget 1.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Loaded lazily by the services; importing the app must not pull these in
+HEAVY_MODULES = (
+    "google.generativeai",
+    "pytesseract",
+    "pdfplumber",
+    "pypdfium2",
+    "numpy",
+    "PIL.Image",
+    "docusign_esign",
+)
+# Seconds a cold ``import app.main`` may take; it took 1.65 s before lazy loading
+IMPORT_BUDGET = 1.0
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def child(warm_up: bool) -> None:
+    """Import the app in this (fresh) process and print the measurements as JSON."""
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+
+    result = {
+        "import_seconds": time.perf_counter() - start,
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules],
+    }
+    if warm_up:
+        from app.api.deps import services
+
+        start = time.perf_counter()
+        result["warm_up"] = services.warm_up()
+        result["warm_up_seconds"] = time.perf_counter() - start
+    print(json.dumps(result))
+
+
+def measure_startup(cwd: Optional[Path] = None, warm_up: bool = False) -> Dict:
+    """
+    Import the app in a new interpreter.
+
+    Args:
+        cwd: Working directory of the interpreter, where the app creates its
+            storage and cache directories
+        warm_up: Also build every lazily loaded service
+
+    Returns:
+        Import time, heavy modules loaded, and warm-up times if requested
+    """
+    env = dict(os.environ, PYTHONPATH=str(API_DIR))
+    args = [sys.executable, "-m", "benchmarks.startup", "--child"]
+    output = subprocess.run(
+        args + (["--warm-up"] if warm_up else []),
+        cwd=cwd or API_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm-up", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.warm_up)
+        return
+
+    runs = [measure_startup() for _ in range(args.trials)]
+    seconds = statistics.median(run["import_seconds"] for run in runs)
+    heavy = sorted({m for run in runs for m in run["heavy_modules"]})
+    print(
+        f"import app.main   median {seconds * 1000:7.1f} ms   "
+        f"budget {args.budget * 1000:7.1f} ms"
+    )
+    print(f"  heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+
+    warm = measure_startup(warm_up=True)
+    print(f"  warm_up()                      {warm['warm_up_seconds'] * 1000:7.1f} ms")
+    for name, service_seconds in warm["warm_up"].items():
+        print(f"    {name:<24} {service_seconds * 1000:7.1f} ms")
+
+    if seconds > args.budget or heavy:
+        print("Cold start regressed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Text extraction work when a job's files are detected a second time.
+
+Layout-mode detection runs pdfplumber's text extraction on every page.
+Detecting the same files again, for example after the detector settings
+change, repeats all of it unless the page text index persisted the first
+run's text. The script runs detection twice per file, with the second run
+using other settings, and reports pages run through pdfplumber's text
+extraction and total wall time with and without the index.
+
+The renamer is not part of this: it reads a raw character prefix straight
+from PDFium and only keeps OCR results in the index.
+
+Usage::
+
+    python -m benchmarks.text_index --files 10 --pages 10
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.pdf_document import PdfDocumentSession
+from app.services.signature_detector import SignatureDetector
+from app.services.text_index import PageTextIndex
+from benchmarks.common import make_binder
+
+extracted_pages = 0
+_page_text = PdfDocumentSession.page_text
+
+
+def _counting_page_text(self, page_num: int) -> str:
+    global extracted_pages
+    extracted_pages += 1
+    return _page_text(self, page_num)
+
+
+def without_index(pdf_paths, detectors) -> None:
+    """Each detection extracts the text of every page again."""
+    for pdf_path in pdf_paths:
+        for detector in detectors:
+            detector.detect_pages(pdf_path)
+
+
+def with_index(pdf_paths, detectors, index_dir: Path) -> None:
+    """The first detection fills the index; the second reads from it."""
+    for pdf_path in pdf_paths:
+        for detector in detectors:
+            with PdfDocumentSession(pdf_path) as session:
+                index_path = index_dir / f"{pdf_path.stem}.json"
+                with PageTextIndex(pdf_path, index_path, session=session) as index:
+                    detector.detect_pages_in(session, index)
+
+
+def main() -> None:
+    global extracted_pages
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+
+    PdfDocumentSession.page_text = _counting_page_text
+    detectors = [SignatureDetector(), SignatureDetector(tail_pages=2)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = Path(tmp) / "indexes"
+        index_dir.mkdir()
+        pdf_paths = [
+            make_binder(Path(tmp) / f"doc{i}.pdf", args.pages) for i in range(args.files)
+        ]
+        print(f"{args.files} files x {args.pages} pages, detected twice")
+        for name, run in (
+            ("without", lambda: without_index(pdf_paths, detectors)),
+            ("with", lambda: with_index(pdf_paths, detectors, index_dir)),
+        ):
+            extracted_pages = 0
+            start = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - start
+            print(f"  {name:<9} {extracted_pages:6d} pages extracted   {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
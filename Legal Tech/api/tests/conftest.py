@@ -4,4 +4,43 @@ from app.main import app
 
 @pytest.fixture
 def client():
-    return TestClient(app) 
\ No newline at end of file
+    return TestClient(app) 
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Build a letter-size PDF with one line of text per page."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    def _make_pdf(pages, name="document.pdf"):
+        pdf_path = tmp_path / name
+        c = canvas.Canvas(str(pdf_path), pagesize=letter)
+        for text in pages:
+            if text:
+                c.drawString(100, 700, text)
+            c.showPage()
+        c.save()
+        return pdf_path
+
+    return _make_pdf
+
+@pytest.fixture
+def stub_ocr():
+    """OCR service that answers immediately and records the size of each image."""
+    from concurrent.futures import Future
+
+    from app.services.ocr import OcrService
+
+    class StubOcr(OcrService):
+        def __init__(self):
+            super().__init__(max_workers=1, dpi=150)
+            self.text = "Scanned lease"
+            self.sizes = []
+
+        def submit(self, image, _timeout=None):
+            self.sizes.append(image.size)
+            future = Future()
+            future.set_result(self.text)
+            return future
+
+    return StubOcr()
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services.anchor_index import (
+    LINE,
+    TAB_HEIGHT,
+    TEXT,
+    SignatureAnchorIndexer,
+    anchor_index_path,
+)
+
+
+@pytest.fixture
+def contract(tmp_path):
+    """Page 1 is body text, page 2 has two signature blocks, page 3 a drawn line only."""
+    pdf_path = tmp_path / "contract.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    c.drawString(72, 700, "The parties agree as follows.")
+    c.showPage()
+    c.drawString(72, 300, "Signature: " + "_" * 40)
+    c.drawString(72, 200, "Signature: " + "_" * 40)
+    c.drawString(72, 100, "Signed by: Authorized Signatory")
+    c.showPage()
+    c.line(72, 150, 300, 150)
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+def test_every_anchor_is_found_in_one_pass(contract):
+    index = SignatureAnchorIndexer().build(contract)
+
+    assert index.page_count == 3
+    assert index.on_page(1) == []
+    first, second, signed_by = index.on_page(2)
+    # The label and the underscores on one line are a single anchor, placed on the line
+    assert (first.label, first.source) == ("Signature", TEXT)
+    assert first.bbox[0] == 72
+    assert first.x > 120
+    assert first.y == pytest.approx(first.bbox[1] - TAB_HEIGHT)
+    assert second.y > first.y
+    # Without a line, the tab goes right after the label
+    assert signed_by.label == "Signed by"
+    assert signed_by.x > signed_by.bbox[0]
+    (line,) = index.on_page(3)
+    assert (line.label, line.source) == (LINE, LINE)
+    assert line.bbox[0] == pytest.approx(72, abs=2)
+
+
+def test_signers_on_a_page_get_its_anchors_in_order(contract):
+    index = SignatureAnchorIndexer().build(contract)
+
+    placed = index.assign([2, 3, 2])
+
+    assert placed == [index.on_page(2)[0], index.on_page(3)[0], index.on_page(2)[1]]
+    with pytest.raises(LookupError, match="page 3"):
+        index.assign([3, 3])
+
+
+def test_index_is_stored_with_the_job_and_rebuilt_when_the_file_changes(contract, monkeypatch):
+    indexer = SignatureAnchorIndexer()
+    index = indexer.index(contract)
+    assert anchor_index_path(contract) == contract.parent / "contract" / "anchor_index.json"
+    assert anchor_index_path(contract).exists()
+
+    builds = []
+    build = indexer.build
+    monkeypatch.setattr(
+        indexer, "build", lambda pdf_path: builds.append(pdf_path) or build(pdf_path)
+    )
+    assert indexer.index(contract) == index
+    assert builds == []
+
+    stat = contract.stat()
+    os.utime(contract, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert indexer.index(contract).anchors == index.anchors
+    assert builds == [contract]
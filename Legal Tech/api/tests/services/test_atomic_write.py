@@ -0,0 +1,27 @@
+import pytest
+
+from app.services.atomic_write import atomic_write_bytes, atomic_write_text
+
+
+def test_replaces_content_and_creates_parents(tmp_path):
+    path = tmp_path / "a" / "b" / "index.json"
+    atomic_write_text(path, "first")
+    atomic_write_text(path, "second")
+
+    assert path.read_text() == "second"
+    assert [p.name for p in path.parent.iterdir()] == ["index.json"]
+
+
+def test_failed_write_keeps_old_content_and_no_temporary_file(tmp_path, monkeypatch):
+    path = tmp_path / "page.png"
+    atomic_write_bytes(path, b"old")
+
+    def fail(_src, _dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("app.services.atomic_write.os.replace", fail)
+    with pytest.raises(OSError, match="disk full"):
+        atomic_write_bytes(path, b"new")
+
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["page.png"]
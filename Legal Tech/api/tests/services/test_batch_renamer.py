@@ -0,0 +1,123 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.batch_renamer import FALLBACK, LOCAL, MODEL, BatchRenamer, TokenBucket
+from app.services.renamer import RenamerService
+
+
+class StubModel:
+    """Stands in for Gemini: answers after a fixed delay and counts calls in flight."""
+
+    def __init__(self, latency=0.0, fail_on=(), hang_on=()):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.hang_on = hang_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def generate_content(self, _prompt, **_config):
+        """Blocking, like the SDK's: it cannot be awaited."""
+        return SimpleNamespace(text="2024-03-15 Signed Agreement")
+
+    async def generate_content_async(self, prompt, **_config):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if any(marker in prompt for marker in self.hang_on):
+                await asyncio.sleep(3600)
+            if any(marker in prompt for marker in self.fail_on):
+                raise RuntimeError("quota exceeded")
+            return SimpleNamespace(text="2024-03-15 Signed Agreement")
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def pdfs(make_pdf):
+    return [
+        make_pdf([f"Agreement {i} dated 2024-01-0{i % 9 + 1}"], name=f"doc{i}.pdf")
+        for i in range(8)
+    ]
+
+
+def named(paths):
+    return [(path, path.name) for path in paths]
+
+
+def make_batch(model, **options):
+    renamer = RenamerService(api_key="dummy-key")
+    renamer.model = model
+    options.setdefault("rate_per_second", 1000)
+    options.setdefault("burst", 100)
+    return BatchRenamer(renamer, **options)
+
+
+async def timed_batch(pdfs, concurrency):
+    model = StubModel(latency=0.2)
+    start = time.perf_counter()
+    suggestions = await make_batch(model, concurrency=concurrency).suggest_all(named(pdfs))
+    return time.perf_counter() - start, model, suggestions
+
+
+async def test_latency_scales_with_concurrency_not_file_count(pdfs):
+    serial, _, _ = await timed_batch(pdfs, concurrency=1)
+    parallel, model, suggestions = await timed_batch(pdfs, concurrency=8)
+
+    assert serial >= 8 * 0.2
+    assert parallel < serial / 3
+    assert model.max_in_flight == 8
+    assert [s.old_filename for s in suggestions] == [p.name for p in pdfs]
+    assert {s.new_filename for s in suggestions} == {"2024-03-15_signed_agreement"}
+    assert {s.source for s in suggestions} == {MODEL}
+
+
+async def test_concurrency_is_bounded(pdfs):
+    model = StubModel(latency=0.05)
+    await make_batch(model, concurrency=3).suggest_all(named(pdfs))
+    assert model.max_in_flight == 3
+
+
+async def test_failed_and_slow_calls_fall_back(pdfs):
+    model = StubModel(fail_on=("Agreement 1 ",), hang_on=("Agreement 2 ",))
+    suggestions = await make_batch(model, timeout=0.2).suggest_all(named(pdfs[:4]))
+
+    assert [s.source for s in suggestions] == [MODEL, FALLBACK, FALLBACK, MODEL]
+    assert suggestions[1].new_filename == "2024-01-02_agreement_1_dated_2024_01"
+    assert suggestions[1].error == "quota exceeded"
+    assert "Timed out" in suggestions[2].error
+
+
+async def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.perf_counter()
+    for _ in range(6):
+        await bucket.acquire()
+    # Two tokens up front, then four more at 20 per second
+    assert time.perf_counter() - start >= 4 / 20 * 0.9
+
+
+async def test_clear_documents_are_named_without_the_model(make_pdf, pdfs):
+    clear = [
+        make_pdf(
+            [f"LEASE AGREEMENT dated March {i + 1}, 2024 between Acme Corp. and Globex LLC"],
+            name=f"lease{i}.pdf",
+        )
+        for i in range(4)
+    ]
+    model = StubModel(latency=0.05)
+    batch = make_batch(model)
+
+    suggestions = await batch.suggest_all(named(clear + pdfs[:4]))
+    summary = batch.summarize(suggestions)
+
+    assert [s.source for s in suggestions] == [LOCAL] * 4 + [MODEL] * 4
+    assert suggestions[0].new_filename == "2024-03-01_lease_acme_globex"
+    assert suggestions[0].confidence == 1.0
+    assert summary.sources[LOCAL] == 4
+    assert summary.local_fraction == 0.5
+    # Four skipped calls at the ~0.05 s the model took
+    assert 0.15 < summary.estimated_seconds_saved < 0.4
@@ -0,0 +1,169 @@
+import base64
+import json
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from app.services.envelope_sender import (
+    FAILED,
+    KEY_FIELD,
+    SENT,
+    BulkEnvelopeSender,
+    EnvelopeRequest,
+)
+from benchmarks.esign_stub import StubESignServer
+
+
+@pytest.fixture
+def signing_pdf(make_pdf):
+    return make_pdf(["Terms of the agreement", "Signature: " + "_" * 40])
+
+
+def envelope(pdf_path, subject, page_no="2"):
+    return EnvelopeRequest(
+        pdf_path=str(pdf_path),
+        subject=subject,
+        recipients=[{"name": "Jane Doe", "email": "jane@example.com", "page_no": page_no}],
+    )
+
+
+def make_sender(server, **options):
+    options.setdefault("backoff", 0.01)
+    return BulkEnvelopeSender("acct-1", "token", server.base_path, **options)
+
+
+async def test_envelopes_share_pooled_connections_with_bounded_concurrency(signing_pdf):
+    with StubESignServer(latency=0.05) as server:
+        results = await make_sender(server, concurrency=4).send_all(
+            [envelope(signing_pdf, f"Quarter end {i}") for i in range(24)]
+        )
+
+    assert [r.status for r in results] == [SENT] * 24
+    assert len({r.envelope_id for r in results}) == 24
+    assert server.max_in_flight == 4
+    # Connections are kept alive and reused instead of opened per envelope
+    assert len(server.connections) <= 4
+
+    request = server.requests[0]
+    assert request["path"] == "/restapi/v2.1/accounts/acct-1/envelopes"
+    assert request["authorization"] == "Bearer token"
+    definition = request["envelope"]
+    document = definition["documents"][0]["documentBase64"]
+    assert base64.b64decode(document) == signing_pdf.read_bytes()
+    (tab,) = definition["recipients"]["signers"][0]["tabs"]["signHereTabs"]
+    assert tab["pageNumber"] == "2"
+
+
+async def test_rate_limits_and_server_errors_are_retried(signing_pdf):
+    envelopes = [
+        envelope(signing_pdf, "ok"),
+        envelope(signing_pdf, "busy [429]"),
+        envelope(signing_pdf, "flaky [503]"),
+        envelope(signing_pdf, "created anyway [502]"),
+        envelope(signing_pdf, "down [500]"),
+        envelope(signing_pdf, "invalid [400]"),
+        envelope(signing_pdf, "no signature line", page_no="1"),
+    ]
+    with StubESignServer() as server:
+        results = await make_sender(server, max_retries=2).send_all(envelopes)
+
+    assert [(r.status, r.attempts) for r in results] == [
+        (SENT, 1),
+        (SENT, 2),
+        (SENT, 2),
+        (SENT, 2),
+        (FAILED, 3),
+        (FAILED, 1),
+        (FAILED, 0),
+    ]
+    assert results[4].status_code == 500
+    assert "STUB_ERROR" in results[4].error
+    assert results[5].status_code == 400
+    assert "page 1" in results[6].error
+
+    # Only the 429 is resent blindly; the others may have created their envelope
+    posts = Counter(r["envelope"]["emailSubject"] for r in server.requests if r["method"] == "POST")
+    assert posts["busy [429]"] == 2
+    assert posts["flaky [503]"] == 2
+    assert posts["created anyway [502]"] == 1
+    lookups = Counter(
+        parse_qs(urlsplit(r["path"]).query)["custom_field"][0]
+        for r in server.requests
+        if r["method"] == "GET"
+    )
+    assert lookups == {
+        f"{KEY_FIELD}={results[2].key}": 1,
+        f"{KEY_FIELD}={results[3].key}": 1,
+        f"{KEY_FIELD}={results[4].key}": 2,
+    }
+    created = {fields[KEY_FIELD]: envelope_id for envelope_id, fields in server.envelopes}
+    assert len(created) == 4
+    assert results[3].envelope_id == created[results[3].key]
+
+
+async def test_malformed_envelopes_and_responses_fail_alone(signing_pdf):
+    def handler(request):
+        if json.loads(request.content)["emailSubject"] == "garbled":
+            return httpx.Response(201, text="Created")
+        return httpx.Response(201, json={"envelopeId": "env-1"})
+
+    no_email = EnvelopeRequest(
+        pdf_path=str(signing_pdf),
+        subject="no email",
+        recipients=[{"name": "Jane Doe", "page_no": "2"}],
+    )
+    sender = BulkEnvelopeSender(
+        "acct-1", "token", "https://esign.test/restapi", transport=httpx.MockTransport(handler)
+    )
+    results = await sender.send_all(
+        [no_email, envelope(signing_pdf, "garbled"), envelope(signing_pdf, "ok")]
+    )
+
+    assert [r.status for r in results] == [FAILED, FAILED, SENT]
+    assert results[0].attempts == 0
+    assert "KeyError" in results[0].error
+    assert results[1].status_code == 201
+    assert "JSONDecodeError" in results[1].error
+    assert results[2].envelope_id == "env-1"
+
+
+async def test_only_unsent_requests_are_resent_without_a_lookup(signing_pdf):
+    created, posts, lookups = {}, Counter(), []
+
+    def handler(request):
+        if request.method == "GET":
+            key = request.url.params["custom_field"].partition("=")[2]
+            lookups.append(key)
+            found = [{"envelopeId": created[key]}] if key in created else []
+            return httpx.Response(200, json={"envelopes": found})
+        definition = json.loads(request.content)
+        subject = definition["emailSubject"]
+        key = definition["customFields"]["textCustomFields"][0]["value"]
+        posts[subject] += 1
+        if posts[subject] == 1 and subject == "unreachable":
+            raise httpx.ConnectError("Connection refused", request=request)
+        created[key] = f"env-{subject}-{posts[subject]}"
+        if posts[subject] == 1:
+            # Created, but the response never arrives
+            raise httpx.ReadTimeout("Read timed out", request=request)
+        return httpx.Response(201, json={"envelopeId": created[key]})
+
+    sender = BulkEnvelopeSender(
+        "acct-1",
+        "token",
+        "https://esign.test/restapi",
+        backoff=0.01,
+        transport=httpx.MockTransport(handler),
+    )
+    results = await sender.send_all(
+        [envelope(signing_pdf, "unreachable"), envelope(signing_pdf, "slow")]
+    )
+
+    assert [(r.status, r.envelope_id) for r in results] == [
+        (SENT, "env-unreachable-2"),
+        (SENT, "env-slow-1"),
+    ]
+    assert posts == {"unreachable": 2, "slow": 1}
+    assert lookups == [results[1].key]
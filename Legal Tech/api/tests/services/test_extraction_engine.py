@@ -0,0 +1,109 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.services.extraction_engine import ExtractionEngine
+from app.services.signature_detector import SignatureDetector
+
+
+@pytest.fixture
+def engine():
+    engine = ExtractionEngine(max_workers=2)
+    yield engine
+    engine.shutdown()
+
+
+async def test_extract_matches_inline_extraction(engine, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Intro", "Signature: ____", "End"])
+
+    manifest = await engine.extract(pdf_path, tmp_path / "pool")
+    expected = SignatureDetector().extract_pages(pdf_path, tmp_path / "inline")
+
+    assert manifest.keys() == expected.keys() == {2}
+    assert manifest[2]["png"].endswith("document_page2.png")
+
+
+async def test_extract_all_yields_every_file(engine, make_pdf, tmp_path):
+    files = [
+        (make_pdf(["Signed by: A"], name=f"doc{i}.pdf"), tmp_path / f"doc{i}")
+        for i in range(4)
+    ]
+
+    results = {pdf_path.name: manifest async for pdf_path, manifest in engine.extract_all(files)}
+
+    assert sorted(results) == ["doc0.pdf", "doc1.pdf", "doc2.pdf", "doc3.pdf"]
+    assert all(list(manifest) == [1] for manifest in results.values())
+
+
+class ThreadRecordingQueue:
+    """Wraps the stage event queue, recording the thread of every put."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.threads = []
+
+    def put(self, item):
+        self.threads.append(threading.get_ident())
+        self.queue.put(item)
+
+
+async def test_stage_event_queue_is_used_off_the_event_loop(engine, make_pdf, tmp_path):
+    threads = []
+    event_queue = engine._event_queue
+
+    def recording_event_queue():
+        threads.append(threading.get_ident())
+        return recording
+
+    recording = ThreadRecordingQueue(event_queue())
+    engine._event_queue = recording_event_queue
+    stages = []
+
+    await engine.extract(
+        make_pdf(["Signature: ____"]),
+        tmp_path / "out",
+        on_stage=lambda stage, _timestamp: stages.append(stage),
+    )
+
+    assert stages == ["detecting", "subsetting", "rendering"]
+    assert recording.threads
+    assert threading.get_ident() not in threads + recording.threads
+
+
+async def test_unchanged_files_are_not_processed_again(engine, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Intro", "Signature: ____"])
+    out_dir = tmp_path / "out"
+    first = await engine.extract(pdf_path, out_dir)
+    output_mtime = Path(first[2]["pdf"]).stat().st_mtime_ns
+
+    # Touching the file without changing it keeps the stored result
+    os.utime(pdf_path)
+    assert await engine.extract(pdf_path, out_dir) == first
+    assert Path(first[2]["pdf"]).stat().st_mtime_ns == output_mtime
+    assert (engine.processed, engine.reused) == (1, 1)
+
+    make_pdf(["Signature: ____", "Outro"])
+    changed = await engine.extract(pdf_path, out_dir)
+    assert list(changed) == [1]
+
+    # Deleted outputs are produced again
+    Path(changed[1]["png"]).unlink()
+    await engine.extract(pdf_path, out_dir)
+    assert (engine.processed, engine.reused) == (3, 1)
+
+
+async def test_detector_changes_invalidate_stored_results(make_pdf, tmp_path):
+    pdf_path = make_pdf(["Signature: ____"])
+    for options in ({}, {"render_pngs": False}):
+        engine = ExtractionEngine(max_workers=1, detector_options=options)
+        try:
+            await engine.extract(pdf_path, tmp_path / "out")
+        finally:
+            engine.shutdown()
+        assert (engine.processed, engine.reused) == (1, 0)
+
+
+def test_default_worker_count_uses_cpus():
+    assert ExtractionEngine(max_workers=0).max_workers >= 1
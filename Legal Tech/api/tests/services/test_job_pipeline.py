@@ -0,0 +1,136 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.services.extraction_engine import ExtractionEngine
+from app.services.job_pipeline import COMPLETED, FAILED, ExtractionPipeline, FileState
+from app.services.job_state import DETECTING, InMemoryJobStateBackend
+
+
+@pytest.fixture
+def pipeline():
+    engine = ExtractionEngine(max_workers=2)
+    yield ExtractionPipeline(engine)
+    engine.shutdown()
+
+
+async def test_files_move_through_every_stage(pipeline, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Cover", "Signature: ______"])
+    file_state = FileState(id="f1", filename="document.pdf")
+
+    await pipeline.submit("job", [file_state], [pdf_path], tmp_path)
+    assert pipeline.manifest("job").status == "processing"
+
+    manifests = await pipeline.wait("job")
+
+    assert file_state.status == COMPLETED
+    assert file_state.pages == [2]
+    assert list(file_state.timings) == ["queued", "detecting", "subsetting", "rendering"]
+    assert manifests[pdf_path][2]["png"].endswith("document_page2.png")
+
+    manifest = pipeline.manifest("job")
+    assert manifest.status == COMPLETED
+    assert manifest.progress.total == manifest.progress.completed == 1
+
+
+async def test_failed_file_does_not_block_job(pipeline, make_pdf, tmp_path):
+    good = make_pdf(["Signed by: A"], name="good.pdf")
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    files = [FileState(id="good", filename="good.pdf"), FileState(id="bad", filename="bad.pdf")]
+
+    await pipeline.submit("job", files, [good, bad], tmp_path)
+    manifests = await pipeline.wait("job")
+
+    assert list(manifests) == [good]
+    assert files[1].status == FAILED
+    assert files[1].error
+    progress = pipeline.manifest("job").progress
+    assert (progress.completed, progress.failed) == (1, 1)
+
+
+def test_unknown_job_has_no_manifest(pipeline):
+    assert pipeline.manifest("missing") is None
+
+
+async def test_watch_yields_each_change_until_done(pipeline, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Cover", "Signature: ______"])
+    files = [FileState(id="f1", filename="document.pdf")]
+    await pipeline.submit("job", files, [pdf_path], tmp_path)
+
+    # A long poll interval: updates must arrive because they are pushed
+    seen = [m.files[0].status async for m in pipeline.watch("job", poll_interval=60)]
+
+    assert seen[0] in ("queued", "detecting")
+    assert seen[-1] == COMPLETED
+    assert len(seen) == len(set(seen))
+    assert not pipeline._watchers
+
+
+async def test_watch_unknown_job_yields_nothing(pipeline):
+    assert [m async for m in pipeline.watch("missing")] == []
+
+
+class SlowStateBackend(InMemoryJobStateBackend):
+    """Every write blocks, as when another worker holds the database lock."""
+
+    def create_job(self, *args, **kwargs):
+        time.sleep(0.2)
+        super().create_job(*args, **kwargs)
+
+    def transition(self, *args, **kwargs):
+        time.sleep(0.2)
+        return super().transition(*args, **kwargs)
+
+
+async def test_stage_writes_do_not_block_the_event_loop(make_pdf, tmp_path):
+    engine = ExtractionEngine(max_workers=1)
+    pipeline = ExtractionPipeline(engine, state=SlowStateBackend())
+    pdf_path = make_pdf(["Cover", "Signature: ______"])
+    file_state = FileState(id="f1", filename="document.pdf")
+    gaps = []
+
+    async def ticker():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            gaps.append(time.perf_counter() - start)
+
+    tick = asyncio.create_task(ticker())
+    try:
+        await pipeline.submit("job", [file_state], [pdf_path], tmp_path)
+        await pipeline.wait("job")
+    finally:
+        tick.cancel()
+        engine.shutdown()
+
+    assert max(gaps) < 0.15
+    # Stage writes still land in order, before the final one
+    assert file_state.status == COMPLETED
+    assert list(file_state.timings) == ["queued", "detecting", "subsetting", "rendering"]
+
+
+class FailingStageBackend(InMemoryJobStateBackend):
+    """Loses the database while the file enters detection."""
+
+    def transition(self, job_id, file_id, status, *args, **kwargs):
+        if status == DETECTING:
+            raise sqlite3.OperationalError("disk I/O error")
+        return super().transition(job_id, file_id, status, *args, **kwargs)
+
+
+async def test_failed_stage_writes_are_logged(make_pdf, tmp_path, caplog):
+    engine = ExtractionEngine(max_workers=1)
+    pipeline = ExtractionPipeline(engine, state=FailingStageBackend())
+    file_state = FileState(id="f1", filename="document.pdf")
+    try:
+        await pipeline.submit("job", [file_state], [make_pdf(["Signature: ____"])], tmp_path)
+        await pipeline.wait("job")
+    finally:
+        engine.shutdown()
+
+    assert file_state.status == COMPLETED
+    [record] = [r for r in caplog.records if r.name == "app.services.job_pipeline"]
+    assert record.exc_info[1].args == ("disk I/O error",)
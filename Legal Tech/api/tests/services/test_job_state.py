@@ -0,0 +1,115 @@
+import multiprocessing
+import time
+
+import pytest
+
+from app.services.extraction_engine import ExtractionEngine
+from app.services.job_pipeline import ExtractionPipeline
+from app.services.job_state import (
+    COMPLETED,
+    DETECTING,
+    FAILED,
+    QUEUED,
+    FileState,
+    InMemoryJobStateBackend,
+    SqliteJobStateBackend,
+    create_job_state_backend,
+)
+
+
+def _claim(db_path, worker, start, results):
+    """Worker process: try to move the shared file out of the queue."""
+    backend = SqliteJobStateBackend(db_path)
+    start.wait()
+    updated = backend.transition("job", "f1", DETECTING, time.time(), expected={QUEUED})
+    results.put((worker, updated is not None))
+    backend.close()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return create_job_state_backend(request.param, tmp_path / "job_state.db")
+
+
+def test_transitions_record_timings_and_results(backend):
+    backend.create_job("job", [FileState(id="f1", filename="a.pdf")])
+
+    assert backend.transition("job", "f1", DETECTING, time.time()).status == DETECTING
+    done = backend.transition("job", "f1", COMPLETED, time.time(), pages=[2])
+
+    assert (done.status, done.pages) == (COMPLETED, [2])
+    assert list(done.timings) == [QUEUED, DETECTING]
+    assert backend.get_job("job")[0].status == COMPLETED
+
+
+def test_terminal_and_unexpected_states_are_kept(backend):
+    backend.create_job("job", [FileState(id="f1", filename="a.pdf")])
+
+    assert backend.transition("job", "f1", DETECTING, time.time(), expected={COMPLETED}) is None
+    backend.transition("job", "f1", FAILED, time.time(), error="boom")
+    assert backend.transition("job", "f1", DETECTING, time.time()) is None
+    assert backend.transition("job", "missing", DETECTING, time.time()) is None
+
+    file_state = backend.get_job("job")[0]
+    assert (file_state.status, file_state.error) == (FAILED, "boom")
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown job state backend"):
+        create_job_state_backend("redis", tmp_path / "job_state.db")
+
+
+def test_state_is_visible_across_connections(tmp_path):
+    writer = SqliteJobStateBackend(tmp_path / "job_state.db")
+    reader = SqliteJobStateBackend(tmp_path / "job_state.db")
+    writer.create_job("job", [FileState(id="f1", filename="a.pdf")])
+
+    writer.transition("job", "f1", DETECTING, time.time())
+    writer.set_filename("job", "f1", "renamed.pdf")
+
+    file_state = reader.get_job("job")[0]
+    assert (file_state.status, file_state.filename) == (DETECTING, "renamed.pdf")
+
+
+def test_only_one_process_wins_a_transition(tmp_path):
+    db_path = tmp_path / "job_state.db"
+    SqliteJobStateBackend(db_path).create_job("job", [FileState(id="f1", filename="a.pdf")])
+
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_claim, args=(db_path, n, start, results)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert sum(won for _, won in outcomes) == 1
+    assert SqliteJobStateBackend(db_path).get_job("job")[0].status == DETECTING
+
+
+async def test_pipelines_share_job_state(make_pdf, tmp_path):
+    db_path = tmp_path / "job_state.db"
+    engine = ExtractionEngine(max_workers=1)
+    running = ExtractionPipeline(engine, state=SqliteJobStateBackend(db_path))
+    # Another worker process, which did not receive the upload
+    other = ExtractionPipeline(engine, state=SqliteJobStateBackend(db_path))
+    try:
+        pdf_path = make_pdf(["Signature: ______"])
+        files = [FileState(id="f1", filename="document.pdf")]
+        await running.submit("job", files, [pdf_path], tmp_path)
+        assert other.manifest("job").status == "processing"
+
+        await running.wait("job")
+
+        manifest = other.manifest("job")
+        assert manifest.status == COMPLETED
+        assert manifest.files[0].pages == [1]
+    finally:
+        engine.shutdown()
+
+
+def test_memory_backend_is_the_default():
+    assert isinstance(ExtractionPipeline(engine=None).state, InMemoryJobStateBackend)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services.line_detector import (
+    RASTER,
+    VECTOR,
+    SignatureLineDetector,
+    horizontal_runs,
+    merge_runs,
+)
+from app.services.pdf_document import PdfDocumentSession
+from app.services.signature_detector import SignatureDetector
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """Three image-only pages; only the second has a signature line drawn on it."""
+    pdf_path = tmp_path / "scanned.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    for page_num in range(1, 4):
+        # 100 DPI scan of a letter page
+        scan = Image.new("L", (850, 1100), 255)
+        draw = ImageDraw.Draw(scan)
+        draw.text((100, 100), f"Page {page_num}", fill=0)
+        if page_num == 2:
+            draw.line((100, 900, 500, 900), fill=0, width=3)
+        scan_path = tmp_path / f"scan{page_num}.png"
+        scan.save(scan_path)
+        c.drawImage(str(scan_path), 0, 0, *letter)
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture
+def vector_pdf(tmp_path):
+    pdf_path = tmp_path / "vector.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    c.line(72, 100, 300, 100)  # 228pt signature line
+    c.line(72, 300, 120, 300)  # Too short
+    c.rect(72, 500, 50, 50)  # A box, not a line
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+def test_vector_lines_are_read_from_page_objects(vector_pdf):
+    with PdfDocumentSession(vector_pdf) as session:
+        lines = SignatureLineDetector().detect(session)
+
+    assert len(lines) == 1
+    assert lines[0].page == 1
+    assert lines[0].source == VECTOR
+    x0, top, x1, bottom = lines[0].bbox
+    assert x0 == pytest.approx(72, abs=1)
+    assert x1 == pytest.approx(300, abs=1)
+    assert top == pytest.approx(792 - 100, abs=1)
+
+
+def test_raster_lines_found_on_scanned_pages(scanned_pdf):
+    with PdfDocumentSession(scanned_pdf) as session:
+        lines = SignatureLineDetector().detect(session)
+
+    assert [line.page for line in lines] == [2]
+    assert lines[0].source == RASTER
+    # The line was drawn from x=100 to 500 px at 100 DPI, y=900 px
+    x0, top, x1, bottom = lines[0].bbox
+    assert x0 == pytest.approx(72, abs=3)
+    assert x1 == pytest.approx(360, abs=3)
+    assert top == pytest.approx(648, abs=3)
+
+
+def test_scanned_document_no_longer_falls_back_to_last_page(scanned_pdf):
+    assert SignatureDetector().detect_pages(scanned_pdf) == [2]
+    assert SignatureDetector(detect_lines=False).detect_pages(scanned_pdf) == [3]
+
+
+def test_horizontal_runs_and_merge():
+    mask = np.zeros((6, 20), dtype=bool)
+    mask[2, 3:15] = True
+    mask[3, 2:14] = True
+    mask[5, 0:4] = True  # Too short
+
+    runs = horizontal_runs(mask, min_length=10)
+
+    assert runs.tolist() == [[2, 3, 15], [3, 2, 14]]
+    assert merge_runs(runs) == [(2, 3, 2, 15)]
@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.local_namer import LocalNamer
+
+
+@pytest.fixture
+def namer():
+    return LocalNamer()
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "dated 2024-03-15",
+        "dated 2024/3/15",
+        "dated 03/15/2024",
+        "dated 15/03/2024",
+        "dated March 15, 2024",
+        "dated Mar. 15th 2024",
+        "dated 15 March 2024",
+        "made this 15th day of March, 2024",
+    ],
+)
+def test_date_formats(namer, text):
+    assert namer.find_date(text) == ("2024-03-15", True)
+
+
+def test_anchored_date_wins_over_earlier_dates(namer):
+    text = "Printed 2024-05-01. This Agreement is effective as of January 2, 2023."
+    assert namer.find_date(text) == ("2023-01-02", True)
+    # Several unanchored dates: the first is used, but it is not certain
+    assert namer.find_date("Filed 2024-05-01, amended 2024-06-01") == ("2024-05-01", False)
+    assert namer.find_date("Invalid 2024-02-30") == (None, False)
+
+
+def test_doc_types_and_parties(namer):
+    text = (
+        "MUTUAL NON-DISCLOSURE AGREEMENT entered into by and between "
+        "Acme Corp., a Delaware corporation, and Globex Industries LLC."
+    )
+    assert namer.find_doc_type(text) == ("nda", True)
+    assert namer.find_doc_type("This contract is binding") == ("agreement", False)
+    assert namer.find_parties(text) == ["acme", "globex_industries"]
+    parties = namer.find_parties("Lease between John Smith and Jane Doe.")
+    assert parties == ["john_smith", "jane_doe"]
+
+
+def test_confidence_reflects_what_was_found(namer):
+    clear = namer.suggest(
+        "EMPLOYMENT AGREEMENT dated 2019-09-03 between Initech Inc. and Peter Gibbons."
+    )
+    vague = namer.suggest("Agreement 3 dated 2024-01-04")
+    empty = namer.suggest("Notes about the weather")
+
+    assert clear.name == "2019-09-03_employment_agreement_initech_peter_gibbons"
+    assert clear.confidence == 1.0
+    assert (vague.name, vague.confidence) == ("2024-01-04_agreement", 0.6)
+    assert (empty.name, empty.confidence) == ("", 0.0)
+
+
+def test_parties_are_dropped_to_fit_the_length_limit():
+    suggestion = LocalNamer(max_length=50).suggest(
+        "Settlement Agreement dated 2020-01-01 between Wonderful Widgets LLC "
+        "and Amazing Gadgets Ltd."
+    )
+    assert suggestion.name == "2020-01-01_settlement_agreement_wonderful_widgets"
+    assert suggestion.parties == ["wonderful_widgets"]
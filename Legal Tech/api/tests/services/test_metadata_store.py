@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.metadata_store import (
+    PAGE_PNG,
+    AmbiguousFilenameError,
+    FileRecord,
+    MetadataStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetadataStore(tmp_path / "metadata.db")
+    store.create_job(
+        "job1",
+        [
+            FileRecord(id=f"f{i}", job_id="job1", filename=name, path=f"/jobs/job1/f{i}_{name}")
+            for i, name in enumerate(["lease.pdf", "old_lease.pdf", "nda.pdf"])
+        ],
+    )
+    yield store
+    store.close()
+
+
+def test_files_are_listed_in_upload_order(store):
+    filenames = [f.filename for f in store.list_files("job1")]
+    assert filenames == ["lease.pdf", "old_lease.pdf", "nda.pdf"]
+    assert store.get_file("job1", "f2").path == "/jobs/job1/f2_nda.pdf"
+    assert store.get_file("other-job", "f2") is None
+    assert store.list_files("other-job") == []
+
+
+def test_batch_rename_is_all_or_nothing(store):
+    with pytest.raises(FileExistsError):
+        store.rename_files("job1", [("lease.pdf", "a.pdf"), ("nda.pdf", "old_lease.pdf")])
+    filenames = [f.filename for f in store.list_files("job1")]
+    assert filenames == ["lease.pdf", "old_lease.pdf", "nda.pdf"]
+
+    store.rename_files("job1", [("lease.pdf", "a.pdf"), ("nda.pdf", "b.pdf")])
+    assert [f.filename for f in store.list_files("job1")] == ["a.pdf", "old_lease.pdf", "b.pdf"]
+    # The stored file never moves
+    assert store.get_file("job1", "f0").path == "/jobs/job1/f0_lease.pdf"
+
+
+def test_duplicate_names_are_ambiguous(store):
+    store.create_job(
+        "job2",
+        [
+            FileRecord(id=f"g{i}", job_id="job2", filename="scan.pdf", path=f"/g{i}")
+            for i in range(2)
+        ],
+    )
+    with pytest.raises(AmbiguousFilenameError):
+        store.rename_file("job2", "scan.pdf", "x.pdf")
+    with pytest.raises(LookupError):
+        store.rename_file("job2", "missing.pdf", "x.pdf")
+
+
+def test_artifacts_and_cascading_delete(store, tmp_path):
+    store.set_artifacts(
+        "f0", {2: {"pdf": "/out/sig.pdf", "png": "/out/p2.png"}, 5: {"pdf": "/out/sig.pdf"}}
+    )
+
+    assert store.signature_pages("f0") == [2, 5]
+    assert [a.path for a in store.list_artifacts("f0", PAGE_PNG)] == ["/out/p2.png"]
+
+    # Visible to another connection, e.g. another worker process
+    other = MetadataStore(tmp_path / "metadata.db")
+    assert other.signature_pages("f0") == [2, 5]
+
+    store.delete_job("job1")
+    assert not other.job_exists("job1")
+    assert other.list_artifacts("f0") == []
+    other.close()
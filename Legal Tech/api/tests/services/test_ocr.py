@@ -0,0 +1,64 @@
+import shutil
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import OcrCache, OcrQueueFullError, OcrService
+from app.services.pdf_document import PdfDocumentSession
+
+requires_tesseract = pytest.mark.skipif(
+    shutil.which("tesseract") is None, reason="tesseract binary not installed"
+)
+
+
+@pytest.fixture
+def pages(make_pdf):
+    pdf_path = make_pdf(["LEASE AGREEMENT", "GUARANTY", "ESTOPPEL CERTIFICATE"])
+    with PdfDocumentSession(pdf_path) as session:
+        # Crop to the text line so recognition is quick
+        yield [
+            session.render_page(n, resolution=200, top_fraction=0.15).convert("L")
+            for n in (1, 2, 3)
+        ]
+
+
+def test_cached_result_skips_the_workers(tmp_path):
+    cache = OcrCache(tmp_path)
+    image = Image.new("L", (64, 32), 255)
+    cache.put(OcrCache.key(image, "eng"), "cached text")
+    service = OcrService(max_workers=1, cache=cache)
+
+    assert service.ocr(image) == "cached text"
+    assert service._executor is None
+    assert service.stats()["hits"] == 1
+    # Same pixels in another language is a different entry
+    assert OcrCache.key(image, "deu") != OcrCache.key(image, "eng")
+
+
+@requires_tesseract
+def test_pages_are_recognized_in_parallel_and_cached(pages, tmp_path):
+    service = OcrService(max_workers=2, cache=OcrCache(tmp_path))
+    try:
+        texts = service.ocr_many(pages)
+        assert "LEASE" in texts[0]
+        assert "GUARANTY" in texts[1]
+        assert "ESTOPPEL" in texts[2]
+
+        assert service.ocr_many(pages) == texts
+        assert (service.stats()["misses"], service.stats()["hits"]) == (3, 3)
+    finally:
+        service.shutdown()
+
+
+@requires_tesseract
+def test_full_queue_applies_backpressure(pages):
+    service = OcrService(max_workers=1, max_pending=1)
+    try:
+        first = service.submit(pages[0])
+        with pytest.raises(OcrQueueFullError):
+            service.submit(pages[1], timeout=0)
+        first.result()
+        # The slot is released once the first image is done
+        assert "GUARANTY" in service.submit(pages[1], timeout=5).result()
+    finally:
+        service.shutdown()
@@ -0,0 +1,34 @@
+import pytest
+from PIL import Image
+
+from app.services.page_renderer import PageRenderer
+from app.services.result_cache import file_digest
+
+
+def test_render_is_cached_by_hash_page_and_dpi(make_pdf, tmp_path):
+    pdf_path = make_pdf(["Intro", "Signature: ______"])
+    renderer = PageRenderer(tmp_path / "renders")
+
+    first = renderer.render(pdf_path, 2, dpi=72)
+    mtime = first.stat().st_mtime_ns
+    second = renderer.render(pdf_path, 2, dpi=72, content_hash=file_digest(pdf_path))
+
+    assert second == first
+    assert second.stat().st_mtime_ns == mtime
+    assert Image.open(first).size == (612, 792)
+    assert renderer.render(pdf_path, 2, dpi=144) != first
+
+
+def test_thumbnail_is_downscaled_to_width(make_pdf, tmp_path):
+    pdf_path = make_pdf(["Signature: ______"])
+    renderer = PageRenderer(tmp_path / "renders")
+
+    thumbnail = renderer.render(pdf_path, 1, dpi=72, max_width=153)
+
+    assert Image.open(thumbnail).size == (153, 198)
+
+
+def test_missing_page_is_rejected(make_pdf, tmp_path):
+    pdf_path = make_pdf(["Signature: ______"])
+    with pytest.raises(ValueError, match="Page 2 does not exist"):
+        PageRenderer(tmp_path / "renders").render(pdf_path, 2, dpi=72)
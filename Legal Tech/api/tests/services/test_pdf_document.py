@@ -0,0 +1,122 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pdfplumber
+import pytest
+
+from app.services.pdf_document import PdfDocumentSession
+
+
+@pytest.fixture
+def three_page_pdf(make_pdf):
+    return make_pdf(["First page", "Signature: ____", "Last page"])
+
+
+def test_page_text_and_count(three_page_pdf):
+    with PdfDocumentSession(three_page_pdf) as session:
+        assert session.page_count == 3
+        assert session.page_text(2).startswith("Signature")
+        assert list(session.iter_page_text()) == ["First page", "Signature: ____", "Last page"]
+
+
+def test_write_subset_keeps_requested_pages(three_page_pdf, tmp_path):
+    output = tmp_path / "subset.pdf"
+    with PdfDocumentSession(three_page_pdf) as session:
+        session.write_subset([3, 2], output)
+
+    with pdfplumber.open(output) as pdf:
+        assert [page.extract_text() for page in pdf.pages] == ["Last page", "Signature: ____"]
+
+
+def test_render_page_matches_pdfplumber(three_page_pdf):
+    with PdfDocumentSession(three_page_pdf) as session:
+        image = session.render_page(2, resolution=72)
+
+    with pdfplumber.open(three_page_pdf) as pdf:
+        expected = pdf.pages[1].to_image(resolution=72).original
+
+    assert image.mode == "RGB"
+    assert image.size == expected.size == (612, 792)
+    assert image.tobytes() == expected.convert("RGB").tobytes()
+
+
+def test_session_reads_file_once(three_page_pdf):
+    session = PdfDocumentSession(three_page_pdf)
+    three_page_pdf.unlink()
+
+    # Everything is served from the bytes read at construction time
+    assert session.page_count == 3
+    assert session.render_page(1, resolution=36).size == (306, 396)
+    session.close()
+
+
+def test_windowed_session_matches_whole_document(make_pdf, tmp_path):
+    pdf_path = make_pdf([f"Page {n}" for n in range(1, 8)])
+
+    with PdfDocumentSession(pdf_path, window=3) as session:
+        assert session.page_count == 7
+        # Out of order, so windows are reopened and revisited
+        texts = {n: session.page_text(n) for n in (7, 1, 4, 5, 2, 3, 6)}
+        raw = [session.page_chars_text(n) for n in range(1, 8)]
+        session.write_subset([2, 6], tmp_path / "subset.pdf")
+
+    assert texts == {n: f"Page {n}" for n in range(1, 8)}
+    assert raw == [f"Page {n}" for n in range(1, 8)]
+    with pdfplumber.open(tmp_path / "subset.pdf") as pdf:
+        assert [page.extract_text() for page in pdf.pages] == ["Page 2", "Page 6"]
+
+
+def test_render_pixels_are_capped(three_page_pdf):
+    with PdfDocumentSession(three_page_pdf, max_render_pixels=100_000) as session:
+        image = session.render_page(1, resolution=300)
+
+    assert image.width * image.height <= 100_000
+    assert image.width == pytest.approx(image.height * 612 / 792, abs=2)
+
+
+MEMORY_PROBE = """
+import json, resource, sys, tempfile
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+pages, pdf_path = int(sys.argv[1]), sys.argv[2]
+c = canvas.Canvas(pdf_path, pagesize=letter)
+for n in range(1, pages + 1):
+    text = c.beginText(72, 720)
+    for line in range(40):
+        text.textLine(f"Section {n}.{line} The parties agree to the terms set out herein.")
+    c.drawText(text)
+    if n % 25 == 0:
+        c.drawString(72, 120, "Signature: " + "_" * 40)
+    c.showPage()
+c.save()
+del c
+
+from app.services.signature_detector import FAST_MODE, SignatureDetector
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+detector = SignatureDetector(mode=FAST_MODE, render_pngs=False, page_window=64)
+with tempfile.TemporaryDirectory() as out_dir:
+    detector.extract_pages(pdf_path, out_dir)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"growth_kib": after - before}))
+"""
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="ru_maxrss is reported in KiB on Linux")
+def test_large_document_mode_keeps_memory_flat(tmp_path):
+    def growth_mib(pages):
+        output = subprocess.run(
+            [sys.executable, "-c", MEMORY_PROBE, str(pages), str(tmp_path / f"{pages}.pdf")],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parents[2],
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])["growth_kib"] / 1024
+
+    small, large = growth_mib(10), growth_mib(2000)
+
+    # Without windows, 2000 pages add about 20 MiB over 10 pages
+    assert large - small < 10
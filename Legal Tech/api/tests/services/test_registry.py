@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+
+from app.services.registry import ServiceRegistry, UnknownServiceError
+
+
+def test_services_are_built_once_on_first_use():
+    registry = ServiceRegistry()
+    built = []
+    registry.register("a", lambda: built.append("a") or object())
+    registry.register("b", lambda: (built.append("b"), registry.get("a"))[1])
+
+    assert registry.loaded() == []
+    assert built == []
+    assert registry.get("b") is registry.get("a")
+    assert built == ["b", "a"]
+    assert registry.loaded() == ["a", "b"]
+
+    with pytest.raises(UnknownServiceError):
+        registry.get("missing")
+
+
+def test_warm_up_imports_and_builds_everything():
+    registry = ServiceRegistry()
+    registry.register("json", lambda: sys.modules["json.tool"], preload=("json.tool",))
+
+    timings = registry.warm_up()
+
+    assert list(timings) == ["json"]
+    assert registry.loaded() == ["json"]
+
+
+def test_shutdown_only_touches_built_services():
+    class Pool:
+        def __init__(self):
+            self.closed = False
+
+        def shutdown(self):
+            self.closed = True
+
+    registry = ServiceRegistry()
+    built, unused = Pool(), Pool()
+    registry.register("built", lambda: built)
+    registry.register("unused", lambda: unused)
+    registry.get("built")
+
+    registry.shutdown()
+
+    assert built.closed
+    assert not unused.closed
+    assert registry.loaded() == ["built"]
@@ -1,12 +1,14 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from app.services.pdf_document import PdfDocumentSession
 from app.services.renamer import RenamerService
 
 @pytest.fixture
 def mock_gemini():
     with patch('google.generativeai.GenerativeModel') as mock:
         model_instance = MagicMock()
-        model_instance.generate_content = AsyncMock()
+        model_instance.generate_content = MagicMock()
+        model_instance.generate_content_async = AsyncMock()
         mock.return_value = model_instance
         yield mock
 
@@ -20,10 +22,10 @@ async def test_suggest_filename_with_gemini(renamer_service, tmp_path):
     with patch('app.services.renamer.RenamerService._extract_text_from_pdf') as mock_extract:
         mock_extract.return_value = "Sample legal document from 2024-03-15 about contract review"
         
-        # Patch generate_content on the actual model instance
+        # Patch generate_content_async on the actual model instance
         mock_response = MagicMock()
         mock_response.text = "2024-03-15_contract_review_document"
-        renamer_service.model.generate_content = AsyncMock(return_value=mock_response)
+        renamer_service.model.generate_content_async = AsyncMock(return_value=mock_response)
         
         # Test the service
         result = await renamer_service.suggest_filename("dummy.pdf")
@@ -41,7 +43,7 @@ async def test_suggest_filename_fallback(renamer_service, mock_gemini, tmp_path)
         mock_extract.return_value = "Sample legal document from 2024-03-15 about contract review"
         
         # Mock Gemini error
-        mock_gemini.return_value.generate_content.side_effect = Exception("API Error")
+        mock_gemini.return_value.generate_content_async.side_effect = Exception("API Error")
         
         # Test the service
         result = await renamer_service.suggest_filename("dummy.pdf")
@@ -68,4 +70,50 @@ async def test_clean_filename(renamer_service):
         assert len(result) <= 60
         assert "_" in result
         assert result.islower()
-        assert not any(c in result for c in '<>:"/\\|?*') 
\ No newline at end of file
+        assert not any(c in result for c in '<>:"/\\|?*') 
+
+def test_extract_text_stops_at_max_chars(renamer_service, make_pdf, monkeypatch):
+    pdf_path = make_pdf(["Agreement " * 20, "Schedule " * 20, "Exhibit " * 20])
+    # The renamer never needs pdfplumber's full-page layout extraction
+    monkeypatch.setattr(PdfDocumentSession, "page_text", MagicMock(side_effect=AssertionError))
+
+    text = renamer_service._extract_text_from_pdf(pdf_path, max_chars=250)
+
+    assert len(text) == 250
+    assert text.startswith("Agreement")
+    assert "Schedule" in text
+    assert "Exhibit" not in text
+
+
+def test_scanned_pdf_ocrs_only_the_page_header(renamer_service, make_pdf, stub_ocr):
+    pdf_path = make_pdf([""])
+    renamer_service.ocr = stub_ocr
+    stub_ocr.text = "LEASE"
+
+    assert renamer_service._extract_text_from_pdf(pdf_path) == "LEASE"
+    # Top quarter of a letter page at 150 DPI
+    assert stub_ocr.sizes == [(1275, 413)]
+
+
+@pytest.mark.asyncio
+async def test_fallback_reuses_extracted_text(renamer_service):
+    with patch('app.services.renamer.RenamerService._extract_text_from_pdf') as mock_extract:
+        mock_extract.return_value = "Sample legal document from 2024-03-15 about contract review"
+        renamer_service.model.generate_content_async = AsyncMock(side_effect=Exception("API Error"))
+
+        result = await renamer_service.suggest_filename("dummy.pdf")
+
+        assert result.startswith("2024-03-15_")
+        assert mock_extract.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_documents_skip_the_model(renamer_service):
+    with patch('app.services.renamer.RenamerService._extract_text_from_pdf') as mock_extract:
+        mock_extract.return_value = "PROMISSORY NOTE dated June 1, 2022 made by Hooli Inc."
+        renamer_service.model.generate_content_async = AsyncMock()
+
+        result = await renamer_service.suggest_filename("dummy.pdf")
+
+        assert result == "2022-06-01_promissory_note_hooli"
+        renamer_service.model.generate_content_async.assert_not_called()
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.result_cache import ResultCache
+from app.services.signature_detector import SignatureDetector
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "cache", max_bytes=10**9)
+
+
+def test_second_extraction_is_a_hit(cache, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Intro", "Signature: ______"])
+    detector = SignatureDetector(cache=cache)
+
+    first = detector.extract_pages(pdf_path, tmp_path / "job1")
+    second = detector.extract_pages(pdf_path, tmp_path / "job2")
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert list(second) == list(first) == [2]
+    assert second[2]["png"] == str(tmp_path / "job2" / "document_page2.png")
+    assert Path(second[2]["png"]).read_bytes() == Path(first[2]["png"]).read_bytes()
+    assert Path(second[2]["pdf"]).exists()
+
+
+def test_detector_config_is_part_of_the_key(cache, make_pdf, tmp_path):
+    pdf_path = make_pdf(["Signed by: A"])
+
+    SignatureDetector(cache=cache).extract_pages(pdf_path, tmp_path / "a")
+    SignatureDetector(resolution=72, cache=cache).extract_pages(pdf_path, tmp_path / "b")
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.stats()["entries"] == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    source = tmp_path / "src"
+    source.mkdir()
+    for name in ("a", "b", "c"):
+        (source / f"{name}.pdf").write_bytes(b"x" * 50)
+        (source / f"{name}.png").write_bytes(b"y" * 50)
+
+    def manifest(name):
+        return {1: {"pdf": str(source / f"{name}.pdf"), "png": str(source / f"{name}.png")}}
+
+    cache.put("a", manifest("a"))
+    cache.put("b", manifest("b"))
+    # Make "a" the most recently used entry
+    os.utime(cache.root / "b", (0, 0))
+    cache.put("c", manifest("c"))
+
+    assert cache.evictions == 1
+    assert cache.get("b", "doc", tmp_path / "out") is None
+    assert cache.get("a", "doc", tmp_path / "out") is not None
+    assert cache.stats()["bytes"] <= 250
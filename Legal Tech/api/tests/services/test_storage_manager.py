@@ -0,0 +1,197 @@
+import time
+
+import pytest
+
+from app.services.job_state import COMPLETED, FileState, InMemoryJobStateBackend
+from app.services.metadata_store import FileRecord, MetadataStore
+from app.services.storage_manager import SWEEP_LOCK, StorageManager
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetadataStore(tmp_path / "metadata.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def make_job(tmp_path, store):
+    """A job with a 1000-byte original and 3000 bytes of derived outputs."""
+
+    def _make_job(job_id):
+        job_dir = tmp_path / "storage" / job_id
+        out_dir = job_dir / "doc"
+        out_dir.mkdir(parents=True)
+        original = job_dir / "doc.pdf"
+        original.write_bytes(b"o" * 1000)
+        (out_dir / "doc_sigpages.pdf").write_bytes(b"d" * 1000)
+        (out_dir / "doc_page1.png").write_bytes(b"d" * 2000)
+        record = FileRecord(id=f"{job_id}-f", job_id=job_id, filename="doc.pdf", path=str(original))
+        store.create_job(job_id, [record])
+        store.set_artifacts(f"{job_id}-f", {1: {"pdf": str(out_dir / "doc_sigpages.pdf")}})
+        # Jobs made later count as more recently used
+        time.sleep(0.01)
+        return job_dir
+
+    return _make_job
+
+
+def manager(tmp_path, store, **options):
+    options.setdefault("job_ttl", 3600)
+    return StorageManager(tmp_path / "storage", store, **options)
+
+
+def test_idle_jobs_expire(tmp_path, store, make_job):
+    make_job("old")
+    storage = manager(tmp_path, store, max_bytes=10**9, clock=lambda: time.time() + 7200)
+
+    report = storage.sweep()
+
+    assert report.expired_jobs == ["old"]
+    assert not (tmp_path / "storage" / "old").exists()
+    assert not store.job_exists("old")
+    assert storage.stats()["expired_jobs"] == 1
+
+
+def test_derived_outputs_are_evicted_before_originals(tmp_path, store, make_job):
+    old, new = make_job("old"), make_job("new")
+    renders = tmp_path / "renders"
+    renders.mkdir()
+    (renders / "render.png").write_bytes(b"r" * 500)
+    # 8500 bytes in use; evicting the render and one job's outputs gets under 7000 * 0.9
+    storage = manager(tmp_path, store, max_bytes=7000, cache_dirs=[renders])
+
+    report = storage.sweep()
+
+    assert report.cache_files_evicted == 1
+    assert report.trimmed_jobs == ["old"]
+    assert report.evicted_jobs == []
+    assert (old / "doc.pdf").exists()
+    assert not (old / "doc").exists()
+    assert (new / "doc" / "doc_page1.png").exists()
+    assert store.signature_pages("old-f") == []
+    assert report.bytes_after == 5000
+
+
+def test_originals_go_last_in_lru_order(tmp_path, store, make_job):
+    make_job("old")
+    make_job("new")
+    store.touch_job("old", min_interval=0)
+
+    report = manager(tmp_path, store, max_bytes=1500).sweep()
+
+    assert report.trimmed_jobs == ["new", "old"]
+    assert report.evicted_jobs == ["new"]
+    assert store.job_exists("old")
+    assert report.bytes_after == 1000
+
+
+def test_running_jobs_are_protected(tmp_path, store, make_job):
+    class Pipeline:
+        state = InMemoryJobStateBackend()
+
+        def running_jobs(self):
+            return {"busy"}
+
+    make_job("busy")
+    storage = manager(
+        tmp_path, store, max_bytes=0, pipeline=Pipeline(), clock=lambda: time.time() + 7200
+    )
+
+    report = storage.sweep()
+
+    assert (report.expired_jobs, report.trimmed_jobs, report.evicted_jobs) == ([], [], [])
+    assert store.job_exists("busy")
+
+
+class OtherWorkersPipeline:
+    """A pipeline in this process that shares its job state with other workers."""
+
+    def __init__(self):
+        self.state = InMemoryJobStateBackend()
+
+    def running_jobs(self):
+        return set()
+
+    def forget(self, job_id):
+        pass
+
+    def delete(self, job_id):
+        self.state.delete_job(job_id)
+
+
+def test_jobs_unfinished_in_shared_state_are_protected(tmp_path, store, make_job):
+    pipeline = OtherWorkersPipeline()
+    make_job("done")
+    make_job("busy")
+    for job_id in ("done", "busy"):
+        pipeline.state.create_job(job_id, [FileState(id=f"{job_id}-f", filename="doc.pdf")])
+    pipeline.state.transition("done", "done-f", COMPLETED, time.time())
+
+    report = manager(tmp_path, store, max_bytes=0, pipeline=pipeline).sweep()
+
+    assert report.evicted_jobs == ["done"]
+    assert store.job_exists("busy")
+
+
+def test_abandoned_jobs_are_not_protected(tmp_path, store, make_job):
+    pipeline = OtherWorkersPipeline()
+    make_job("stuck")
+    pipeline.state.create_job("stuck", [FileState(id="stuck-f", filename="doc.pdf")])
+    storage = manager(
+        tmp_path, store, max_bytes=10**9, pipeline=pipeline, clock=lambda: time.time() + 7200
+    )
+
+    assert storage.sweep().expired_jobs == ["stuck"]
+    assert pipeline.state.get_job("stuck") is None
+
+
+def test_jobs_being_downloaded_are_protected(tmp_path, store, make_job):
+    make_job("busy")
+    # Started by another worker, which has its own storage manager
+    download_id = store.start_download("busy")
+    storage = manager(tmp_path, store, max_bytes=0)
+
+    assert storage.sweep().evicted_jobs == []
+    assert store.job_exists("busy")
+
+    store.finish_download(download_id)
+    assert storage.sweep().evicted_jobs == ["busy"]
+
+
+def test_download_started_mid_sweep_is_protected(tmp_path, store, make_job):
+    class RacingStorageManager(StorageManager):
+        def _protected(self, jobs, now):
+            protected = super()._protected(jobs, now)
+            # Another worker starts a download right after the check
+            store.start_download("busy")
+            return protected
+
+    make_job("busy")
+    storage = RacingStorageManager(tmp_path / "storage", store, job_ttl=3600, max_bytes=0)
+
+    report = storage.sweep()
+
+    assert (report.trimmed_jobs, report.evicted_jobs) == ([], [])
+    assert (tmp_path / "storage" / "busy" / "doc").exists()
+
+
+def test_only_one_worker_sweeps_at_a_time(tmp_path, store, make_job):
+    make_job("old")
+    storage = manager(tmp_path, store, max_bytes=0)
+    assert store.acquire_lock(SWEEP_LOCK, "other-worker", ttl=60)
+
+    assert storage.sweep() is None
+    assert store.job_exists("old")
+
+    store.release_lock(SWEEP_LOCK, "other-worker")
+    assert storage.sweep().evicted_jobs == ["old"]
+    # The lock is free again once the sweep is over
+    assert store.acquire_lock(SWEEP_LOCK, "other-worker", ttl=60)
+
+
+def test_sweep_lock_of_a_dead_worker_lapses(tmp_path, store, make_job):
+    make_job("old")
+    assert store.acquire_lock(SWEEP_LOCK, "dead-worker", ttl=-1)
+
+    assert manager(tmp_path, store, max_bytes=0).sweep().evicted_jobs == ["old"]
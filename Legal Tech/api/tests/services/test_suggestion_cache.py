@@ -0,0 +1,90 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.services.batch_renamer import CACHE, BatchRenamer
+from app.services.renamer import RenamerService
+from app.services.suggestion_cache import SuggestionCache
+
+
+def test_suggestions_survive_a_restart(tmp_path):
+    key = SuggestionCache.key("Master services agreement", 1)
+    SuggestionCache(tmp_path).put(key, "2024-03-15_msa")
+
+    restarted = SuggestionCache(tmp_path)
+    assert restarted.get(key) == "2024-03-15_msa"
+    assert restarted.get(key) == "2024-03-15_msa"
+    assert restarted.get(SuggestionCache.key("Master services agreement", 2)) is None
+
+    stats = restarted.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_memory_is_bounded_lru(tmp_path):
+    cache = SuggestionCache(tmp_path, max_memory_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, name)
+
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("a") == "a"  # Evicted from memory, still on disk
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = SuggestionCache(tmp_path, ttl=60)
+    cache.put("key", "name")
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("key") is None
+    assert SuggestionCache(tmp_path, ttl=60).get("key") is None
+
+
+async def test_repeat_document_skips_the_model(tmp_path, make_pdf):
+    renamer = RenamerService(api_key="dummy-key", cache=SuggestionCache(tmp_path / "cache"))
+    renamer.model = SimpleNamespace(
+        generate_content_async=AsyncMock(return_value=SimpleNamespace(text="2024-03-15 Lease"))
+    )
+    first = make_pdf(["Lease agreement"], name="first.pdf")
+
+    assert await renamer.suggest_filename(first) == "2024-03-15_lease"
+    # Same text in a later job, under another name
+    second = make_pdf(["Lease agreement"], name="second.pdf")
+    [suggestion] = await BatchRenamer(renamer).suggest_all([(second, second.name)])
+
+    assert (suggestion.new_filename, suggestion.source) == ("2024-03-15_lease", CACHE)
+    assert renamer.model.generate_content_async.await_count == 1
+
+
+class ThreadRecordingCache(SuggestionCache):
+    """Records the thread of every lookup and store."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def put(self, key, name):
+        self.threads.append(threading.get_ident())
+        super().put(key, name)
+
+
+async def test_cache_io_runs_off_the_event_loop(tmp_path, make_pdf):
+    cache = ThreadRecordingCache(tmp_path / "cache")
+    renamer = RenamerService(api_key="dummy-key", cache=cache)
+    renamer.model = SimpleNamespace(
+        generate_content_async=AsyncMock(return_value=SimpleNamespace(text="2024-03-15 Lease"))
+    )
+    pdf_path = make_pdf(["Lease agreement"], name="lease.pdf")
+
+    await renamer.suggest_filename(pdf_path)
+    await BatchRenamer(renamer).suggest_all([(pdf_path, pdf_path.name)])
+
+    # Miss and store for the first call, then a hit for the batch
+    assert len(cache.threads) == 3
+    assert threading.get_ident() not in cache.threads
@@ -0,0 +1,81 @@
+import os
+
+from reportlab.pdfgen import canvas
+
+from app.services.pdf_document import PdfDocumentSession
+from app.services.renamer import RenamerService
+from app.services.signature_detector import SignatureDetector
+from app.services.text_index import PageTextIndex, text_index_path
+
+
+def count_page_text_calls(monkeypatch):
+    calls = []
+    original = PdfDocumentSession.page_text
+
+    def page_text(self, page_num):
+        calls.append(page_num)
+        return original(self, page_num)
+
+    monkeypatch.setattr(PdfDocumentSession, "page_text", page_text)
+    return calls
+
+
+def test_renamer_text_does_not_depend_on_detection(tmp_path, monkeypatch):
+    # Drawn bottom line first, so the raw character stream and layout text differ
+    pdf_path = tmp_path / "msa.pdf"
+    c = canvas.Canvas(str(pdf_path))
+    c.drawString(100, 600, "Signature: ______")
+    c.drawString(100, 700, "Master services agreement dated 2024-03-15")
+    c.save()
+    calls = count_page_text_calls(monkeypatch)
+    renamer = RenamerService(api_key="dummy-key")
+    before = renamer._extract_text_from_pdf(pdf_path)
+
+    SignatureDetector().extract_pages(pdf_path, pdf_path.parent / pdf_path.stem)
+    assert calls == [1]
+    assert text_index_path(pdf_path).exists()
+
+    # Same text, and so the same cache key and name, once the index is filled
+    assert renamer._extract_text_from_pdf(pdf_path) == before
+    assert "Master services agreement" in before
+    assert calls == [1]  # The renamer never runs layout extraction
+
+
+def test_detecting_again_reads_indexed_text(make_pdf, tmp_path, monkeypatch):
+    pdf_path = make_pdf(["Cover", "Signature: ______"])
+    calls = count_page_text_calls(monkeypatch)
+
+    for detector in (SignatureDetector(), SignatureDetector(tail_pages=1)):
+        with (
+            PdfDocumentSession(pdf_path) as session,
+            PageTextIndex(pdf_path, tmp_path / "index.json", session=session) as index,
+        ):
+            assert detector.detect_pages_in(session, index) == [2]
+
+    assert sorted(calls) == [1, 2]
+    assert (index.extracted, index.reused) == (0, 2)
+
+
+def test_index_is_ignored_once_the_file_changes(make_pdf, tmp_path):
+    pdf_path = make_pdf(["First version"])
+    with PageTextIndex(pdf_path, tmp_path / "index.json") as index:
+        assert index.page_text(1) == "First version"
+
+    make_pdf(["Second version"])
+    os.utime(pdf_path, ns=(0, 0))
+    with PageTextIndex(pdf_path, tmp_path / "index.json") as index:
+        assert index.page_text(1) == "Second version"
+        assert index.extracted == 1
+
+
+def test_ocr_runs_once_per_page(make_pdf, tmp_path, stub_ocr):
+    pdf_path = make_pdf(["", "", ""])
+
+    for _ in range(2):
+        with PageTextIndex(pdf_path, tmp_path / "index.json", ocr=stub_ocr) as index:
+            assert index.page_text(1) == ""
+            assert index.ocr_texts([1, 2, 3]) == dict.fromkeys((1, 2, 3), "Scanned lease")
+
+    # Full letter pages at the service's 150 DPI, recognized once each
+    assert stub_ocr.sizes == [(1275, 1651)] * 3
+    assert (index.extracted, index.reused) == (0, 4)
@@ -0,0 +1,40 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.uploads import UploadTooLargeError, save_upload
+
+
+def make_upload(data, size=None):
+    return UploadFile(file=io.BytesIO(data), filename="doc.pdf", size=size)
+
+
+async def test_save_upload_hashes_while_writing(tmp_path):
+    data = b"%PDF" + bytes(range(256)) * 1000
+    dest = tmp_path / "doc.pdf"
+
+    stored = await save_upload(make_upload(data), dest, max_bytes=10**6, chunk_size=4096)
+
+    assert dest.read_bytes() == data
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+
+
+async def test_declared_size_is_rejected_before_writing(tmp_path):
+    dest = tmp_path / "doc.pdf"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(make_upload(b"x" * 100, size=100), dest, max_bytes=50)
+
+    assert not dest.exists()
+
+
+async def test_oversized_stream_is_removed(tmp_path):
+    dest = tmp_path / "doc.pdf"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(make_upload(b"x" * 100), dest, max_bytes=50, chunk_size=16)
+
+    assert not dest.exists()
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.services.work_limiter import RENDER, ZIP, WorkLimiter, WorkRejectedError
+
+
+async def test_work_beyond_the_limit_waits_for_a_slot():
+    limiter = WorkLimiter({RENDER: 2}, max_queued=4)
+    first = await limiter.acquire(RENDER)
+    await limiter.acquire(RENDER)
+
+    waiting = asyncio.ensure_future(limiter.acquire(RENDER))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    assert limiter.stats()[RENDER]["queued"] == 1
+
+    first.release()
+    first.release()  # Releasing twice must not free a second slot
+    await asyncio.wait_for(waiting, 1)
+    stats = limiter.stats()[RENDER]
+    assert (stats["running"], stats["queued"], stats["admitted"]) == (2, 0, 3)
+
+
+async def test_full_queue_is_rejected_immediately():
+    limiter = WorkLimiter({ZIP: 1}, max_queued=0)
+    await limiter.acquire(ZIP)
+
+    with pytest.raises(WorkRejectedError) as info:
+        await limiter.acquire(ZIP)
+
+    assert info.value.queue_full
+    assert info.value.retry_after >= 1
+    assert limiter.stats()[ZIP]["rejected"] == 1
+
+
+async def test_queued_work_times_out_without_leaking_its_slot():
+    limiter = WorkLimiter({ZIP: 1}, max_queued=2, queue_timeout=0.05)
+    ticket = await limiter.acquire(ZIP)
+
+    with pytest.raises(WorkRejectedError) as info:
+        await limiter.acquire(ZIP)
+    assert not info.value.queue_full
+
+    cancelled = asyncio.ensure_future(limiter.acquire(ZIP, timeout=10))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    ticket.release()
+    await asyncio.sleep(0.01)
+
+    async with limiter.admit(ZIP):
+        assert limiter.stats()[ZIP]["running"] == 1
+    assert limiter.stats()[ZIP]["running"] == 0
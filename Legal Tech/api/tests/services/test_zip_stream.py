@@ -0,0 +1,59 @@
+import io
+import os
+import tracemalloc
+import zipfile
+
+from app.services.zip_stream import ZipStream
+
+
+def test_streamed_archive_is_valid(tmp_path):
+    pdf = tmp_path / "doc_sigpages.pdf"
+    png = tmp_path / "doc_page1.png"
+    pdf.write_bytes(b"%PDF-1.4 " * 1000)
+    png.write_bytes(os.urandom(200_000))
+
+    archive = ZipStream(chunk_size=4096)
+    chunks = [*archive.add_file(pdf, pdf.name), *archive.add_file(png, png.name), *archive.close()]
+    data = b"".join(chunks)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.read(pdf.name) == pdf.read_bytes()
+        assert zf.read(png.name) == png.read_bytes()
+        assert zf.getinfo(pdf.name).compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo(png.name).compress_type == zipfile.ZIP_STORED
+
+
+def test_add_file_yields_before_entry_is_complete(tmp_path):
+    png = tmp_path / "page.png"
+    png.write_bytes(os.urandom(1_000_000))
+
+    chunks = ZipStream(chunk_size=64 * 1024).add_file(png, png.name)
+
+    assert len(next(chunks)) < 200_000
+
+
+def test_peak_memory_is_bounded_on_large_job(tmp_path):
+    # 30 documents, each with a 2 MiB PNG and a 1 MiB subset PDF: a ~90 MiB archive
+    page = tmp_path / "page.png"
+    page.write_bytes(os.urandom(2 * 1024 * 1024))
+    subset = tmp_path / "sigpages.pdf"
+    subset.write_bytes(os.urandom(1024 * 1024))
+
+    archive = ZipStream()
+    total = 0
+    tracemalloc.start()
+    try:
+        for i in range(30):
+            for chunk in archive.add_file(page, f"doc{i}_page1.png"):
+                total += len(chunk)
+            for chunk in archive.add_file(subset, f"doc{i}_sigpages.pdf"):
+                total += len(chunk)
+        for chunk in archive.close():
+            total += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert total > 90 * 1024 * 1024
+    assert peak < 4 * 1024 * 1024
@@ -0,0 +1,438 @@
+import io
+import json
+import threading
+import time
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.api.deps import get_metadata_store, get_renamer_service
+from app.services.job_state import COMPLETED, DETECTING, FileState, SqliteJobStateBackend
+from app.services.metadata_store import FileRecord, MetadataStore
+from app.services.page_renderer import PageRenderer
+from app.services.renamer import RenamerService
+from app.services.result_cache import ResultCache
+from app.services.storage_manager import StorageManager
+from app.services.work_limiter import ZIP, WorkLimiter
+
+
+@pytest.fixture
+def storage_client(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10**9)
+    store = MetadataStore(tmp_path / "metadata.db")
+    monkeypatch.setattr(main, "STORAGE_DIR", tmp_path)
+    monkeypatch.setattr(main, "metadata_store", store)
+    monkeypatch.setattr(main.pipeline, "store", store)
+    monkeypatch.setattr(main.pipeline, "state", SqliteJobStateBackend(tmp_path / "job_state.db"))
+    monkeypatch.setattr(
+        main,
+        "storage_manager",
+        StorageManager(tmp_path, store, job_ttl=3600, max_bytes=10**9, pipeline=main.pipeline),
+    )
+    monkeypatch.setattr(main, "result_cache", cache)
+    monkeypatch.setattr(main.extraction_engine, "cache", cache)
+    monkeypatch.setattr(main.extraction_engine, "renderer", PageRenderer(tmp_path / "renders"))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_upload_then_download_signature_pages(storage_client, make_pdf):
+    contract = make_pdf(["Terms", "Signature: ________"], name="contract.pdf")
+    letter = make_pdf(["Signed by: Jane Doe"], name="letter.pdf")
+
+    response = storage_client.post(
+        "/api/upload",
+        files=[
+            ("files", ("contract.pdf", contract.read_bytes(), "application/pdf")),
+            ("files", ("letter.pdf", letter.read_bytes(), "application/pdf")),
+        ],
+    )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    response = storage_client.get(f"/api/job/{job_id}/download")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert sorted(names) == [
+        "contract_page2.png",
+        "contract_sigpages.pdf",
+        "letter_page1.png",
+        "letter_sigpages.pdf",
+    ]
+    # The job is no longer shielded from storage sweeps
+    assert main.metadata_store.active_downloads(since=0) == set()
+
+
+def test_manifest_reports_background_extraction(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+
+    # Downloading waits for the extraction started at upload time
+    assert storage_client.get(f"/api/job/{job_id}/download").status_code == 200
+
+    manifest = storage_client.get(f"/api/job/{job_id}/manifest").json()
+    assert manifest["status"] == "completed"
+    assert manifest["progress"]["completed"] == 1
+    assert manifest["files"][0]["filename"] == "contract.pdf"
+    assert manifest["files"][0]["pages"] == [1]
+    assert manifest["files"][0]["size"] == contract.stat().st_size
+    assert len(manifest["files"][0]["sha256"]) == 64
+
+
+def test_repeat_upload_is_served_from_cache(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    for _ in range(2):
+        response = storage_client.post(
+            "/api/upload",
+            files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+        )
+        job_id = response.json()["job_id"]
+        assert storage_client.get(f"/api/job/{job_id}/download").status_code == 200
+
+    stats = storage_client.get("/api/cache/stats").json()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_oversized_upload_is_rejected(storage_client, make_pdf, tmp_path, monkeypatch):
+    monkeypatch.setattr(main.settings, "MAX_UPLOAD_BYTES", 100)
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+
+    assert response.status_code == 413
+    # No job directory is left behind; only the fixture's cache directory remains
+    assert [p.name for p in tmp_path.iterdir() if p.is_dir()] == ["cache"]
+
+
+def test_saturated_download_is_rejected_with_retry_after(
+    storage_client, make_pdf, monkeypatch
+):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+    limiter = WorkLimiter({ZIP: 1}, max_queued=0)
+    monkeypatch.setattr(main, "work_limiter", limiter)
+
+    # Another download is holding the only ZIP slot
+    ticket = storage_client.portal.call(limiter.acquire, ZIP)
+    response = storage_client.get(f"/api/job/{job_id}/download")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    # Light endpoints are unaffected
+    assert storage_client.get("/health").status_code == 200
+
+    ticket.release()
+    assert storage_client.get(f"/api/job/{job_id}/download").status_code == 200
+    assert limiter.stats()[ZIP]["running"] == 0
+
+
+def test_download_recreates_outputs_trimmed_by_another_worker(storage_client, make_pdf):
+    contract = make_pdf(["Terms", "Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+    assert storage_client.get(f"/api/job/{job_id}/download").status_code == 200
+
+    # Another worker's sweep trims the job; this worker still holds its manifests
+    other_worker = StorageManager(main.STORAGE_DIR, main.metadata_store, 3600, max_bytes=10**9)
+    other_worker._trim_job(job_id)
+    assert job_id in main.pipeline.jobs
+
+    response = storage_client.get(f"/api/job/{job_id}/download")
+    assert sorted(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == [
+        "contract_page2.png",
+        "contract_sigpages.pdf",
+    ]
+
+    other_worker._delete_job(job_id)
+    assert storage_client.get(f"/api/job/{job_id}/download").status_code == 404
+    assert job_id not in main.pipeline.jobs
+
+
+def test_failed_download_setup_releases_its_slot(storage_client, make_pdf, monkeypatch):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+    limiter = WorkLimiter({ZIP: 1}, max_queued=0)
+    monkeypatch.setattr(main, "work_limiter", limiter)
+
+    def unavailable(_job_id):
+        raise OSError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main.metadata_store, "list_files", unavailable)
+        with pytest.raises(OSError, match="database is locked"):
+            storage_client.get(f"/api/job/{job_id}/download")
+
+    assert limiter.stats()[ZIP]["running"] == 0
+    assert main.metadata_store.active_downloads(since=0) == set()
+    assert storage_client.get(f"/api/job/{job_id}/download").status_code == 200
+
+
+def test_download_waits_for_another_workers_extraction(
+    storage_client, make_pdf, tmp_path, monkeypatch
+):
+    # A job uploaded to another worker, which is still detecting its file
+    job_dir = tmp_path / "elsewhere"
+    job_dir.mkdir()
+    pdf_path = job_dir / "f1_contract.pdf"
+    pdf_path.write_bytes(make_pdf(["Signature: ________"]).read_bytes())
+    record = FileRecord(id="f1", job_id="elsewhere", filename="contract.pdf", path=str(pdf_path))
+    main.metadata_store.create_job("elsewhere", [record])
+    main.pipeline.state.create_job("elsewhere", [FileState(id="f1", filename="contract.pdf")])
+    main.pipeline.state.transition("elsewhere", "f1", DETECTING, time.time())
+    monkeypatch.setattr(main.settings, "JOB_EVENTS_POLL_INTERVAL", 0.05)
+
+    extract_all = main.extraction_engine.extract_all
+    seen = []
+
+    def recording_extract_all(files):
+        seen.append(main.pipeline.state.get_job("elsewhere")[0].status)
+        return extract_all(files)
+
+    monkeypatch.setattr(main.extraction_engine, "extract_all", recording_extract_all)
+    finish = threading.Timer(
+        0.3,
+        lambda: main.pipeline.state.transition("elsewhere", "f1", COMPLETED, time.time()),
+    )
+    finish.start()
+
+    response = storage_client.get("/api/job/elsewhere/download")
+    finish.join()
+
+    assert response.status_code == 200
+    assert seen == [COMPLETED]
+    assert sorted(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == [
+        "contract_page1.png",
+        "contract_sigpages.pdf",
+    ]
+
+
+def test_job_events_stream_progress(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+
+    response = storage_client.get(f"/api/job/{job_id}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block.split("\n", 1) for block in response.text.strip().split("\n\n")]
+    assert events[-1][0] == "event: done"
+    manifests = [json.loads(data.removeprefix("data: ")) for name, data in events[:-1]]
+    assert manifests[-1]["status"] == "completed"
+    assert manifests[-1]["files"][0]["pages"] == [1]
+    assert storage_client.get("/api/job/missing/events").status_code == 404
+
+
+def test_manifest_unknown_job(storage_client):
+    response = storage_client.get("/api/job/missing/manifest")
+    assert response.status_code == 404
+
+
+def test_download_unknown_job(storage_client):
+    response = storage_client.get("/api/job/missing/download")
+    assert response.status_code == 404
+
+
+def test_thumbnail_supports_conditional_get(storage_client, make_pdf):
+    contract = make_pdf(["Terms", "Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id = response.json()["job_id"]
+    storage_client.get(f"/api/job/{job_id}/download")
+    file_info = storage_client.get(f"/api/job/{job_id}/manifest").json()["files"][0]
+
+    response = storage_client.get(file_info["thumbnail_url"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    etag = response.headers["etag"]
+    assert "_p2_" in etag  # First signature page
+
+    response = storage_client.get(file_info["thumbnail_url"], headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_page_render_endpoint(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[("files", ("contract.pdf", contract.read_bytes(), "application/pdf"))],
+    )
+    job_id, file_id = response.json()["job_id"], response.json()["files"][0]
+
+    response = storage_client.get(f"/api/job/{job_id}/files/{file_id}/pages/1?dpi=36")
+    assert response.status_code == 200
+    assert response.content.startswith(b"\x89PNG")
+
+    assert storage_client.get(f"/api/job/{job_id}/files/{file_id}/pages/2").status_code == 404
+    assert storage_client.get(f"/api/job/{job_id}/files/unknown/pages/1").status_code == 404
+
+
+def test_rename_updates_metadata_only(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[
+            ("files", ("contract.pdf", contract.read_bytes(), "application/pdf")),
+            ("files", ("old_contract.pdf", contract.read_bytes(), "application/pdf")),
+        ],
+    )
+    job_id = response.json()["job_id"]
+    stored = sorted(p.name for p in (main.STORAGE_DIR / job_id).glob("*.pdf"))
+
+    # Exact match only: "contract.pdf" must not pick up "old_contract.pdf"
+    response = storage_client.patch(
+        f"/api/job/{job_id}/rename",
+        json={"old_filename": "contract.pdf", "new_filename": "2024-03-15_msa.pdf"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"files": ["2024-03-15_msa.pdf", "old_contract.pdf"]}
+    assert sorted(p.name for p in (main.STORAGE_DIR / job_id).glob("*.pdf")) == stored
+
+    manifest = storage_client.get(f"/api/job/{job_id}/manifest").json()
+    assert [f["filename"] for f in manifest["files"]] == ["2024-03-15_msa.pdf", "old_contract.pdf"]
+
+    response = storage_client.patch(
+        f"/api/job/{job_id}/rename",
+        json={"old_filename": "old_contract.pdf", "new_filename": "2024-03-15_msa.pdf"},
+    )
+    assert response.status_code == 409
+    response = storage_client.patch(
+        f"/api/job/{job_id}/rename",
+        json={"old_filename": "contract.pdf", "new_filename": "other.pdf"},
+    )
+    assert response.status_code == 404
+
+
+def test_download_uses_current_filenames(storage_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = storage_client.post(
+        "/api/upload",
+        files=[
+            ("files", ("contract.pdf", contract.read_bytes(), "application/pdf")),
+            ("files", ("copy.pdf", contract.read_bytes(), "application/pdf")),
+        ],
+    )
+    job_id = response.json()["job_id"]
+    storage_client.patch(
+        f"/api/job/{job_id}/rename",
+        json={"old_filename": "contract.pdf", "new_filename": "2024-03-15_msa.pdf"},
+    )
+
+    response = storage_client.get(f"/api/job/{job_id}/download")
+
+    assert sorted(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == [
+        "2024-03-15_msa_page1.png",
+        "2024-03-15_msa_sigpages.pdf",
+        "copy_page1.png",
+        "copy_sigpages.pdf",
+    ]
+
+
+class StubModel:
+    def generate_content(self, _prompt, **_config):
+        """Blocking, like the SDK's: it cannot be awaited."""
+        return SimpleNamespace(text="2024-03-15 Signed Agreement")
+
+    async def generate_content_async(self, _prompt, **_config):
+        return SimpleNamespace(text="2024-03-15 Signed Agreement")
+
+
+@pytest.fixture
+def rename_client(storage_client, monkeypatch):
+    renamer = RenamerService(api_key="dummy-key")
+    renamer.model = StubModel()
+    overrides = main.app.dependency_overrides
+    monkeypatch.setitem(overrides, get_renamer_service, lambda: renamer)
+    monkeypatch.setitem(overrides, get_metadata_store, lambda: main.metadata_store)
+    return storage_client
+
+
+def test_rename_suggestions_for_uploaded_job(rename_client, make_pdf):
+    contract = make_pdf(["Terms", "Signature: ________"], name="contract.pdf")
+    response = rename_client.post(
+        "/api/upload",
+        files=[
+            ("files", ("contract.pdf", contract.read_bytes(), "application/pdf")),
+            ("files", ("letter.pdf", contract.read_bytes(), "application/pdf")),
+        ],
+    )
+    job_id = response.json()["job_id"]
+
+    response = rename_client.get(f"/api/job/{job_id}/rename-suggestions")
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["old_filename"] for s in body["suggestions"]] == ["contract.pdf", "letter.pdf"]
+    assert all(s["new_filename"] for s in body["suggestions"])
+    assert body["summary"]["files"] == 2
+
+    # A suggestion can be sent straight back to the rename endpoints
+    suggestion = body["suggestions"][0]
+    response = rename_client.patch(
+        f"/api/job/{job_id}/rename/batch",
+        json={"renames": [{k: suggestion[k] for k in ("old_filename", "new_filename")}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["files"] == [suggestion["new_filename"], "letter.pdf"]
+
+    response = rename_client.get("/api/job/unknown/rename-suggestions")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Job not found"
+
+
+def test_batch_rename_through_jobs_router(rename_client, make_pdf):
+    contract = make_pdf(["Signature: ________"], name="contract.pdf")
+    response = rename_client.post(
+        "/api/upload",
+        files=[
+            ("files", ("a.pdf", contract.read_bytes(), "application/pdf")),
+            ("files", ("b.pdf", contract.read_bytes(), "application/pdf")),
+        ],
+    )
+    job_id = response.json()["job_id"]
+
+    response = rename_client.patch(
+        f"/api/job/{job_id}/rename/batch",
+        json={
+            "renames": [
+                {"old_filename": "a.pdf", "new_filename": "2024-03-15_msa.pdf"},
+                {"old_filename": "b.pdf", "new_filename": "2024-03-15_nda.pdf"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["files"] == ["2024-03-15_msa.pdf", "2024-03-15_nda.pdf"]
+
+    # The single-file rename used by the web app is not shadowed by the router
+    response = rename_client.patch(
+        f"/api/job/{job_id}/rename",
+        json={"old_filename": "2024-03-15_msa.pdf", "new_filename": "msa.pdf"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"files": ["msa.pdf", "2024-03-15_nda.pdf"]}
@@ -1,6 +1,6 @@
 import pytest
 from pathlib import Path
-from app.services.signature_detector import SignatureDetector
+from app.services.signature_detector import FAST_MODE, SignatureDetector
 
 # Test data directory
 TEST_DATA_DIR = Path(__file__).parent / "test_data"
@@ -76,4 +76,42 @@ def test_detect_pages_empty_document(detector, empty_pdf_path):
 def test_detect_pages_invalid_path(detector):
     """Test handling of invalid PDF path."""
     with pytest.raises(Exception):
-        detector.detect_pages("nonexistent.pdf") 
\ No newline at end of file
+        detector.detect_pages("nonexistent.pdf") 
+
+def test_extract_pages_writes_subset_and_images(detector, sample_pdf_path, tmp_path):
+    """Test that extraction writes one subset PDF and a PNG per signature page."""
+    manifest = detector.extract_pages(sample_pdf_path, tmp_path)
+    
+    assert sorted(manifest) == [2, 3, 4]
+    subset_pdfs = {info["pdf"] for info in manifest.values()}
+    assert subset_pdfs == {str(tmp_path / "sample_sigpages.pdf")}
+    for page_num, info in manifest.items():
+        assert info["png"] == str(tmp_path / f"sample_page{page_num}.png")
+        assert Path(info["png"]).exists()
+
+
+def test_fast_mode_matches_layout_mode(detector, sample_pdf_path, empty_pdf_path, make_pdf):
+    """Test that the raw character scanner finds the same pages as layout extraction."""
+    corpus = [
+        sample_pdf_path,
+        empty_pdf_path,
+        make_pdf(["Terms", "SIGNED BY the parties", "", "signature block"], name="mixed.pdf"),
+        make_pdf(["Witness " + "_" * 45, "Only " + "_" * 39], name="lines.pdf"),
+        make_pdf(["Signedby counsel", "Terms"], name="run_together.pdf"),
+    ]
+    fast = SignatureDetector(mode=FAST_MODE)
+    
+    for pdf_path in corpus:
+        assert fast.detect_pages(pdf_path) == detector.detect_pages(pdf_path)
+
+def test_tail_first_scan_stops_early(sample_pdf_path):
+    """Test that a tail-first scan stops once enough signature pages are found."""
+    detector = SignatureDetector(mode=FAST_MODE, tail_pages=3, stop_after=1)
+    
+    # Pages 5, 4, ... are scanned in that order; page 4 is the first match
+    assert detector.detect_pages(sample_pdf_path) == [4]
+
+def test_invalid_mode():
+    """Test that unknown detection modes are rejected."""
+    with pytest.raises(ValueError, match="Unknown detection mode"):
+        SignatureDetector(mode="ocr")
@@ -0,0 +1,9 @@
+from benchmarks.startup import IMPORT_BUDGET, measure_startup
+
+
+def test_cold_import_stays_lazy_and_within_budget(tmp_path):
+    # Best of three, so a busy machine does not fail the budget on one slow run
+    runs = [measure_startup(cwd=tmp_path) for _ in range(3)]
+
+    assert runs[0]["heavy_modules"] == []
+    assert min(run["import_seconds"] for run in runs) < IMPORT_BUDGET
@@ -8,12 +8,28 @@ interface FileManifest {
   filename: string;
   thumbnail_url: string;
   status: string;
+  pages: number[];
+  timings: Record<string, number>;
+  error: string | null;
+}
+
+interface JobManifest {
+  job_id: string;
+  status: string;
+  progress: {
+    total: number;
+    queued: number;
+    processing: number;
+    completed: number;
+    failed: number;
+  };
+  files: FileManifest[];
 }
 
 function App() {
   const [jobId, setJobId] = useState<string | null>(null);
   const [manifest, setManifest] = useState<FileManifest[]>([]);
-  const [isPolling, setIsPolling] = useState(false);
+  const [isWatching, setIsWatching] = useState(false);
   const [editingFile, setEditingFile] = useState<string | null>(null);
   const [newFilename, setNewFilename] = useState("");
 
@@ -30,7 +46,7 @@ function App() {
         },
       });
       setJobId(response.data.job_id);
-      setIsPolling(true);
+      setIsWatching(true);
     } catch (error) {
       console.error('Upload failed:', error);
     }
@@ -39,31 +55,28 @@ function App() {
   const { getRootProps, getInputProps, isDragActive } = useDropzone({ onDrop });
 
   useEffect(() => {
-    let pollInterval: NodeJS.Timeout;
+    if (!isWatching || !jobId) return;
 
-    if (isPolling && jobId) {
-      pollInterval = setInterval(async () => {
-        try {
-          const response = await axios.get(`/api/job/${jobId}/manifest`);
-          setManifest(response.data);
-          
-          // Stop polling if all files are processed
-          if (response.data.every((file: FileManifest) => file.status === 'completed')) {
-            setIsPolling(false);
-          }
-        } catch (error) {
-          console.error('Polling failed:', error);
-          setIsPolling(false);
-        }
-      }, 2000);
-    }
+    // The server pushes the manifest whenever a file changes state
+    const events = new EventSource(`/api/job/${jobId}/events`);
+    events.addEventListener('manifest', (event) => {
+      const data: JobManifest = JSON.parse((event as MessageEvent).data);
+      setManifest(data.files);
+    });
+    events.addEventListener('done', () => {
+      events.close();
+      setIsWatching(false);
+    });
+    events.onerror = (error) => {
+      console.error('Progress stream failed:', error);
+      events.close();
+      setIsWatching(false);
+    };
 
     return () => {
-      if (pollInterval) {
-        clearInterval(pollInterval);
-      }
+      events.close();
     };
-  }, [isPolling, jobId]);
+  }, [isWatching, jobId]);
 
   const handleDownload = async () => {
     if (!jobId) return;